@@ -0,0 +1,76 @@
+-- =============================================================================
+-- Vesper — Persistent content-hash cache for AI results
+-- =============================================================================
+-- Run this in the Supabase SQL Editor, then set AI_CACHE_PERSISTENT=true.
+--
+-- Second tier behind the in-process LRU in backend/app/services/ai/cache.py.
+-- Keys are sha256(kind, model/prompt fingerprint, normalised content), so a
+-- prompt or model change never reads stale rows. last_used_at is refreshed
+-- on every write and, at most once a day per row, on a read through
+-- ai_cache_get(); prune_ai_cache() drops rows unused for p_days, so hot
+-- keys survive however old they are.
+-- =============================================================================
+
+
+-- -----------------------------------------------------------------------------
+-- 1. TABLE
+-- -----------------------------------------------------------------------------
+
+CREATE TABLE IF NOT EXISTS public.ai_cache (
+    key          text        PRIMARY KEY,            -- hex sha256
+    kind         text        NOT NULL CHECK (kind IN ('analysis', 'embedding')),
+    value        jsonb       NOT NULL,
+    created_at   timestamptz NOT NULL DEFAULT now(),
+    last_used_at timestamptz NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS ai_cache_last_used_at_idx
+    ON public.ai_cache (last_used_at);
+
+
+-- -----------------------------------------------------------------------------
+-- 2. ROW LEVEL SECURITY — no policies: only the service role (backend) reads
+--    and writes the cache
+-- -----------------------------------------------------------------------------
+
+ALTER TABLE public.ai_cache ENABLE ROW LEVEL SECURITY;
+
+
+-- -----------------------------------------------------------------------------
+-- 3. FUNCTIONS
+-- -----------------------------------------------------------------------------
+
+-- Cached value for p_key (NULL on a miss). Marks the row used, but writes
+-- at most once a day per row so hot keys don't turn reads into updates.
+CREATE OR REPLACE FUNCTION public.ai_cache_get(p_key text)
+RETURNS jsonb
+LANGUAGE sql
+VOLATILE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  UPDATE public.ai_cache
+     SET last_used_at = now()
+   WHERE key = p_key
+     AND last_used_at < now() - interval '1 day';
+
+  SELECT value FROM public.ai_cache WHERE key = p_key;
+$$;
+
+
+CREATE OR REPLACE FUNCTION public.prune_ai_cache(p_days int DEFAULT 90)
+RETURNS int
+LANGUAGE sql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  WITH gone AS (
+    DELETE FROM public.ai_cache
+    WHERE last_used_at < now() - make_interval(days => p_days)
+    RETURNING 1
+  )
+  SELECT count(*)::int FROM gone;
+$$;
+
+REVOKE EXECUTE ON FUNCTION public.ai_cache_get(text)  FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION public.prune_ai_cache(int) FROM PUBLIC, anon, authenticated;
@@ -0,0 +1,88 @@
+-- =============================================================================
+-- Vesper — Debounced re-analysis with a content-version guard
+-- =============================================================================
+-- Run this in the Supabase SQL Editor (after analysis_jobs.sql).
+--
+-- Autosave can PUT the same entry many times a minute. With this script:
+--   * entries.content_version increments whenever content actually changes
+--     (and analyzed is reset); byte-identical saves change nothing and
+--     queue nothing.
+--   * A content edit queues analysis after a quiet period; each further edit
+--     pushes the queued job back instead of adding one, so a burst of
+--     edits costs one LLM call.
+--   * Workers write results only where content_version still matches the
+--     version they analysed, so an older in-flight analysis can never
+--     overwrite a newer one.
+-- =============================================================================
+
+
+-- -----------------------------------------------------------------------------
+-- 1. CONTENT VERSION
+-- -----------------------------------------------------------------------------
+
+ALTER TABLE public.entries
+    ADD COLUMN IF NOT EXISTS content_version int NOT NULL DEFAULT 1;
+
+CREATE OR REPLACE FUNCTION public.entries_bump_content_version()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  IF NEW.content IS DISTINCT FROM OLD.content THEN
+    NEW.content_version := OLD.content_version + 1;
+    NEW.analyzed        := false;
+  ELSE
+    NEW.content_version := OLD.content_version;   -- clients can't forge it
+  END IF;
+  RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS entries_bump_content_version ON public.entries;
+CREATE TRIGGER entries_bump_content_version
+    BEFORE UPDATE OF content, content_version
+    ON public.entries
+    FOR EACH ROW
+    EXECUTE FUNCTION public.entries_bump_content_version();
+
+
+-- -----------------------------------------------------------------------------
+-- 2. DEBOUNCED ENQUEUE — replaces the trigger from analysis_jobs.sql
+-- -----------------------------------------------------------------------------
+
+CREATE OR REPLACE FUNCTION public.enqueue_analysis_job()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  -- New entries are analysed at once; edits wait for this much quiet
+  quiet_period  CONSTANT interval := interval '10 seconds';
+  ready_at      timestamptz := CASE WHEN TG_OP = 'INSERT' THEN now() ELSE now() + quiet_period END;
+BEGIN
+  INSERT INTO public.analysis_jobs (entry_id, user_id, run_after)
+  VALUES (NEW.id, NEW.user_id, ready_at)
+  ON CONFLICT (entry_id) WHERE status = 'queued'
+  DO UPDATE SET run_after = greatest(analysis_jobs.run_after, EXCLUDED.run_after),
+                attempts = 0,
+                last_error = NULL;
+
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS entries_enqueue_analysis ON public.entries;
+CREATE TRIGGER entries_enqueue_analysis
+    AFTER INSERT
+    ON public.entries
+    FOR EACH ROW
+    EXECUTE FUNCTION public.enqueue_analysis_job();
+
+DROP TRIGGER IF EXISTS entries_enqueue_reanalysis ON public.entries;
+CREATE TRIGGER entries_enqueue_reanalysis
+    AFTER UPDATE OF content
+    ON public.entries
+    FOR EACH ROW
+    WHEN (OLD.content_version IS DISTINCT FROM NEW.content_version)
+    EXECUTE FUNCTION public.enqueue_analysis_job();
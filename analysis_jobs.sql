@@ -0,0 +1,218 @@
+-- =============================================================================
+-- Vesper — Durable analysis job queue
+-- =============================================================================
+-- Run this in the Supabase SQL Editor (after supabase_init.sql).
+--
+-- Entry saves enqueue a job (via trigger) instead of firing a FastAPI
+-- BackgroundTask, so analysis survives restarts and deploys. Workers
+-- (backend/app/services/jobs.py) claim jobs with FOR UPDATE SKIP LOCKED
+-- through the service role.
+--
+-- Lifecycle:  queued → running → done
+--                         ↘ queued (retry, run_after = now() + backoff)
+--                         ↘ dead   (attempts exhausted — dead letter)
+-- A running job whose lease expires (worker crashed) is claimable again.
+-- =============================================================================
+
+
+-- -----------------------------------------------------------------------------
+-- 1. TABLE + INDEXES
+-- -----------------------------------------------------------------------------
+
+CREATE TABLE IF NOT EXISTS public.analysis_jobs (
+    id              bigserial   PRIMARY KEY,
+    entry_id        uuid        NOT NULL REFERENCES public.entries(id) ON DELETE CASCADE,
+    user_id         uuid        NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+    status          text        NOT NULL DEFAULT 'queued'
+                                CHECK (status IN ('queued', 'running', 'done', 'dead')),
+    attempts        int         NOT NULL DEFAULT 0,
+    max_attempts    int         NOT NULL DEFAULT 5,
+    run_after       timestamptz NOT NULL DEFAULT now(),
+    enqueued_at     timestamptz NOT NULL DEFAULT now(),
+    started_at      timestamptz,
+    finished_at     timestamptz,
+    locked_by       text,
+    last_error      text
+);
+
+-- At most one waiting job per entry: a burst of saves collapses into one
+CREATE UNIQUE INDEX IF NOT EXISTS analysis_jobs_queued_entry_idx
+    ON public.analysis_jobs (entry_id)
+    WHERE status = 'queued';
+
+-- Claim order
+CREATE INDEX IF NOT EXISTS analysis_jobs_ready_idx
+    ON public.analysis_jobs (run_after)
+    WHERE status = 'queued';
+
+-- Lease expiry scan
+CREATE INDEX IF NOT EXISTS analysis_jobs_running_idx
+    ON public.analysis_jobs (started_at)
+    WHERE status = 'running';
+
+
+-- -----------------------------------------------------------------------------
+-- 2. ROW LEVEL SECURITY — no direct access; everything goes through the
+--    trigger and functions below (service role bypasses RLS for the workers)
+-- -----------------------------------------------------------------------------
+
+ALTER TABLE public.analysis_jobs ENABLE ROW LEVEL SECURITY;
+
+
+-- -----------------------------------------------------------------------------
+-- 3. FUNCTIONS
+-- -----------------------------------------------------------------------------
+
+-- Enqueue in the same transaction as the entry write (transactional outbox):
+-- if the INSERT/UPDATE commits, its analysis job exists.
+CREATE OR REPLACE FUNCTION public.enqueue_analysis_job()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  INSERT INTO public.analysis_jobs (entry_id, user_id)
+  VALUES (NEW.id, NEW.user_id)
+  ON CONFLICT (entry_id) WHERE status = 'queued'
+  DO UPDATE SET run_after = now(), attempts = 0, last_error = NULL;
+
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS entries_enqueue_analysis ON public.entries;
+CREATE TRIGGER entries_enqueue_analysis
+    AFTER INSERT OR UPDATE OF content
+    ON public.entries
+    FOR EACH ROW
+    EXECUTE FUNCTION public.enqueue_analysis_job();
+
+
+-- Atomically lease up to p_limit ready jobs for one worker
+CREATE OR REPLACE FUNCTION public.claim_analysis_jobs(
+  p_worker        text,
+  p_limit         int DEFAULT 1,
+  p_lease_seconds int DEFAULT 300
+)
+RETURNS SETOF public.analysis_jobs
+LANGUAGE sql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  UPDATE public.analysis_jobs j
+  SET status     = 'running',
+      attempts   = j.attempts + 1,
+      started_at = now(),
+      locked_by  = p_worker
+  WHERE j.id IN (
+    SELECT id FROM public.analysis_jobs
+    WHERE (status = 'queued'  AND run_after <= now())
+       OR (status = 'running' AND started_at < now() - make_interval(secs => p_lease_seconds))
+    ORDER BY run_after
+    LIMIT p_limit
+    FOR UPDATE SKIP LOCKED
+  )
+  RETURNING j.*;
+$$;
+
+
+CREATE OR REPLACE FUNCTION public.complete_analysis_job(p_job_id bigint)
+RETURNS void
+LANGUAGE sql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  UPDATE public.analysis_jobs
+  SET status = 'done', finished_at = now(), locked_by = NULL
+  WHERE id = p_job_id;
+$$;
+
+
+-- Retry after p_retry_seconds, or dead-letter once attempts are exhausted.
+-- A newer queued job for the same entry supersedes the retry.
+CREATE OR REPLACE FUNCTION public.fail_analysis_job(p_job_id bigint, p_error text, p_retry_seconds float)
+RETURNS text
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  job         public.analysis_jobs;
+  new_status  text;
+BEGIN
+  SELECT * INTO job FROM public.analysis_jobs WHERE id = p_job_id FOR UPDATE;
+
+  IF job.attempts >= job.max_attempts THEN
+    new_status := 'dead';
+  ELSIF EXISTS (
+    SELECT 1 FROM public.analysis_jobs
+    WHERE entry_id = job.entry_id AND status = 'queued' AND id <> job.id
+  ) THEN
+    new_status := 'done';
+  ELSE
+    new_status := 'queued';
+  END IF;
+
+  UPDATE public.analysis_jobs
+  SET status      = new_status,
+      last_error  = left(p_error, 2000),
+      run_after   = now() + make_interval(secs => p_retry_seconds),
+      finished_at = CASE WHEN new_status = 'queued' THEN NULL ELSE now() END,
+      locked_by   = NULL
+  WHERE id = p_job_id;
+
+  RETURN new_status;
+END;
+$$;
+
+
+-- Queue depth and lag for sizing workers
+CREATE OR REPLACE FUNCTION public.analysis_job_stats()
+RETURNS jsonb
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  SELECT jsonb_build_object(
+    'queued',      count(*) FILTER (WHERE status = 'queued'),
+    'ready',       count(*) FILTER (WHERE status = 'queued' AND run_after <= now()),
+    'running',     count(*) FILTER (WHERE status = 'running'),
+    'dead',        count(*) FILTER (WHERE status = 'dead'),
+    'oldest_ready_lag_seconds',
+      coalesce(extract(epoch FROM now() - min(run_after) FILTER (
+        WHERE status = 'queued' AND run_after <= now()
+      )), 0)
+  )
+  FROM public.analysis_jobs
+  WHERE status <> 'done';
+$$;
+
+
+-- Housekeeping: drop finished jobs older than p_days
+CREATE OR REPLACE FUNCTION public.prune_analysis_jobs(p_days int DEFAULT 7)
+RETURNS int
+LANGUAGE sql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  WITH gone AS (
+    DELETE FROM public.analysis_jobs
+    WHERE status = 'done' AND finished_at < now() - make_interval(days => p_days)
+    RETURNING 1
+  )
+  SELECT count(*)::int FROM gone;
+$$;
+
+
+-- -----------------------------------------------------------------------------
+-- 4. PRIVILEGES — workers use the service role; users never call these
+-- -----------------------------------------------------------------------------
+
+REVOKE EXECUTE ON FUNCTION public.enqueue_analysis_job()                  FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION public.claim_analysis_jobs(text, int, int)     FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION public.complete_analysis_job(bigint)           FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION public.fail_analysis_job(bigint, text, float)  FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION public.analysis_job_stats()                    FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION public.prune_analysis_jobs(int)                FROM PUBLIC, anon, authenticated;
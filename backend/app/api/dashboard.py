@@ -5,13 +5,21 @@ GET /dashboard/stats returns:
   current_streak  — consecutive days with ≥1 entry (checking up through yesterday)
   mood_sparkline  — last 7 days' average mood scores (one per day, null if no entry that day)
   latest_analysis — full AI analysis of the most recent analyzed entry
+  entry_count     — total entries (the entry list is paged, so it can't count them)
+  timezone        — the stored zone days are bucketed in
+  timezone_set    — whether the user has ever chosen one (else UTC)
+
+All are computed in Postgres by the dashboard_stats RPC
+(dashboard_stats_rpc.sql) in a single round-trip. The read never changes
+the stored zone; that is PUT /settings/timezone (app/api/user_settings.py).
 """
 
-from datetime import date, timedelta
+from uuid import UUID
 
 from fastapi import APIRouter, Depends
 
-from app.core.auth import get_token
+from app.core.auth import get_current_user_id, get_token
+from app.core.http_cache import remember_user_timezone
 from app.core.supabase import get_supabase
 
 router = APIRouter(prefix="/dashboard", tags=["dashboard"])
@@ -22,67 +30,25 @@ def _supabase(token: str = Depends(get_token)):
 
 
 @router.get("/stats")
-async def get_stats(sb=Depends(_supabase)):
+async def get_stats(
+    sb=Depends(_supabase),
+    user_id: UUID = Depends(get_current_user_id),
+):
     """
     Calculate dashboard stats in a single request:
     streak, 7-day sparkline, and latest AI analysis.
+    Days are bucketed in the user's stored time zone; the response cache
+    is told it so the ETag rolls over at that zone's midnight.
     """
-
-    # ── 1. Fetch all entries (just dates + mood + analysis fields) ───────
-    result = (
-        sb.table("entries")
-        .select("created_at, mood_score, themes, distortions, observation, analyzed")
-        .order("created_at", desc=True)
-        .execute()
-    )
-    entries = result.data or []
-
-    # ── 2. Current streak —————————————————————————————————————————————————
-    # Build set of dates that have entries
-    entry_dates: set[date] = set()
-    for e in entries:
-        entry_dates.add(date.fromisoformat(e["created_at"][:10]))
-
-    streak = 0
-    check = date.today()
-    # If today has an entry, count it; otherwise start checking from yesterday
-    if check not in entry_dates:
-        check = check - timedelta(days=1)
-    while check in entry_dates:
-        streak += 1
-        check -= timedelta(days=1)
-
-    # ── 3. 7-day mood sparkline ———————————————————————————————————————————
-    today = date.today()
-    sparkline: list[dict] = []
-    for i in range(6, -1, -1):   # 6 days ago → today
-        d = today - timedelta(days=i)
-        day_moods = [
-            e["mood_score"]
-            for e in entries
-            if e["created_at"][:10] == d.isoformat()
-            and e.get("mood_score") is not None
-        ]
-        avg = round(sum(day_moods) / len(day_moods), 1) if day_moods else None
-        sparkline.append({
-            "date": d.isoformat(),
-            "mood": avg,
-        })
-
-    # ── 4. Latest analysis ————————————————————————————————————————————————
-    latest = None
-    for e in entries:
-        if e.get("analyzed"):
-            latest = {
-                "mood_score":  e.get("mood_score"),
-                "themes":      e.get("themes"),
-                "distortions": e.get("distortions"),
-                "observation": e.get("observation"),
-            }
-            break     # entries are already sorted newest-first
+    result = await sb.rpc("dashboard_stats").execute()
+    stats = result.data or {}
+    remember_user_timezone(user_id, stats.get("timezone", "UTC"))
 
     return {
-        "current_streak":  streak,
-        "mood_sparkline":  sparkline,
-        "latest_analysis": latest,
+        "current_streak":  stats.get("current_streak", 0),
+        "mood_sparkline":  stats.get("mood_sparkline") or [],
+        "latest_analysis": stats.get("latest_analysis"),
+        "entry_count":     stats.get("entry_count", 0),
+        "timezone":        stats.get("timezone", "UTC"),
+        "timezone_set":    stats.get("timezone_set", False),
     }
@@ -2,14 +2,22 @@
 app/api/drift.py — Drift Timeline analytics endpoints.
 
 Routes:
-  GET /drift/themes          Distinct themes across the user's analyzed entries
-  GET /drift/timeline        Mood-score timeline, oldest→newest (optional ?theme filter)
+  GET /drift/themes          Distinct themes across the user's analyzed entries (optional counts)
+  GET /drift/timeline        Mood-score timeline, oldest→newest (optional ?theme filter,
+                             ?bucket=day|week|month aggregates, ?max_points downsampling)
 """
 
+import asyncio
+import re
+from datetime import date, datetime, timedelta
+from typing import Literal
+from zoneinfo import ZoneInfo
+
 from fastapi import APIRouter, Depends, Query
 
 from app.core.auth import get_token
 from app.core.supabase import get_supabase
+from app.services.downsample import lttb
 
 router = APIRouter(prefix="/drift", tags=["drift"])
 
@@ -23,39 +31,123 @@ def _supabase(token: str = Depends(get_token)):
 # ---------------------------------------------------------------------------
 
 @router.get("/themes")
-async def get_themes(sb=Depends(_supabase)):
+async def get_themes(
+    with_counts: bool = Query(default=False, description="Return [{theme, entry_count}] instead of names"),
+    sb=Depends(_supabase),
+):
     """
     Return a sorted list of all distinct themes found across the
     authenticated user's analyzed journal entries.
 
-    themes is stored as text[] — we fetch and flatten in Python to avoid
-    needing an extra RPC / pgvector function.
+    Grouping happens in Postgres over the indexed entry_themes table
+    (drift_themes RPC, entry_themes.sql).
     """
-    result = (
-        sb.table("entries")
-        .select("themes")
-        .eq("analyzed", True)
-        .not_.is_("themes", "null")
-        .execute()
-    )
-
-    themes: set[str] = set()
-    for row in result.data or []:
-        for t in (row.get("themes") or []):
-            cleaned = t.strip()
-            if cleaned:
-                themes.add(cleaned)
+    result = await sb.rpc("drift_themes").execute()
+    rows = result.data or []
 
-    return sorted(themes)
+    if with_counts:
+        return rows
+    return [row["theme"] for row in rows]
 
 
 # ---------------------------------------------------------------------------
 # GET /drift/timeline
 # ---------------------------------------------------------------------------
 
+_FRACTION_RE = re.compile(r"\.(\d+)")
+
+
+def _epoch(timestamp: str) -> float:
+    """PostgREST timestamptz → epoch seconds (pads fractions for Python 3.10)."""
+    normalised = _FRACTION_RE.sub(lambda m: "." + m.group(1).ljust(6, "0")[:6], timestamp)
+    return datetime.fromisoformat(normalised.replace("Z", "+00:00")).timestamp()
+
+
+def _rollup_stats(row: dict) -> tuple[int, float, float | None, float | None]:
+    """(count, mood_sum, mood_min, mood_max) for one daily_rollups-shaped row."""
+    return row["mood_count"], row["mood_sum"], row.get("mood_min"), row.get("mood_max")
+
+
+def _entry_rollups(entries: list[dict], tz: ZoneInfo) -> list[dict]:
+    """
+    Aggregate per-entry timeline rows (oldest first) into daily_rollups-shaped
+    rows, one per local day in *tz*. Used for theme-filtered buckets: the
+    per-theme stats in daily_rollups count an entry once per matching theme,
+    so summing them would inflate count and skew mood_mean.
+    """
+    days: list[dict] = []
+    for entry in entries:
+        score = entry["mood_score"]
+        day = datetime.fromtimestamp(_epoch(entry["created_at"]), tz).date().isoformat()
+        if not days or days[-1]["day"] != day:
+            days.append({"day": day, "mood_count": 0, "mood_sum": 0.0, "mood_min": score, "mood_max": score})
+        row = days[-1]
+        row["mood_count"] += 1
+        row["mood_sum"] += score
+        row["mood_min"] = min(row["mood_min"], score)
+        row["mood_max"] = max(row["mood_max"], score)
+    return days
+
+
+def _bucket_start(day: date, bucket: str) -> date:
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())   # Monday
+    if bucket == "month":
+        return day.replace(day=1)
+    return day
+
+
+def _bucket_rollups(rows: list[dict], bucket: str) -> list[dict]:
+    """Merge day rollups (sorted by day) into day / week / month chart points."""
+    points: list[dict] = []
+    acc: dict | None = None
+
+    for row in rows:
+        count, total, lo, hi = _rollup_stats(row)
+        if not count:
+            continue
+        key = _bucket_start(date.fromisoformat(row["day"]), bucket).isoformat()
+        if acc is None or acc["bucket"] != key:
+            acc = {"bucket": key, "count": 0, "total": 0.0, "lo": lo, "hi": hi}
+            points.append(acc)
+        acc["count"] += count
+        acc["total"] += total
+        acc["lo"] = min(acc["lo"], lo)   # count > 0 ⇒ min/max are set
+        acc["hi"] = max(acc["hi"], hi)
+
+    return [
+        {
+            "bucket":    p["bucket"],
+            "mood_mean": round(p["total"] / p["count"], 2),
+            "mood_min":  p["lo"],
+            "mood_max":  p["hi"],
+            "count":     p["count"],
+        }
+        for p in points
+    ]
+
+
+def _downsample(points: list[dict], max_points: int | None, bucketed: bool) -> list[dict]:
+    if max_points is None or len(points) <= max_points:
+        return points
+    if bucketed:
+        return lttb(
+            points, max_points,
+            x=lambda p: date.fromisoformat(p["bucket"]).toordinal(),
+            y=lambda p: p["mood_mean"],
+        )
+    return lttb(points, max_points, x=lambda p: _epoch(p["created_at"]), y=lambda p: p["mood_score"])
+
+
 @router.get("/timeline")
 async def get_timeline(
     theme: str | None = Query(default=None, description="Filter by theme substring"),
+    bucket: Literal["entry", "day", "week", "month"] = Query(
+        default="entry", description="entry = one point per entry; otherwise aggregate per period",
+    ),
+    max_points: int | None = Query(
+        default=None, ge=3, le=5000, description="Downsample to at most N points (LTTB)",
+    ),
     sb=Depends(_supabase),
 ):
     """
@@ -64,8 +156,48 @@ async def get_timeline(
 
     Optional ?theme=X parameter narrows results to entries whose themes array
     contains a case-insensitive match for X.
+
+    ?bucket=day|week|month returns one {bucket, mood_mean, mood_min, mood_max,
+    count} point per period instead, aggregated from daily_rollups
+    (O(days), not O(entries)). Weeks start on Monday. With ?theme the
+    matching entries are bucketed instead, so each counts once however
+    many of its themes match. Like the per-entry series, buckets only
+    include analyzed entries: an edited entry awaiting re-analysis drops
+    out until its new mood lands.
+
+    ?max_points=N caps the series with Largest-Triangle-Three-Buckets, which
+    keeps the chart's peaks and dips while bounding the payload.
     """
-    result = (
+    term = theme.strip().lower() if theme and theme.strip() else None
+
+    if bucket != "entry" and term:
+        # Per-entry rows (each matching entry once), bucketed by local day in
+        # the same zone as daily_rollups
+        entries, user_settings = await asyncio.gather(
+            sb.rpc("drift_timeline", {"theme_filter": theme.strip()}).execute(),
+            sb.table("user_settings").select("timezone").execute(),
+        )
+        tz = ZoneInfo(user_settings.data[0]["timezone"] if user_settings.data else "UTC")
+        points = _bucket_rollups(_entry_rollups(entries.data or [], tz), bucket)
+        return _downsample(points, max_points, bucketed=True)
+
+    if bucket != "entry":
+        rollups = await (
+            sb.table("daily_rollups")
+            .select("day, mood_sum, mood_count, mood_min, mood_max")
+            .gt("mood_count", 0)
+            .order("day", desc=False)
+            .execute()
+        )
+        points = _bucket_rollups(rollups.data or [], bucket)
+        return _downsample(points, max_points, bucketed=True)
+
+    if term:
+        # Substring match answered by the trigram index on entry_themes
+        result = await sb.rpc("drift_timeline", {"theme_filter": theme.strip()}).execute()
+        return _downsample(result.data or [], max_points, bucketed=False)
+
+    result = await (
         sb.table("entries")
         .select("id, created_at, mood_score, themes, observation")
         .eq("analyzed", True)
@@ -74,13 +206,4 @@ async def get_timeline(
         .execute()
     )
 
-    data = result.data or []
-
-    if theme:
-        term = theme.strip().lower()
-        data = [
-            row for row in data
-            if any(term in t.lower() for t in (row.get("themes") or []))
-        ]
-
-    return data
+    return _downsample(result.data or [], max_points, bucketed=False)
@@ -3,28 +3,40 @@ app/api/entries.py — Journal entry CRUD endpoints.
 
 Every endpoint:
   1. Extracts the JWT via get_token() dependency
-  2. Creates a user-scoped Supabase client (RLS applies automatically)
+  2. Gets a user-scoped handle on the shared Supabase pool (RLS applies automatically)
   3. Operates only on that user's rows
 
 Routes:
   POST   /entries          Create entry
-  GET    /entries          List entries (newest first)
+  GET    /entries          List entries (newest first, optional keyset pages)
   GET    /entries/{id}     Get single entry
   GET    /entries/{id}/analysis  Get AI analysis status (used for polling in Phase 2)
+  GET    /entries/{id}/analysis/stream  SSE push when analysis finishes or fails
   PUT    /entries/{id}     Update content
   DELETE /entries/{id}     Delete entry
 """
 
+import asyncio
+from typing import Literal
 from uuid import UUID
 
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
 
 from app.core.auth import get_current_user_id, get_token
+from app.core.config import settings
+from app.core.http_cache import bump_user_version
 from app.core.supabase import get_supabase
-from app.models.schemas import DeleteResponse, EntryCreate, EntryResponse, EntryUpdate
+from app.models.schemas import (
+    DeleteResponse, EntryCreate, EntryResponse, EntrySummary, EntryUpdate,
+)
 from app.services.ai.analyzer import embed_text
-from app.services.ai.pipeline import run_analysis_pipeline
+from app.services.events import analysis_events, analysis_payload, sse_message
+from app.services.jobs import worker_pool
+from app.services.repository import get_entry_repository
+from app.services.search import looks_like_keywords
+from app.services.vector_index import vector_index_enabled, vector_indexes
 
 router = APIRouter(prefix="/entries", tags=["entries"])
 
@@ -34,10 +46,27 @@ router = APIRouter(prefix="/entries", tags=["entries"])
 # ---------------------------------------------------------------------------
 
 def _supabase(token: str = Depends(get_token)):
-    """Dependency: return a Supabase client scoped to the request's user JWT."""
+    """Dependency: return a Supabase handle scoped to the request's user JWT."""
     return get_supabase(access_token=token)
 
 
+def _repo(token: str = Depends(get_token)):
+    """Dependency: entry read repository (asyncpg when configured, else PostgREST)."""
+    return get_entry_repository(token)
+
+
+async def _index_search(repo, user_id: UUID, embedding: list[float], limit: int) -> list[dict]:
+    """
+    match_entries via the in-process vector index: top-k ids in memory, then
+    one primary-key fetch with the caller's JWT (so RLS still decides).
+    """
+    index = await vector_indexes.get(user_id, repo.list_vectors)
+    hits = index.search(embedding, limit)
+    rows = {row["id"]: row for row in await repo.get_entries_by_ids([i for i, _ in hits])}
+    # Entries deleted by another process since the load simply drop out
+    return [{**rows[i], "similarity": score} for i, score in hits if i in rows]
+
+
 def _not_found(entry_id: UUID) -> HTTPException:
     return HTTPException(
         status_code=status.HTTP_404_NOT_FOUND,
@@ -52,34 +81,53 @@ def _not_found(entry_id: UUID) -> HTTPException:
 class SearchQuery(BaseModel):
     query: str = Field(..., min_length=1, max_length=1000)
     limit: int = Field(default=8, ge=1, le=20)
+    # auto: lexical fast path for keyword-like queries, hybrid otherwise
+    mode: Literal["auto", "hybrid", "semantic", "lexical"] = "auto"
 
 
 # ---------------------------------------------------------------------------
-# POST /entries/search — semantic vector search
+# POST /entries/search — hybrid lexical + vector search
 # (defined BEFORE /{entry_id} routes to avoid path conflicts)
 # ---------------------------------------------------------------------------
 
 @router.post("/search")
 async def search_entries(
     body: SearchQuery,
-    sb=Depends(_supabase),
+    repo=Depends(_repo),
+    user_id: UUID = Depends(get_current_user_id),
 ):
     """
-    Semantic search: embed the user's query, then call the match_entries
-    Supabase RPC which uses pgvector cosine similarity to rank results.
-    Only returns entries belonging to the authenticated user (via auth.uid()
-    inside the RPC definition).
+    Search the user's entries. Only returns entries belonging to the
+    authenticated user (auth.uid() inside every RPC).
+
+    mode:
+      auto     — keyword-like queries (names, quoted phrases) use the
+                 full-text index only, skipping the embedding call; if that
+                 finds nothing, or the query reads like prose, hybrid
+      hybrid   — full-text and pgvector rankings fused with RRF
+      semantic — pgvector cosine similarity only (match_entries), or the
+                 in-process per-user index when VECTOR_INDEX_ENABLED
+      lexical  — full-text only
     """
+    mode = body.mode
+    if mode == "auto":
+        mode = "lexical" if looks_like_keywords(body.query) else "hybrid"
 
-    # embed_text is now async (OpenAI API call) — await directly
-    embedding = await embed_text(body.query)
+    if mode == "lexical":
+        rows = await repo.lexical_search(body.query, body.limit)
+        if rows or body.mode == "lexical":
+            return rows
+        mode = "hybrid"
 
-    result = sb.rpc(
-        "match_entries",
-        {"query_embedding": embedding, "match_count": body.limit},
-    ).execute()
+    # embed_text is async (OpenAI API call, batched + cached) — await directly
+    embedding = await embed_text(body.query)
 
-    rows = result.data or []
+    if mode == "semantic" and vector_index_enabled():
+        rows = await _index_search(repo, user_id, embedding, body.limit)
+    elif mode == "semantic":
+        rows = await repo.match_entries(embedding, body.limit)
+    else:
+        rows = await repo.hybrid_search(body.query, embedding, body.limit)
 
     # Scale raw cosine similarity to feel intuitive:
     # raw 0.4 → ~70%, raw 0.57 → 100% (capped).
@@ -98,16 +146,14 @@ async def search_entries(
 @router.post("", response_model=EntryResponse, status_code=status.HTTP_201_CREATED)
 async def create_entry(
     body: EntryCreate,
-    background_tasks: BackgroundTasks,
     sb=Depends(_supabase),
-    token: str = Depends(get_token),
     user_id: UUID = Depends(get_current_user_id),
 ):
     """
-    Create a new journal entry, then immediately kick off AI analysis
-    as a background task. Response returns before analysis completes.
+    Create a new journal entry. The insert also enqueues an analysis job
+    (analysis_jobs.sql trigger); the response returns before analysis runs.
     """
-    result = (
+    result = await (
         sb.table("entries")
         .insert({"content": body.content, "user_id": str(user_id)})
         .execute()
@@ -118,14 +164,10 @@ async def create_entry(
             detail="Failed to create entry.",
         )
     entry = result.data[0]
+    bump_user_version(user_id)
 
-    # Fire-and-forget: analyse in background, response already sent
-    background_tasks.add_task(
-        run_analysis_pipeline,
-        entry_id=entry["id"],
-        content=body.content,
-        supabase_token=token,
-    )
+    # Job is already queued durably — just wake an idle worker
+    worker_pool.notify()
 
     return entry
 
@@ -134,24 +176,33 @@ async def create_entry(
 # GET /entries — list all entries (newest first)
 # ---------------------------------------------------------------------------
 
-@router.get("", response_model=list[EntryResponse])
+@router.get("", response_model=list[EntryResponse] | list[EntrySummary])
 async def list_entries(
-    sb=Depends(_supabase),
+    limit: int | None = Query(default=None, ge=1, le=100, description="Page size; omit for the full history"),
+    cursor: str | None = Query(default=None, description="Opaque cursor from a previous page's X-Next-Cursor"),
+    view: Literal["full", "summary"] = Query(default="full", description="summary = content preview only"),
+    repo=Depends(_repo),
 ):
     """
-    Return all entries belonging to the authenticated user,
+    Return entries belonging to the authenticated user,
     ordered by created_at descending (most recent first).
+
+    Pagination is keyset-based on (created_at, id): pass ?limit=N, then
+    follow the X-Next-Cursor response header (absent on the last page).
+    ?view=summary swaps `content` for a short `preview` to keep pages small.
+
+    Rows come back already JSON-shaped from the repository, so they are
+    returned directly rather than re-validated through the response model.
     """
-    result = (
-        sb.table("entries")
-        .select(
-            "id, user_id, content, created_at, updated_at, "
-            "mood_score, themes, distortions, observation, analyzed"
+    try:
+        rows, next_cursor = await repo.list_entries(
+            limit=limit, cursor=cursor, summary=(view == "summary"),
         )
-        .order("created_at", desc=True)
-        .execute()
-    )
-    return result.data or []
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return JSONResponse(content=rows, headers=headers)
 
 
 # ---------------------------------------------------------------------------
@@ -161,22 +212,13 @@ async def list_entries(
 @router.get("/{entry_id}", response_model=EntryResponse)
 async def get_entry(
     entry_id: UUID,
-    sb=Depends(_supabase),
+    repo=Depends(_repo),
 ):
     """Return a single entry by ID. 404 if not found or owned by another user."""
-    result = (
-        sb.table("entries")
-        .select(
-            "id, user_id, content, created_at, updated_at, "
-            "mood_score, themes, distortions, observation, analyzed"
-        )
-        .eq("id", str(entry_id))
-        .limit(1)
-        .execute()
-    )
-    if not result.data:
+    entry = await repo.get_entry(entry_id)
+    if entry is None:
         raise _not_found(entry_id)
-    return result.data[0]
+    return entry
 
 
 # ---------------------------------------------------------------------------
@@ -186,32 +228,84 @@ async def get_entry(
 @router.get("/{entry_id}/analysis")
 async def get_analysis(
     entry_id: UUID,
-    sb=Depends(_supabase),
+    repo=Depends(_repo),
 ):
     """
     Poll for AI analysis status.
     Returns `analyzed: true` with full insight fields once the background
     pipeline completes, or `analyzed: false` while still processing.
     """
-    result = (
-        sb.table("entries")
-        .select("id, analyzed, mood_score, themes, distortions, observation")
-        .eq("id", str(entry_id))
-        .limit(1)
-        .execute()
-    )
-    if not result.data:
+    data = await repo.get_analysis(entry_id)
+    if data is None:
         raise _not_found(entry_id)
 
-    data = result.data[0]
-    return {
-        "entry_id": data["id"],
-        "analyzed": data["analyzed"],
-        "mood_score": data.get("mood_score"),
-        "themes": data.get("themes") or [],
-        "distortions": data.get("distortions") or [],
-        "observation": data.get("observation"),
-    }
+    return analysis_payload(data)
+
+
+# ---------------------------------------------------------------------------
+# GET /entries/{id}/analysis/stream — push analysis results over SSE
+# ---------------------------------------------------------------------------
+
+@router.get("/{entry_id}/analysis/stream")
+async def stream_analysis(
+    entry_id: UUID,
+    request: Request,
+    repo=Depends(_repo),
+):
+    """
+    Server-Sent Events alternative to polling GET /entries/{id}/analysis.
+
+    Emits exactly one message, then closes:
+      event: analysis  — pipeline finished (same payload as /analysis)
+      event: failed    — pipeline stored a fallback / too-short state
+      event: timeout   — nothing arrived within SSE_TIMEOUT_SECONDS
+    A `: ping` comment is sent every SSE_HEARTBEAT_SECONDS so proxies keep
+    the connection open and dead clients are noticed.
+    """
+    # Subscribe before reading the row so a result written in between
+    # can't slip past us.
+    queue = analysis_events.subscribe(entry_id)
+    try:
+        current = await repo.get_analysis(entry_id)
+    except Exception:
+        analysis_events.unsubscribe(entry_id, queue)
+        raise
+    if current is None:
+        analysis_events.unsubscribe(entry_id, queue)
+        raise _not_found(entry_id)
+
+    async def events():
+        try:
+            if current["analyzed"]:
+                yield sse_message("analysis", analysis_payload(current))
+                return
+
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + settings.sse_timeout_seconds
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    yield sse_message("timeout", {"entry_id": str(entry_id)})
+                    return
+                try:
+                    event, payload = await asyncio.wait_for(
+                        queue.get(), timeout=min(settings.sse_heartbeat_seconds, remaining),
+                    )
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        return
+                    yield ": ping\n\n"
+                    continue
+                yield sse_message(event, payload)
+                return
+        finally:
+            analysis_events.unsubscribe(entry_id, queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -222,31 +316,26 @@ async def get_analysis(
 async def update_entry(
     entry_id: UUID,
     body: EntryUpdate,
-    background_tasks: BackgroundTasks,
     sb=Depends(_supabase),
-    token: str = Depends(get_token),
+    user_id: UUID = Depends(get_current_user_id),
 ):
     """
-    Update an entry's content and re-trigger AI analysis in the background.
-    The `updated_at` column is refreshed automatically by the Postgres trigger.
-    Returns the updated row immediately.
+    Update an entry's content. Returns the updated row immediately.
+
+    Postgres triggers refresh `updated_at` and, only if the content really
+    changed, bump `content_version`, reset `analyzed` and queue a debounced
+    re-analysis (analysis_debounce.sql) — so rapid autosaves cost one
+    analysis, and identical saves none.
     """
-    result = (
+    result = await (
         sb.table("entries")
-        .update({"content": body.content, "analyzed": False})
+        .update({"content": body.content})
         .eq("id", str(entry_id))
         .execute()
     )
     if not result.data:
         raise _not_found(entry_id)
-
-    # Re-analyse every time content changes
-    background_tasks.add_task(
-        run_analysis_pipeline,
-        entry_id=entry_id,
-        content=body.content,
-        supabase_token=token,
-    )
+    bump_user_version(user_id)
 
     return result.data[0]
 
@@ -259,13 +348,14 @@ async def update_entry(
 async def delete_entry(
     entry_id: UUID,
     sb=Depends(_supabase),
+    user_id: UUID = Depends(get_current_user_id),
 ):
     """
     Permanently delete an entry.
     RLS guarantees users can only delete their own rows.
     Returns `{id, deleted: true}` on success.
     """
-    result = (
+    result = await (
         sb.table("entries")
         .delete()
         .eq("id", str(entry_id))
@@ -273,4 +363,6 @@ async def delete_entry(
     )
     if not result.data:
         raise _not_found(entry_id)
+    bump_user_version(user_id)
+    vector_indexes.remove(user_id, entry_id)
     return {"id": entry_id, "deleted": True}
@@ -0,0 +1,35 @@
+"""
+app/api/jobs.py — Operational view of the analysis job queue.
+
+GET /jobs/stats returns queue depth and lag (analysis_job_stats RPC) plus
+this process's worker counters, for sizing ANALYSIS_WORKERS, the
+embedding coalescer's achieved batch sizes, AI cache hit rates, the
+adaptive LLM concurrency limits and the in-process vector index footprint.
+Requires the X-Admin-Token header (see require_admin).
+"""
+
+from fastapi import APIRouter, Depends
+
+from app.core.auth import require_admin
+from app.core.supabase import get_service_supabase
+from app.services.ai.analyzer import embedding_batchers
+from app.services.ai.cache import ai_cache
+from app.services.ai.limiter import limiter_stats
+from app.services.jobs import worker_pool
+from app.services.vector_index import vector_index_enabled, vector_indexes
+
+router = APIRouter(prefix="/jobs", tags=["jobs"], dependencies=[Depends(require_admin)])
+
+
+@router.get("/stats")
+async def get_job_stats():
+    """Queue depth / oldest-ready lag across all processes + local worker stats."""
+    result = await get_service_supabase().rpc("analysis_job_stats").execute()
+    return {
+        "queue": result.data,
+        "workers": worker_pool.stats(),
+        "embeddings": {p: b.stats() for p, b in embedding_batchers.items()},
+        "ai_cache": ai_cache.stats(),
+        "llm": limiter_stats(),
+        "vector_index": {"enabled": vector_index_enabled(), **vector_indexes.stats()},
+    }
@@ -0,0 +1,21 @@
+"""
+app/api/metrics.py — Prometheus scrape endpoint.
+
+GET /metrics renders this process's request latency, analysis stage and
+outcome metrics (app/core/metrics.py) in the Prometheus text format.
+Requires the X-Admin-Token header (see require_admin) — configure it as a
+scrape header, e.g. `http_headers` in the Prometheus scrape config.
+"""
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+
+from app.core.auth import require_admin
+from app.core.metrics import render_metrics
+
+router = APIRouter(tags=["meta"], dependencies=[Depends(require_admin)])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,36 @@
+"""
+app/api/profiles.py — Stored request profiles (app/core/profiling.py).
+
+GET /profiles          newest-first list of saved speedscope profiles
+GET /profiles/{name}   download one (open it at https://www.speedscope.app)
+
+Requires the X-Admin-Token header (see require_admin).
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import FileResponse
+
+from app.core.auth import require_admin
+from app.core.profiling import PROFILE_SUFFIX, list_profiles, profile_dir, profiling_enabled
+
+router = APIRouter(prefix="/profiles", tags=["profiles"], dependencies=[Depends(require_admin)])
+
+
+@router.get("")
+async def get_profiles():
+    return {
+        "enabled": profiling_enabled(),
+        "profiles": [
+            {"name": p.name, "bytes": p.stat().st_size, "modified": p.stat().st_mtime}
+            for p in list_profiles()
+        ],
+    }
+
+
+@router.get("/{name}")
+async def get_profile(name: str):
+    path = profile_dir() / name
+    # Plain file names only — no path components
+    if "/" in name or "\\" in name or not name.endswith(PROFILE_SUFFIX) or not path.is_file():
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found.")
+    return FileResponse(path, media_type="application/json", filename=name)
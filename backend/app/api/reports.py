@@ -3,6 +3,8 @@ app/api/reports.py — Weekly report CRUD + PDF export.
 
 Routes:
   POST /reports/generate     Fetch last 7 entries, synthesise AI report, save
+  POST /reports/generate/stream  Same, streaming report fields over SSE as they're written
+  (both reuse the saved report for an unchanged entry set unless ?force=true)
   GET  /reports              List all reports (newest first)
   GET  /reports/{id}         Get a single report
   GET  /reports/{id}/pdf     Generate and stream a PDF in-memory
@@ -10,15 +12,18 @@ Routes:
 
 import asyncio
 import logging
+from contextlib import aclosing
 from datetime import date, timedelta
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import JSONResponse, StreamingResponse
 
 from app.core.auth import get_current_user_id, get_token
+from app.core.http_cache import bump_user_version
 from app.core.supabase import get_supabase
-from app.services.ai.report import synthesise_report
+from app.services.ai.report import report_fingerprint, stream_report, synthesise_report
+from app.services.events import sse_message
 from app.services.pdf import generate_report_pdf
 
 logger = logging.getLogger(__name__)
@@ -37,24 +42,11 @@ def _not_found(report_id: UUID) -> HTTPException:
     )
 
 
-# ---------------------------------------------------------------------------
-# POST /reports/generate
-# ---------------------------------------------------------------------------
-
-@router.post("/generate", status_code=status.HTTP_201_CREATED)
-async def generate_report(
-    sb=Depends(_supabase),
-    token: str = Depends(get_token),
-    user_id: UUID = Depends(get_current_user_id),
-):
-    """
-    Fetch the 7 most recent analyzed entries, synthesise an AI weekly report,
-    save it to the reports table, and return the saved record.
-    """
-    # Fetch last 7 analyzed entries (newest first, trim to 7)
-    result = (
+async def _recent_entries(sb) -> list[dict]:
+    """The 7 most recent analyzed entries (newest first); 422 if there are none."""
+    result = await (
         sb.table("entries")
-        .select("id, content, created_at, mood_score, themes, observation")
+        .select("id, content, created_at, updated_at, mood_score, themes, observation")
         .eq("analyzed", True)
         .not_.is_("mood_score", "null")
         .order("created_at", desc=True)
@@ -68,24 +60,39 @@ async def generate_report(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
             detail="No analyzed entries found. Write and save some journal entries first.",
         )
+    return entries
 
-    # AI synthesis (in event loop — it's async)
-    report_data = await synthesise_report(entries)
 
-    # Determine week_start (most recent Monday)
+def _week_start() -> date:
+    """Most recent Monday."""
     today = date.today()
-    week_start = today - timedelta(days=today.weekday())
+    return today - timedelta(days=today.weekday())
 
-    # Save to Supabase
-    insert_result = (
+
+async def _existing_report(sb, fingerprint: str) -> dict | None:
+    """Newest saved report synthesised from exactly this input."""
+    result = await (
+        sb.table("reports")
+        .select("*")
+        .eq("input_fingerprint", fingerprint)
+        .order("created_at", desc=True)
+        .limit(1)
+        .execute()
+    )
+    return result.data[0] if result.data else None
+
+
+async def _save_report(sb, user_id: UUID, report_data: dict, fingerprint: str) -> dict:
+    insert_result = await (
         sb.table("reports")
         .insert({
-            "user_id":          str(user_id),
-            "week_start":       week_start.isoformat(),
-            "dominant_emotion": report_data["dominant_emotion"],
-            "top_themes":       report_data["top_themes"],
-            "emotional_arc":    report_data["emotional_arc"],
-            "ai_observation":   report_data["ai_observation"],
+            "user_id":           str(user_id),
+            "input_fingerprint": fingerprint,
+            "week_start":        _week_start().isoformat(),
+            "dominant_emotion":  report_data["dominant_emotion"],
+            "top_themes":        report_data["top_themes"],
+            "emotional_arc":     report_data["emotional_arc"],
+            "ai_observation":    report_data["ai_observation"],
         })
         .execute()
     )
@@ -96,9 +103,90 @@ async def generate_report(
             detail="Failed to save report.",
         )
 
+    bump_user_version(user_id)
     return insert_result.data[0]
 
 
+# ---------------------------------------------------------------------------
+# POST /reports/generate
+# ---------------------------------------------------------------------------
+
+@router.post("/generate", status_code=status.HTTP_201_CREATED)
+async def generate_report(
+    force: bool = Query(default=False, description="Synthesise again even if the entries are unchanged"),
+    sb=Depends(_supabase),
+    user_id: UUID = Depends(get_current_user_id),
+):
+    """
+    Fetch the 7 most recent analyzed entries, synthesise an AI weekly report,
+    save it to the reports table, and return the saved record.
+    If a report was already generated from the same entries (and prompt /
+    model), that report is returned with 200 instead.
+    """
+    entries = await _recent_entries(sb)
+    fingerprint = report_fingerprint(entries)
+
+    if not force:
+        existing = await _existing_report(sb, fingerprint)
+        if existing is not None:
+            return JSONResponse(existing, status_code=status.HTTP_200_OK)
+
+    # AI synthesis (in event loop — it's async)
+    report_data = await synthesise_report(entries)
+
+    return await _save_report(sb, user_id, report_data, fingerprint)
+
+
+# ---------------------------------------------------------------------------
+# POST /reports/generate/stream — SSE variant
+# ---------------------------------------------------------------------------
+
+@router.post("/generate/stream")
+async def generate_report_stream(
+    force: bool = Query(default=False, description="Synthesise again even if the entries are unchanged"),
+    sb=Depends(_supabase),
+    user_id: UUID = Depends(get_current_user_id),
+):
+    """
+    Like POST /reports/generate, but streams the report while the model
+    writes it. Server-Sent Events:
+      start   {week_start}
+      delta   {field, text}     appended text of a string field (e.g. emotional_arc)
+      field   {field, value}    a completed field (e.g. top_themes)
+      report  {...}             the saved report row — last event
+      error   {detail}          synthesis or save failed; nothing was saved
+    An unchanged entry set sends only start + the existing report.
+    """
+    entries = await _recent_entries(sb)   # 422 before the stream starts
+    fingerprint = report_fingerprint(entries)
+    existing = None if force else await _existing_report(sb, fingerprint)
+
+    async def events():
+        yield sse_message("start", {"week_start": _week_start().isoformat()})
+        if existing is not None:
+            yield sse_message("report", existing)
+            return
+        try:
+            # aclosing: a disconnect closes the model stream now, not at GC
+            async with aclosing(stream_report(entries)) as report_events:
+                async for event, payload in report_events:
+                    if event == "report":
+                        saved = await _save_report(sb, user_id, payload, fingerprint)
+                        yield sse_message("report", saved)
+                    else:
+                        yield sse_message(event, payload)
+        except Exception as exc:
+            logger.error("Streaming report failed for user %s: %s", user_id, exc, exc_info=True)
+            detail = exc.detail if isinstance(exc, HTTPException) else "Report generation failed."
+            yield sse_message("error", {"detail": detail})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 # ---------------------------------------------------------------------------
 # GET /reports
 # ---------------------------------------------------------------------------
@@ -106,7 +194,7 @@ async def generate_report(
 @router.get("")
 async def list_reports(sb=Depends(_supabase)):
     """Return all past reports for the authenticated user (newest first)."""
-    result = (
+    result = await (
         sb.table("reports")
         .select("id, created_at, week_start, dominant_emotion, top_themes, emotional_arc, ai_observation")
         .order("created_at", desc=True)
@@ -122,7 +210,7 @@ async def list_reports(sb=Depends(_supabase)):
 @router.get("/{report_id}")
 async def get_report(report_id: UUID, sb=Depends(_supabase)):
     """Fetch a single report."""
-    result = (
+    result = await (
         sb.table("reports")
         .select("*")
         .eq("id", str(report_id))
@@ -144,7 +232,7 @@ async def download_report_pdf(report_id: UUID, sb=Depends(_supabase)):
     Dynamically generate a PDF from the report data and stream it.
     The client receives Content-Disposition: attachment which triggers a download.
     """
-    result = (
+    result = await (
         sb.table("reports")
         .select("*")
         .eq("id", str(report_id))
@@ -0,0 +1,56 @@
+"""
+app/api/user_settings.py — Per-user settings endpoints.
+
+PUT /settings/timezone  store the IANA time zone the user's days are
+                        bucketed in (dashboard streak/sparkline, drift
+                        day buckets) and rebuild their daily rollups
+
+Changing the zone is an explicit write: GET /dashboard/stats only reads
+the stored zone, so two devices in different zones don't keep rebuilding
+the rollups back and forth.
+"""
+
+from uuid import UUID
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from pydantic import BaseModel, Field
+
+from app.core.auth import get_current_user_id, get_token
+from app.core.http_cache import bump_user_version, remember_user_timezone
+from app.core.supabase import get_supabase
+
+router = APIRouter(prefix="/settings", tags=["settings"])
+
+
+class TimezoneUpdate(BaseModel):
+    timezone: str = Field(..., min_length=1, max_length=64, description="IANA time zone, e.g. Europe/Berlin")
+
+
+def _supabase(token: str = Depends(get_token)):
+    return get_supabase(access_token=token)
+
+
+@router.put("/timezone")
+async def put_timezone(
+    body: TimezoneUpdate,
+    sb=Depends(_supabase),
+    user_id: UUID = Depends(get_current_user_id),
+):
+    """
+    Save the user's time zone. Rebuilds their daily rollups when it
+    changes (set_rollup_timezone, daily_rollups.sql); saving the current
+    zone again is a no-op.
+    """
+    try:
+        ZoneInfo(body.timezone)
+    except (ZoneInfoNotFoundError, ValueError) as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown time zone: {body.timezone}",
+        ) from exc
+
+    await sb.rpc("set_rollup_timezone", {"tz": body.timezone}).execute()
+    remember_user_timezone(user_id, body.timezone)
+    bump_user_version(user_id)
+    return {"timezone": body.timezone}
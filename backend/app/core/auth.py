@@ -8,12 +8,17 @@ policies see the correct auth.uid().
 """
 
 import base64
+import hashlib
+import hmac
 import json
+import time
 from uuid import UUID
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
+from app.core.config import settings
+
 _bearer = HTTPBearer()   # auto_error=True (default) — FastAPI registers this in OpenAPI schema
 
 
@@ -29,6 +34,12 @@ def get_token(
     return credentials.credentials
 
 
+def _b64url_decode(segment: str) -> bytes:
+    # Add padding so Python's base64 is happy
+    padded = segment + "=" * (-len(segment) % 4)
+    return base64.urlsafe_b64decode(padded)
+
+
 def _decode_jwt_payload(token: str) -> dict:
     """
     Base64url-decode the JWT payload section without signature verification.
@@ -38,10 +49,7 @@ def _decode_jwt_payload(token: str) -> dict:
         parts = token.split(".")
         if len(parts) != 3:
             raise ValueError("Not a valid JWT (expected 3 segments)")
-        # Add padding so Python's base64 is happy
-        padded = parts[1] + "=" * (4 - len(parts[1]) % 4)
-        payload_bytes = base64.urlsafe_b64decode(padded)
-        return json.loads(payload_bytes)
+        return json.loads(_b64url_decode(parts[1]))
     except Exception as exc:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -49,6 +57,51 @@ def _decode_jwt_payload(token: str) -> dict:
         ) from exc
 
 
+def verify_jwt(token: str) -> dict:
+    """
+    Verify an HS256 Supabase JWT against SUPABASE_JWT_SECRET and return its
+    claims. Needed whenever we bypass PostgREST (which normally does this)
+    and hand the claims to Postgres ourselves.
+    """
+    if not settings.supabase_jwt_secret:
+        raise RuntimeError("SUPABASE_JWT_SECRET is not set in environment.")
+
+    try:
+        header_b64, payload_b64, signature_b64 = token.split(".")
+        header = json.loads(_b64url_decode(header_b64))
+        signature = _b64url_decode(signature_b64)
+    except Exception as exc:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=f"Could not decode JWT: {exc}",
+        ) from exc
+
+    if header.get("alg") != "HS256":
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=f"Unsupported JWT algorithm: {header.get('alg')}",
+        )
+
+    expected = hmac.new(
+        settings.supabase_jwt_secret.encode(),
+        f"{header_b64}.{payload_b64}".encode(),
+        hashlib.sha256,
+    ).digest()
+    if not hmac.compare_digest(expected, signature):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid JWT signature.",
+        )
+
+    payload = _decode_jwt_payload(token)
+    if payload.get("exp") is not None and payload["exp"] < time.time():
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="JWT has expired.",
+        )
+    return payload
+
+
 def get_current_user_id(token: str = Depends(get_token)) -> UUID:
     """
     FastAPI dependency — decodes the JWT and returns the user's UUID
@@ -69,3 +122,18 @@ def get_current_user_id(token: str = Depends(get_token)) -> UUID:
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=f"Invalid user ID in token: {sub}",
         ) from exc
+
+
+def require_admin(x_admin_token: str | None = Header(default=None)) -> None:
+    """
+    FastAPI dependency for operational endpoints (queue stats, metrics).
+    Compares the X-Admin-Token header against ADMIN_TOKEN; when ADMIN_TOKEN
+    is unset the endpoints are disabled entirely.
+    """
+    if not settings.admin_token:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, settings.admin_token):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid admin token.",
+        )
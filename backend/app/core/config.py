@@ -12,14 +12,59 @@ class Settings(BaseSettings):
     supabase_url: str = ""
     supabase_key: str = ""         # anon/public key
     supabase_service_key: str = "" # service role key
+    supabase_pool_size: int = 20   # max pooled HTTP connections to PostgREST
+    supabase_timeout: float = 10.0 # seconds per PostgREST request
+    supabase_jwt_secret: str = ""  # JWT secret — required by the direct Postgres backend
+    postgrest_url: str = ""        # override for a standalone PostgREST (default: SUPABASE_URL/rest/v1)
+
+    # Direct Postgres (optional asyncpg backend). Use the session-mode /
+    # direct connection string (port 5432) — transaction-mode poolers break
+    # prepared statements.
+    database_url: str = ""
+    database_pool_size: int = 10
+
+    # In-process per-user vector index (app/services/vector_index.py; needs numpy)
+    vector_index_enabled: bool = False
+    vector_index_max_bytes: int = 256 * 1024 * 1024
+    vector_index_ttl_seconds: float = 600.0   # reload to pick up out-of-process writes
+    vector_index_quantize: bool = False       # int8 rows: 4× smaller, approximate scores
 
     # LiteLLM Proxy (OpenAI-compatible endpoint)
     litellm_api_key: str = ""
     litellm_base_url: str = ""     # must end with /v1
     litellm_model: str = "gpt-5-nano"
+    embedding_batch_window_ms: float = 5.0  # coalesce concurrent embed calls for this long (0 = off)
+    embedding_batch_max_size: int = 64      # flush early once this many texts are waiting
+    analysis_batch_max_size: int = 8        # entries per batched analysis completion (1 = off)
+    ai_cache_max_items: int = 2048          # in-process LRU of analyses/embeddings by content hash
+    ai_cache_persistent: bool = False       # also read/write public.ai_cache (ai_cache.sql)
+    llm_interactive_max_concurrency: int = 8   # AIMD ceiling for search / report calls
+    llm_background_max_concurrency: int = 16   # AIMD ceiling for analysis / backfill calls
+    llm_max_retries: int = 4                   # retries on 429 / 5xx / timeouts
+    llm_retry_max_seconds: float = 30.0        # cap on a single Retry-After / backoff wait
 
     # App
     app_env: str = "development"
+    response_cache_max_bytes: int = 32 * 1024 * 1024   # per-process GET response cache
+    response_cache_ttl_seconds: float = 300.0   # ETag / cached body lifetime (0 = until the next write)
+    sse_heartbeat_seconds: float = 15.0   # keep-alive comment interval on SSE streams
+    sse_timeout_seconds: float = 120.0    # close idle SSE streams after this long
+    admin_token: str = ""                 # X-Admin-Token for operational endpoints (unset = disabled)
+
+    # Request profiling (app/core/profiling.py; needs pyinstrument)
+    profile_dir: str = "/tmp/vesper-profiles"
+    profile_max_files: int = 50           # keep only the newest N profiles
+    profile_sample_rate: float = 0.0      # fraction of requests profiled automatically (0 = admin-only)
+    profile_slow_ms: float = 1000.0       # sampled profiles are kept only above this latency
+    profile_interval_ms: float = 1.0      # sampling interval
+
+    # Analysis job queue (analysis_jobs.sql)
+    analysis_workers: int = 4             # concurrent jobs in this process (0 = enqueue only)
+    job_backoff_base_seconds: float = 5.0 # retry delay = base * 2^(attempt-1), jittered
+    job_backoff_max_seconds: float = 600.0
+    job_lease_seconds: int = 300          # a running job older than this is reclaimed
+    job_poll_interval_seconds: float = 2.0
+    job_drain_timeout_seconds: float = 30.0  # on shutdown, wait this long for in-flight jobs
 
     # CORS — reads FRONTEND_URL env var (comma-separated list of allowed origins)
     # Example: FRONTEND_URL=https://vesper.vercel.app,http://localhost:5173
@@ -0,0 +1,188 @@
+"""
+app/core/http_cache.py — Per-user ETags and a version-keyed response cache.
+
+Every user has an in-process data version. Writes that change what the
+read endpoints return (entry create/update/delete, analysis write-back,
+report insert) call `bump_user_version(user_id)`.
+
+ConditionalGetMiddleware wraps the cacheable GET routes:
+  1. ETag = the user's current version (+ the local date for day-relative
+     stats, in the user's stored time zone), so `If-None-Match` hits
+     return 304 without touching the DB.
+  2. Otherwise the computed body is looked up in / stored into an LRU
+     cache keyed by (token hash, URL, ETag).
+The JWT is verified (auth.verify_jwt) before either, so a forged or
+expired token carrying someone else's `sub` gets neither a 304 nor that
+user's version; it falls through to the route, which rejects it. Without
+SUPABASE_JWT_SECRET the middleware can't verify and caches nothing.
+
+Versions live in process memory and embed a per-boot nonce, so ETags from
+a previous process never match. This assumes a single API process (the
+Render deployment runs one uvicorn worker); with several workers, writes
+in one would not invalidate the others.
+
+Out-of-process writers (scripts/backfill.py, scripts/rebuild_rollups.py)
+can't bump versions either, so every ETag also carries the current
+RESPONSE_CACHE_TTL_SECONDS window: cached bodies and 304s are stale for at
+most that long after such a write.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import secrets
+import time
+from collections import OrderedDict
+from datetime import datetime
+from uuid import UUID
+from zoneinfo import ZoneInfo
+
+from fastapi import HTTPException
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.core.auth import verify_jwt
+from app.core.config import settings
+
+# Exact paths whose GET responses depend only on the user's data version
+CACHEABLE_PATHS = frozenset({
+    "/entries",
+    "/dashboard/stats",
+    "/drift/themes",
+    "/drift/timeline",
+    "/reports",
+})
+
+# Routes whose output also changes when the local calendar day rolls over,
+# in the zone their days are bucketed in (see remember_user_timezone)
+_DAY_RELATIVE_PATHS = frozenset({"/dashboard/stats"})
+
+_BOOT = secrets.token_hex(4)
+
+
+# ---------------------------------------------------------------------------
+# Per-user data versions
+# ---------------------------------------------------------------------------
+
+_versions: dict[str, int] = {}
+
+
+def get_user_version(user_id: UUID | str) -> str:
+    return f"{_BOOT}.{_versions.get(str(user_id), 0)}"
+
+
+def bump_user_version(user_id: UUID | str) -> None:
+    """Invalidate every cached response / ETag for this user."""
+    key = str(user_id)
+    _versions[key] = _versions.get(key, 0) + 1
+
+
+# The user's stored time zone (user_settings.timezone), as last seen by a
+# dashboard read or set by PUT /settings/timezone. Until one is known the
+# day rolls over at UTC midnight; the next read then records the real zone.
+_timezones: dict[str, str] = {}
+
+
+def remember_user_timezone(user_id: UUID | str, tz: str) -> None:
+    _timezones[str(user_id)] = tz
+
+
+def _user_today(user_id: str) -> str:
+    try:
+        tz = ZoneInfo(_timezones.get(user_id, "UTC"))
+    except Exception:
+        tz = ZoneInfo("UTC")
+    return datetime.now(tz).date().isoformat()
+
+
+# ---------------------------------------------------------------------------
+# LRU response cache
+# ---------------------------------------------------------------------------
+
+class ResponseCache:
+    """Byte-bounded LRU of (status, headers, body) tuples."""
+
+    def __init__(self, max_bytes: int):
+        self._max_bytes = max_bytes
+        self._bytes = 0
+        self._items: OrderedDict[str, tuple[int, dict[str, str], bytes]] = OrderedDict()
+
+    def get(self, key: str) -> tuple[int, dict[str, str], bytes] | None:
+        item = self._items.get(key)
+        if item is not None:
+            self._items.move_to_end(key)
+        return item
+
+    def put(self, key: str, status: int, headers: dict[str, str], body: bytes) -> None:
+        if len(body) > self._max_bytes // 8:
+            return   # one oversized response shouldn't flush the whole cache
+        if key in self._items:
+            self._bytes -= len(self._items.pop(key)[2])
+        self._items[key] = (status, headers, body)
+        self._bytes += len(body)
+        while self._bytes > self._max_bytes and self._items:
+            _, (_, _, evicted) = self._items.popitem(last=False)
+            self._bytes -= len(evicted)
+
+
+response_cache = ResponseCache(max_bytes=settings.response_cache_max_bytes)
+
+
+# ---------------------------------------------------------------------------
+# Middleware
+# ---------------------------------------------------------------------------
+
+def _etag_for(request: Request, user_id: str) -> str:
+    tag = get_user_version(user_id)
+    if settings.response_cache_ttl_seconds > 0:
+        tag += f".{int(time.time() // settings.response_cache_ttl_seconds)}"
+    if request.url.path in _DAY_RELATIVE_PATHS:
+        tag += f".{_user_today(user_id)}"
+    return f'W/"{tag}"'
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {c.strip() for c in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates or etag.removeprefix("W/") in candidates
+
+
+class ConditionalGetMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        if request.method != "GET" or request.url.path not in CACHEABLE_PATHS:
+            return await call_next(request)
+
+        auth = request.headers.get("authorization", "")
+        token = auth[7:] if auth.lower().startswith("bearer ") else ""
+        try:
+            user_id = verify_jwt(token)["sub"]
+        except (HTTPException, KeyError, TypeError):
+            return await call_next(request)   # let the route reject it
+        except RuntimeError:
+            return await call_next(request)   # no SUPABASE_JWT_SECRET — can't verify, don't cache
+
+        # Read the version *before* the handler runs: a concurrent write can
+        # only make the stored body newer than its ETag, never older.
+        etag = _etag_for(request, user_id)
+        cache_headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Authorization"}
+
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=cache_headers)
+
+        token_hash = hashlib.sha256(token.encode()).hexdigest()
+        cache_key = f"{token_hash}|{request.url.path}?{request.url.query}|{etag}"
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            status, headers, body = cached
+            return Response(content=body, status_code=status, headers=headers)
+
+        response = await call_next(request)
+        if response.status_code != 200:
+            return response
+
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        headers = {**dict(response.headers), **cache_headers}
+        response_cache.put(cache_key, response.status_code, headers, body)
+        return Response(content=body, status_code=response.status_code, headers=headers)
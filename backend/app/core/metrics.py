@@ -0,0 +1,219 @@
+"""
+app/core/metrics.py — Prometheus-style metrics and OpenTelemetry spans.
+
+A deliberately small in-process registry (counters and histograms with
+labels) rendered in the Prometheus text exposition format by GET /metrics
+(app/api/metrics.py). Metrics are per process, like the other in-memory
+stats (/jobs/stats).
+
+  vesper_http_request_duration_seconds{method, route, status}
+      Time to response headers per route template — streaming routes are
+      measured to their first byte, cached 304s are included
+  vesper_analysis_stage_seconds{stage, outcome}
+      queue_wait      job ready (run_after) → claimed
+      analyse         analyse_entry (single-entry completion)
+      analyse_batch   analyse_entries for a claimed batch
+      embed           chunk load + embed_entry
+      write           apply_entry_chunks + entry row update
+      pipeline        the whole run_analysis_pipeline call
+  vesper_analysis_outcomes_total{outcome}
+      success, too_short, json_error, schema_error, llm_error,
+      write_error, superseded — per pipeline run, so retries count again
+      (a failed run whose fallback write also fails counts both)
+
+stage(name) times a block into the stage histogram and, when
+opentelemetry-api is installed, wraps it in a span ("analysis.<name>").
+The API alone records nothing; spans are exported once an SDK is
+configured, e.g. by running under `opentelemetry-instrument` with the
+usual OTEL_* environment variables.
+"""
+
+from __future__ import annotations
+
+import math
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Iterator
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.routing import Match
+
+try:
+    from opentelemetry import trace
+except ImportError:   # optional dependency — metrics work without it
+    trace = None
+
+_tracer = trace.get_tracer("vesper") if trace is not None else None
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Queue waits include the edit debounce and retry backoff
+STAGE_BUCKETS = LATENCY_BUCKETS + (60.0, 120.0, 300.0, 900.0)
+
+
+# ---------------------------------------------------------------------------
+# Registry
+# ---------------------------------------------------------------------------
+
+_registry: list[Counter | Histogram] = []
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._values: dict[tuple[str, ...], float] = {}
+        _registry.append(self)
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(str(labels[n]) for n in self.labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self, name: str, documentation: str, labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # label values → (per-bucket counts, not cumulative; [sum])
+        self._series: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+        _registry.append(self)
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels[n]) for n in self.labels)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = ([0] * len(self.buckets), [0.0])
+        counts, total = series
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+                break
+        total[0] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {_format_value(total[0])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {cumulative}")
+        return lines
+
+
+def render_metrics() -> str:
+    return "\n".join(line for metric in _registry for line in metric.render()) + "\n"
+
+
+# ---------------------------------------------------------------------------
+# Metrics
+# ---------------------------------------------------------------------------
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "vesper_http_request_duration_seconds",
+    "Time to response headers per route.",
+    labels=("method", "route", "status"),
+)
+
+ANALYSIS_STAGE_SECONDS = Histogram(
+    "vesper_analysis_stage_seconds",
+    "Duration of each analysis pipeline stage.",
+    labels=("stage", "outcome"),
+    buckets=STAGE_BUCKETS,
+)
+
+ANALYSIS_OUTCOMES = Counter(
+    "vesper_analysis_outcomes_total",
+    "Analysis pipeline runs by outcome.",
+    labels=("outcome",),
+)
+
+
+# ---------------------------------------------------------------------------
+# Spans
+# ---------------------------------------------------------------------------
+
+def span(name: str, **attributes):
+    """An OpenTelemetry span when opentelemetry-api is installed, else a no-op."""
+    if _tracer is None:
+        return nullcontext()
+    return _tracer.start_as_current_span(
+        name, attributes={k: str(v) for k, v in attributes.items() if v is not None},
+    )
+
+
+@contextmanager
+def stage(name: str, **attributes) -> Iterator[None]:
+    """Time a pipeline stage into vesper_analysis_stage_seconds, inside a span."""
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        with span(f"analysis.{name}", **attributes):
+            yield
+        outcome = "ok"
+    finally:
+        ANALYSIS_STAGE_SECONDS.observe(time.perf_counter() - start, stage=name, outcome=outcome)
+
+
+# ---------------------------------------------------------------------------
+# Request latency middleware
+# ---------------------------------------------------------------------------
+
+def _route_template(request: Request) -> str:
+    """The matched route's path template, so entry ids don't explode the label set."""
+    route = request.scope.get("route")   # set by the router once it has dispatched
+    if route is None:   # answered before routing, e.g. a cached 304
+        for candidate in request.app.routes:
+            match, child_scope = candidate.matches(request.scope)
+            if match == Match.FULL:
+                route = child_scope.get("route", candidate)
+                break
+    return getattr(route, "path", None) or "unmatched"
+
+
+class RequestMetricsMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        start = time.perf_counter()
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - start,
+                method=request.method,
+                route=_route_template(request),
+                status=str(status),
+            )
@@ -0,0 +1,108 @@
+"""
+app/core/pg.py — Optional direct Postgres access via an asyncpg pool.
+
+Enabled when DATABASE_URL and SUPABASE_JWT_SECRET are both set and asyncpg
+is installed; otherwise every caller falls back to the PostgREST client in
+app/core/supabase.py.
+
+RLS is preserved the same way PostgREST does it: each unit of work runs in a
+transaction that first switches to the `authenticated` role and publishes
+the verified JWT claims as `request.jwt.claims`, so `auth.uid()` in the
+policies from supabase_init.sql (and inside SECURITY INVOKER RPCs such as
+match_entries) resolves to the caller.
+
+asyncpg prepares every query it runs and keeps the prepared statement in a
+per-connection LRU cache, so repeated lookups skip parse/plan after the
+first execution on each pooled connection.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from app.core.auth import verify_jwt
+from app.core.config import settings
+
+try:
+    import asyncpg
+except ImportError:   # optional dependency — PostgREST path is the default
+    asyncpg = None
+
+logger = logging.getLogger(__name__)
+
+_pool: "asyncpg.Pool | None" = None
+_pool_lock: asyncio.Lock | None = None   # made on first use, in the running loop
+
+# Applied at the start of every RLS-scoped transaction (one round-trip).
+_SET_CLAIMS_SQL = (
+    "SELECT set_config('role', $1, true), "
+    "set_config('request.jwt.claims', $2, true)"
+)
+
+
+def pg_enabled() -> bool:
+    """True when the direct Postgres backend is configured and importable."""
+    return bool(asyncpg and settings.database_url and settings.supabase_jwt_secret)
+
+
+async def _init_connection(conn) -> None:
+    # Decode json/jsonb columns to Python objects, matching PostgREST output
+    for typename in ("json", "jsonb"):
+        await conn.set_type_codec(
+            typename, schema="pg_catalog", encoder=json.dumps, decoder=json.loads,
+        )
+
+
+async def get_pool():
+    global _pool, _pool_lock
+    if _pool is not None:
+        return _pool
+    if not pg_enabled():
+        raise RuntimeError("Direct Postgres backend is not configured.")
+    if _pool_lock is None:
+        _pool_lock = asyncio.Lock()
+    # Concurrent first requests wait for one pool instead of each creating
+    # (and leaking) their own
+    async with _pool_lock:
+        if _pool is None:
+            _pool = await asyncpg.create_pool(
+                dsn=settings.database_url,
+                min_size=1,
+                max_size=settings.database_pool_size,
+                init=_init_connection,
+            )
+            logger.info("asyncpg pool initialised (max_size=%d)", settings.database_pool_size)
+    return _pool
+
+
+async def close_pool() -> None:
+    """Close the asyncpg pool (called from the app lifespan)."""
+    global _pool, _pool_lock
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+    _pool_lock = None
+
+
+@asynccontextmanager
+async def rls_transaction(access_token: str) -> AsyncIterator["asyncpg.Connection"]:
+    """
+    Yield a pooled connection inside a transaction scoped to the JWT's user.
+
+    The role and claims are set with `is_local = true`, so they vanish at
+    COMMIT/ROLLBACK and never leak to the next borrower of the connection.
+    """
+    claims = verify_jwt(access_token)
+    pool = await get_pool()
+    async with pool.acquire() as conn:
+        async with conn.transaction():
+            await conn.execute(
+                _SET_CLAIMS_SQL,
+                claims.get("role", "authenticated"),
+                json.dumps(claims),
+            )
+            yield conn
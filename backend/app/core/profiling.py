@@ -0,0 +1,142 @@
+"""
+app/core/profiling.py — On-demand sampling profiles of single requests.
+
+ProfilingMiddleware runs pyinstrument (a statistical profiler, ~1 ms
+sampling interval, async-aware so concurrent requests don't pollute each
+other's stacks) around a request when:
+
+  1. asked to by an admin — `X-Profile: 1` header or `?profile=1`, together
+     with a valid X-Admin-Token (require_admin). The saved profile's name
+     is returned in the X-Profile response header.
+  2. sampled — PROFILE_SAMPLE_RATE of all requests are profiled, and the
+     profile is kept only if the request took at least PROFILE_SLOW_MS.
+     A slow request can't be recognised before it has run, so the sample
+     rate bounds the overhead and the threshold bounds what is stored.
+
+At most MAX_CONCURRENT profiles run at once; sampled requests beyond that
+simply aren't profiled. A profile covers the request up to its response
+headers — for streaming routes, not the stream body.
+
+Profiles are written to PROFILE_DIR as speedscope JSON (open at
+https://www.speedscope.app or with `speedscope <file>` for a flamegraph);
+only the newest PROFILE_MAX_FILES are kept. GET /profiles lists and
+downloads them (app/api/profiles.py).
+
+Requires pyinstrument; without it the middleware passes requests through.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import re
+import time
+import uuid
+from pathlib import Path
+
+from fastapi import HTTPException
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+
+from app.core.auth import require_admin
+from app.core.config import settings
+from app.core.metrics import _route_template
+
+try:
+    from pyinstrument import Profiler
+    from pyinstrument.renderers import SpeedscopeRenderer
+except ImportError:   # optional dependency — profiling disabled
+    Profiler = None
+
+logger = logging.getLogger(__name__)
+
+MAX_CONCURRENT = 2
+PROFILE_SUFFIX = ".speedscope.json"
+
+_SLUG_RE = re.compile(r"[^a-zA-Z0-9]+")
+
+
+def profiling_enabled() -> bool:
+    return Profiler is not None
+
+
+def profile_dir() -> Path:
+    return Path(settings.profile_dir)
+
+
+def list_profiles() -> list[Path]:
+    """Stored profiles, newest first."""
+    directory = profile_dir()
+    if not directory.is_dir():
+        return []
+    files = [p for p in directory.iterdir() if p.name.endswith(PROFILE_SUFFIX)]
+    return sorted(files, key=lambda p: p.stat().st_mtime, reverse=True)
+
+
+def _save(session, name: str) -> None:
+    """Render + write one profile and prune beyond PROFILE_MAX_FILES (runs in a thread)."""
+    directory = profile_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / name).write_text(SpeedscopeRenderer().render(session), encoding="utf-8")
+    for stale in list_profiles()[max(settings.profile_max_files, 1):]:
+        stale.unlink(missing_ok=True)
+
+
+def _requested(request: Request) -> bool:
+    flag = request.headers.get("x-profile") or request.query_params.get("profile")
+    if flag not in ("1", "true"):
+        return False
+    try:
+        require_admin(request.headers.get("x-admin-token"))
+    except HTTPException:
+        return False
+    return True
+
+
+class ProfilingMiddleware(BaseHTTPMiddleware):
+    def __init__(self, app):
+        super().__init__(app)
+        self._active = 0
+
+    async def dispatch(self, request: Request, call_next):
+        if Profiler is None:
+            return await call_next(request)
+
+        requested = _requested(request)
+        sampled = not requested and random.random() < settings.profile_sample_rate
+        if not (requested or sampled) or self._active >= MAX_CONCURRENT:
+            return await call_next(request)
+
+        profiler = Profiler(interval=settings.profile_interval_ms / 1000, async_mode="enabled")
+        self._active += 1
+        start = time.perf_counter()
+        profiler.start()
+        try:
+            response = await call_next(request)
+        finally:
+            session = profiler.stop()
+            self._active -= 1
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        if sampled and elapsed_ms < settings.profile_slow_ms:
+            return response
+
+        slug = _SLUG_RE.sub("_", _route_template(request)).strip("_") or "root"
+        name = (
+            f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:6]}-"
+            f"{request.method}-{slug}-{elapsed_ms:.0f}ms{PROFILE_SUFFIX}"
+        )
+        try:
+            await asyncio.to_thread(_save, session, name)
+        except OSError as exc:
+            logger.warning("Could not save profile %s: %s", name, exc)
+            return response
+
+        logger.info(
+            "Saved %s profile of %s %s (%.0f ms) as %s",
+            "requested" if requested else "slow-request", request.method, request.url.path, elapsed_ms, name,
+        )
+        if requested:
+            response.headers["X-Profile"] = name
+        return response
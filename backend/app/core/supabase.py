@@ -1,27 +1,299 @@
 """
-app/core/supabase.py — Supabase client factory.
+app/core/supabase.py — Async, pooled PostgREST data client.
 
-We use the *anon* key as the base client.
-For every authenticated request we call `.auth.set_session(token)` so that
-Postgres RLS policies (which use auth.uid()) correctly scope all queries.
+One process-wide httpx.AsyncClient holds the keep-alive connection pool to
+Supabase's PostgREST endpoint (/rest/v1). `get_supabase(token)` is cheap: it
+returns a lightweight handle that attaches the caller's JWT to each request
+it sends, so RLS policies (which use auth.uid()) scope every query while all
+users share the same sockets.
+
+The query builder mirrors the subset of the supabase-py fluent API the
+routers use, except that `.execute()` is a coroutine:
+
+    result = await sb.table("entries").select("id").eq("id", x).execute()
+    result.data  # list[dict]
 """
 
-from supabase import create_client, Client
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from typing import Any
+
+import httpx
+
 from app.core.config import settings
 
+# ---------------------------------------------------------------------------
+# Shared connection pool — lazy singleton, closed on app shutdown
+# ---------------------------------------------------------------------------
+
+_http: httpx.AsyncClient | None = None
+
+
+def _get_http() -> httpx.AsyncClient:
+    global _http
+    if _http is None:
+        if not (settings.supabase_url or settings.postgrest_url):
+            raise RuntimeError("SUPABASE_URL is not set in environment.")
+        base_url = settings.postgrest_url or f"{settings.supabase_url.rstrip('/')}/rest/v1"
+        _http = httpx.AsyncClient(
+            base_url=base_url,
+            headers={"apikey": settings.supabase_key},
+            timeout=settings.supabase_timeout,
+            limits=httpx.Limits(
+                max_connections=settings.supabase_pool_size,
+                max_keepalive_connections=settings.supabase_pool_size,
+            ),
+        )
+    return _http
+
+
+async def close_supabase() -> None:
+    """Close the shared connection pool (called from the app lifespan)."""
+    global _http
+    if _http is not None:
+        await _http.aclose()
+        _http = None
+
+
+# ---------------------------------------------------------------------------
+# Response / error types
+# ---------------------------------------------------------------------------
+
+class PostgrestError(Exception):
+    """Raised when PostgREST answers with a non-2xx status."""
+
+    def __init__(self, status_code: int, body: dict):
+        self.status_code = status_code
+        self.code = body.get("code")
+        self.message = body.get("message") or str(body)
+        self.details = body.get("details")
+        self.hint = body.get("hint")
+        super().__init__(f"PostgREST {status_code}: {self.message}")
+
+
+@dataclass
+class APIResponse:
+    data: Any
+
+
+def _format_value(value: Any) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+# ---------------------------------------------------------------------------
+# Query builders
+# ---------------------------------------------------------------------------
+
+class _NegatedFilter:
+    """Proxy returned by `.not_` — prefixes the next filter with `not.`."""
+
+    def __init__(self, builder: "QueryBuilder"):
+        self._builder = builder
+
+    def __getattr__(self, name: str):
+        method = getattr(self._builder, name)
+
+        def negated(*args, **kwargs):
+            self._builder._negate_next = True
+            return method(*args, **kwargs)
+
+        return negated
+
+
+class QueryBuilder:
+    """Fluent builder for a single PostgREST table request."""
+
+    def __init__(self, client: "SupabaseClient", table: str):
+        self._client = client
+        self._path = f"/{table}"
+        self._method = "GET"
+        self._params: list[tuple[str, str]] = []
+        self._headers: dict[str, str] = {}
+        self._body: Any = None
+        self._order: list[str] = []
+        self._negate_next = False
+
+    # ── verbs ────────────────────────────────────────────────────────────────
+
+    def select(self, columns: str = "*") -> "QueryBuilder":
+        self._params.append(("select", "".join(columns.split())))
+        return self
+
+    def insert(self, payload: dict | list[dict]) -> "QueryBuilder":
+        self._method = "POST"
+        self._body = payload
+        self._headers["Prefer"] = "return=representation"
+        return self
+
+    def upsert(self, payload: dict | list[dict], on_conflict: str | None = None) -> "QueryBuilder":
+        self._method = "POST"
+        self._body = payload
+        self._headers["Prefer"] = "return=representation,resolution=merge-duplicates"
+        if on_conflict:
+            self._params.append(("on_conflict", on_conflict))
+        return self
+
+    def update(self, payload: dict) -> "QueryBuilder":
+        self._method = "PATCH"
+        self._body = payload
+        self._headers["Prefer"] = "return=representation"
+        return self
+
+    def delete(self) -> "QueryBuilder":
+        self._method = "DELETE"
+        self._headers["Prefer"] = "return=representation"
+        return self
+
+    # ── filters ──────────────────────────────────────────────────────────────
 
-def get_supabase(access_token: str | None = None) -> Client:
+    @property
+    def not_(self) -> _NegatedFilter:
+        return _NegatedFilter(self)
+
+    def _filter(self, column: str, operator: str, value: str) -> "QueryBuilder":
+        if self._negate_next:
+            operator = f"not.{operator}"
+            self._negate_next = False
+        self._params.append((column, f"{operator}.{value}"))
+        return self
+
+    def eq(self, column: str, value: Any) -> "QueryBuilder":
+        return self._filter(column, "eq", _format_value(value))
+
+    def neq(self, column: str, value: Any) -> "QueryBuilder":
+        return self._filter(column, "neq", _format_value(value))
+
+    def gt(self, column: str, value: Any) -> "QueryBuilder":
+        return self._filter(column, "gt", _format_value(value))
+
+    def gte(self, column: str, value: Any) -> "QueryBuilder":
+        return self._filter(column, "gte", _format_value(value))
+
+    def lt(self, column: str, value: Any) -> "QueryBuilder":
+        return self._filter(column, "lt", _format_value(value))
+
+    def lte(self, column: str, value: Any) -> "QueryBuilder":
+        return self._filter(column, "lte", _format_value(value))
+
+    def is_(self, column: str, value: Any) -> "QueryBuilder":
+        return self._filter(column, "is", _format_value(value))
+
+    def in_(self, column: str, values: list[Any]) -> "QueryBuilder":
+        joined = ",".join(_format_value(v) for v in values)
+        return self._filter(column, "in", f"({joined})")
+
+    def or_(self, expression: str) -> "QueryBuilder":
+        self._params.append(("or", f"({expression})"))
+        return self
+
+    # ── modifiers ────────────────────────────────────────────────────────────
+
+    def order(self, column: str, desc: bool = False) -> "QueryBuilder":
+        # Chained calls become one `order=a.desc,b.desc` parameter
+        self._order.append(f"{column}.{'desc' if desc else 'asc'}")
+        return self
+
+    def limit(self, count: int) -> "QueryBuilder":
+        self._params.append(("limit", str(count)))
+        return self
+
+    async def execute(self) -> APIResponse:
+        params = list(self._params)
+        if self._order:
+            params.append(("order", ",".join(self._order)))
+        return await self._client._request(
+            self._method, self._path,
+            params=params, json_body=self._body, headers=self._headers,
+        )
+
+
+class RPCBuilder:
+    """Builder for POST /rpc/<fn> calls."""
+
+    def __init__(self, client: "SupabaseClient", fn: str, params: dict | None):
+        self._client = client
+        self._path = f"/rpc/{fn}"
+        self._body = params or {}
+
+    async def execute(self) -> APIResponse:
+        return await self._client._request("POST", self._path, json_body=self._body)
+
+
+# ---------------------------------------------------------------------------
+# Per-request handle
+# ---------------------------------------------------------------------------
+
+class SupabaseClient:
+    """
+    Lightweight, per-request view over the shared pool.
+    Holds only the bearer token — creating one costs nothing.
     """
-    Return a Supabase client.
 
-    If *access_token* is provided (a Supabase JWT from the frontend),
-    inject it so RLS policies evaluate auth.uid() correctly for every
-    DB operation performed with this client instance.
+    def __init__(self, access_token: str | None = None):
+        self._auth = f"Bearer {access_token or settings.supabase_key}"
+
+    def table(self, name: str) -> QueryBuilder:
+        return QueryBuilder(self, name)
+
+    def rpc(self, fn: str, params: dict | None = None) -> RPCBuilder:
+        return RPCBuilder(self, fn, params)
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        *,
+        params: list[tuple[str, str]] | None = None,
+        json_body: Any = None,
+        headers: dict[str, str] | None = None,
+    ) -> APIResponse:
+        request_headers = {"Authorization": self._auth}
+        content = None
+        if json_body is not None:
+            request_headers["Content-Type"] = "application/json"
+            content = json.dumps(json_body)
+        if headers:
+            request_headers.update(headers)
+
+        response = await _get_http().request(
+            method, path, params=params, content=content, headers=request_headers,
+        )
+
+        if response.status_code >= 400:
+            try:
+                body = response.json()
+            except ValueError:
+                body = {"message": response.text}
+            raise PostgrestError(response.status_code, body if isinstance(body, dict) else {"message": str(body)})
+
+        if not response.content:
+            return APIResponse(data=[])
+        return APIResponse(data=response.json())
+
+
+def get_supabase(access_token: str | None = None) -> SupabaseClient:
     """
-    client: Client = create_client(settings.supabase_url, settings.supabase_key)
+    Return a Supabase data handle.
+
+    If *access_token* is provided (a Supabase JWT from the frontend) it is
+    sent as the bearer token on every call, so RLS policies evaluate
+    auth.uid() correctly. Without one, calls run as the anon role.
+    """
+    return SupabaseClient(access_token)
 
-    if access_token:
-        # Set the user's JWT so every subsequent DB call is scoped to that user
-        client.postgrest.auth(access_token)
 
-    return client
+def get_service_supabase() -> SupabaseClient:
+    """
+    Return a handle authenticated with the service-role key (bypasses RLS).
+    For background work that runs without a user JWT — always filter by
+    user_id explicitly.
+    """
+    if not settings.supabase_service_key:
+        raise RuntimeError("SUPABASE_SERVICE_KEY is not set in environment.")
+    return SupabaseClient(settings.supabase_service_key)
@@ -3,10 +3,30 @@ Vesper — AI-Powered Personal Journaling Backend
 FastAPI application entry point.
 """
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.api import dashboard, drift, entries, reports
+from app.api import dashboard, drift, entries, jobs, metrics, profiles, reports, user_settings
+from app.core.http_cache import ConditionalGetMiddleware
+from app.core.metrics import RequestMetricsMiddleware
+from app.core.pg import close_pool
+from app.core.profiling import ProfilingMiddleware
+from app.core.supabase import close_supabase
+from app.services.jobs import worker_pool
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    worker_pool.start()
+    yield
+    # Drain analysis workers first — they still need the pools
+    await worker_pool.stop()
+    # Release pooled PostgREST / Postgres connections on shutdown
+    await close_supabase()
+    await close_pool()
+
 
 app = FastAPI(
     title="Vesper API",
@@ -18,6 +38,7 @@ app = FastAPI(
         "3. Copy the `eyJ...` token → click **Authorize 🔒** above → paste → Authorize"
     ),
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 # ---------------------------------------------------------------------------
@@ -26,12 +47,23 @@ app = FastAPI(
 # ---------------------------------------------------------------------------
 from app.core.config import settings
 
+# ETag / 304 + per-user response cache for the read-heavy GET routes.
+# Added before CORS so CORS stays outermost and decorates 304s too.
+app.add_middleware(ConditionalGetMiddleware)
+
+# On-demand / sampled request profiles (GET /profiles)
+app.add_middleware(ProfilingMiddleware)
+
+# Per-route latency (GET /metrics); outside the response cache so 304s count
+app.add_middleware(RequestMetricsMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 
@@ -43,6 +75,10 @@ app.include_router(entries.router)    # /entries
 app.include_router(drift.router)      # /drift
 app.include_router(reports.router)    # /reports
 app.include_router(dashboard.router)  # /dashboard
+app.include_router(user_settings.router)  # /settings
+app.include_router(jobs.router)       # /jobs (admin)
+app.include_router(metrics.router)    # /metrics (admin)
+app.include_router(profiles.router)   # /profiles (admin)
 
 
 # ---------------------------------------------------------------------------
@@ -41,6 +41,17 @@ class EntryResponse(BaseModel):
         from_attributes = True
 
 
+class EntrySummary(BaseModel):
+    """Lightweight list projection — a content preview instead of the full text."""
+    id: UUID
+    created_at: datetime
+    updated_at: datetime
+    mood_score: float | None = None
+    themes: list[str] = []
+    analyzed: bool = False
+    preview: str = ""
+
+
 # ---------------------------------------------------------------------------
 # Generic response helpers
 # ---------------------------------------------------------------------------
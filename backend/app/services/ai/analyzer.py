@@ -1,14 +1,23 @@
 """
 app/services/ai/analyzer.py — LiteLLM analysis + OpenAI text-embedding-3-small.
 
-Two public async functions:
-  analyse_entry(text) → AnalysisResult    (chat completion via gpt-5-nano)
-  embed_text(text)    → list[float]       (384-dim via text-embedding-3-small)
+Public async functions:
+  analyse_entry(text)      → AnalysisResult    (chat completion via gpt-5-nano)
+  analyse_entries(texts)   → {key: AnalysisResult | Exception}
+                                               (several entries per completion)
+  embed_text(text)         → list[float]       (384-dim via text-embedding-3-small)
+  embed_texts(texts)       → list[list[float]] (one batched embeddings request)
 
-Both use the same AsyncOpenAI client pointed at the LiteLLM proxy.
+All use the same AsyncOpenAI client pointed at the LiteLLM proxy.
 sentence-transformers removed — embedding is now done server-side via API.
+Concurrent embed_text calls are coalesced into embed_texts batches by
+`embedding_batchers` (see batching.py). analyse_entry, analyse_entries and
+embed_text consult the content-hash cache (cache.py) first. Every API call runs under
+the adaptive concurrency limiter (limiter.py).
 """
 
+import asyncio
+import hashlib
 import json
 import logging
 
@@ -16,6 +25,9 @@ from openai import AsyncOpenAI
 from pydantic import BaseModel, Field, ValidationError
 
 from app.core.config import settings
+from app.services.ai.batching import EmbeddingBatcher
+from app.services.ai.cache import ai_cache, content_key
+from app.services.ai.limiter import Priority, limited_call, llm_priority
 
 logger = logging.getLogger(__name__)
 
@@ -54,6 +66,25 @@ Valid distortion labels: Catastrophizing, All-or-nothing thinking, Mind reading,
 Overgeneralization, Emotional reasoning, Personalization, Filtering, Should statements.
 """
 
+# analyse_entries: the same per-entry instructions, several entries per request.
+# Built from SYSTEM_PROMPT, so editing that prompt changes both.
+BATCH_SYSTEM_PROMPT = SYSTEM_PROMPT + """
+You may instead be given SEVERAL journal entries, each introduced by an id in
+square brackets, e.g. [e1]. Analyse each entry independently and return ONLY
+a JSON object of this shape, with exactly one result per entry:
+{"results": [{"id": "<id>", "mood_score": ..., "themes": [...], "distortions": [...], "observation": "..."}]}
+"""
+
+# Part of every analysis cache key — editing the prompt invalidates old results
+PROMPT_VERSION = hashlib.sha256(SYSTEM_PROMPT.encode()).hexdigest()[:12]
+
+# Stored on entries (entry_backfill.sql) so stale results can be found later
+EMBEDDING_VERSION = f"{EMBEDDING_MODEL}:{EMBEDDING_DIMS}"
+
+
+def analysis_version() -> str:
+    return f"{settings.litellm_model}:{PROMPT_VERSION}"
+
 # ---------------------------------------------------------------------------
 # Pydantic output schema
 # ---------------------------------------------------------------------------
@@ -65,6 +96,14 @@ class AnalysisResult(BaseModel):
     observation: str = Field(...)
 
 
+class AnalysisJSONError(ValueError):
+    """The model's reply was not JSON."""
+
+
+class AnalysisSchemaError(ValueError):
+    """The reply was JSON but not a valid analysis object."""
+
+
 # ---------------------------------------------------------------------------
 # Shared AsyncOpenAI client (LiteLLM proxy) — lazy singleton
 # ---------------------------------------------------------------------------
@@ -82,6 +121,7 @@ def _get_client() -> AsyncOpenAI:
         _client = AsyncOpenAI(
             api_key=settings.litellm_api_key,
             base_url=settings.litellm_base_url,
+            max_retries=0,   # limited_call owns retries so it can see 429s
         )
         logger.info(
             "LiteLLM client initialised — chat: %s, embedding: %s",
@@ -99,10 +139,24 @@ async def analyse_entry(text: str) -> AnalysisResult:
     """
     Analyse a journal entry using the configured LiteLLM chat model.
     Returns a validated AnalysisResult. Raises on API or schema failure.
+    Results are cached per (model, prompt version, normalised text).
     """
+    key = content_key("analysis", analysis_version(), text)
+    cached = await ai_cache.get(key)
+    if cached is not None:
+        return AnalysisResult(**cached)
+
+    result = await _analyse_uncached(text)
+    await ai_cache.put(key, "analysis", result.model_dump())
+    return result
+
+
+async def _analyse_uncached(text: str) -> AnalysisResult:
     client = _get_client()
 
-    response = await client.chat.completions.create(
+    response = await limited_call(
+        "chat",
+        client.chat.completions.create,
         model=settings.litellm_model,
         messages=[
             {"role": "system", "content": SYSTEM_PROMPT},
@@ -112,40 +166,165 @@ async def analyse_entry(text: str) -> AnalysisResult:
         response_format={"type": "json_object"},
     )
 
-    raw = response.choices[0].message.content.strip()
+    return _normalise(_parse_json(response.choices[0].message.content))
+
+
+def _parse_json(raw: str) -> dict:
+    raw = raw.strip()
     if raw.startswith("```"):
         raw = "\n".join(raw.split("\n")[1:-1])
 
     try:
-        data = json.loads(raw)
+        return json.loads(raw)
     except json.JSONDecodeError as exc:
-        raise ValueError(f"LLM returned non-JSON: {raw[:300]}") from exc
+        raise AnalysisJSONError(f"LLM returned non-JSON: {raw[:300]}") from exc
 
-    # Normalise / clamp
+
+def _normalise(data: dict) -> AnalysisResult:
+    """Clamp / filter one analysis object and validate it."""
+    if not isinstance(data, dict):
+        raise AnalysisSchemaError(f"Expected an analysis object, got {type(data).__name__}")
     valid_lower = {d.lower(): d for d in VALID_DISTORTIONS}
-    data["distortions"] = [
-        valid_lower[d.lower()] for d in data.get("distortions", []) if d.lower() in valid_lower
-    ]
-    data["mood_score"] = max(1.0, min(10.0, float(data.get("mood_score", 5.0))))
+    try:
+        data["distortions"] = [
+            valid_lower[d.lower()] for d in data.get("distortions", []) if d.lower() in valid_lower
+        ]
+        data["mood_score"] = max(1.0, min(10.0, float(data.get("mood_score", 5.0))))
+    except (TypeError, ValueError, AttributeError) as exc:
+        raise AnalysisSchemaError(f"Schema validation failed: {exc}") from exc
     data.setdefault("themes", [])
     data.setdefault("observation", "")
 
     try:
         return AnalysisResult(**data)
     except ValidationError as exc:
-        raise ValueError(f"Schema validation failed: {exc}") from exc
+        raise AnalysisSchemaError(f"Schema validation failed: {exc}") from exc
 
 
-async def embed_text(text: str) -> list[float]:
+async def analyse_entries(texts: dict[str, str]) -> dict[str, AnalysisResult | Exception]:
     """
-    Generate a 384-dim embedding via OpenAI text-embedding-3-small through
-    the LiteLLM proxy. dimensions=384 matches the Supabase vector(384) column.
+    Analyse several entries (key → text) with as few completions as possible:
+    cache hits first, then one request per ANALYSIS_BATCH_MAX_SIZE misses.
+    Each returned item is validated on its own; items missing or invalid in
+    the batched reply are retried one by one with analyse_entry. Never
+    raises — a per-item failure is returned as the exception.
+    """
+    results: dict[str, AnalysisResult | Exception] = {}
+    misses: dict[str, str] = {}
+    for key, text in texts.items():
+        cached = await ai_cache.get(content_key("analysis", analysis_version(), text))
+        if cached is not None:
+            results[key] = AnalysisResult(**cached)
+        else:
+            misses[key] = text
+
+    size = max(1, settings.analysis_batch_max_size)
+    keys = list(misses)
+    groups = [keys[i:i + size] for i in range(0, len(keys), size)]
+    batched = await asyncio.gather(
+        *(_analyse_batch({k: misses[k] for k in group}) for group in groups if len(group) > 1)
+    )
+    for found in batched:
+        for key, result in found.items():
+            results[key] = result
+            await ai_cache.put(content_key("analysis", analysis_version(), misses[key]), "analysis", result.model_dump())
+
+    retry = [key for key in keys if key not in results]
+    if retry and len(keys) > 1:
+        logger.info("Batched analysis: %d of %d item(s) retried individually", len(retry), len(keys))
+    singles = await asyncio.gather(*(analyse_entry(misses[k]) for k in retry), return_exceptions=True)
+    results.update(zip(retry, singles))
+    return results
+
+
+async def _analyse_batch(texts: dict[str, str]) -> dict[str, AnalysisResult]:
+    """One completion for several entries; returns only the items that validated."""
+    labels = {f"e{i}": key for i, key in enumerate(texts, 1)}   # short ids save tokens
+    body = "\n\n".join(
+        f"[{label}]\n\"\"\"\n{texts[key]}\n\"\"\"" for label, key in labels.items()
+    )
+
+    client = _get_client()
+    try:
+        # Own latency kind: a multi-entry completion is slower by design and
+        # must not read as congestion against single-entry calls
+        response = await limited_call(
+            "chat_batch",
+            client.chat.completions.create,
+            model=settings.litellm_model,
+            messages=[
+                {"role": "system", "content": BATCH_SYSTEM_PROMPT},
+                {"role": "user", "content": f"Journal entries:\n\n{body}"},
+            ],
+            temperature=0.4,
+            response_format={"type": "json_object"},
+        )
+        data = _parse_json(response.choices[0].message.content)
+    except Exception as exc:
+        logger.warning("Batched analysis of %d entries failed: %s", len(texts), exc)
+        return {}
+
+    if not isinstance(data, dict):
+        logger.warning("Batched analysis of %d entries returned %s, not an object", len(texts), type(data).__name__)
+        return {}
+
+    items = data.get("results")
+    if not isinstance(items, list):   # tolerate {"e1": {...}, ...}
+        items = [{"id": label, **value} for label, value in data.items() if isinstance(value, dict)]
+
+    found: dict[str, AnalysisResult] = {}
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        key = labels.get(str(item.get("id", "")).strip("[] "))
+        if key is None or key in found:
+            continue
+        try:
+            found[key] = _normalise({k: v for k, v in item.items() if k != "id"})
+        except (ValueError, TypeError, AttributeError) as exc:
+            logger.debug("Batched analysis item %s invalid: %s", key, exc)
+    return found
+
+
+async def embed_texts(texts: list[str]) -> list[list[float]]:
+    """
+    Generate 384-dim embeddings for several texts in one request via OpenAI
+    text-embedding-3-small through the LiteLLM proxy. dimensions=384 matches
+    the Supabase vector(384) column. Order follows `texts`.
     """
     client = _get_client()
 
-    response = await client.embeddings.create(
+    response = await limited_call(
+        "embedding",
+        client.embeddings.create,
         model=EMBEDDING_MODEL,
-        input=text,
+        input=texts,
         dimensions=EMBEDDING_DIMS,
     )
-    return response.data[0].embedding
+    return [d.embedding for d in sorted(response.data, key=lambda d: d.index)]
+
+
+# One batcher per limiter budget, so a batch never mixes priorities
+embedding_batchers: dict[Priority, EmbeddingBatcher] = {
+    priority: EmbeddingBatcher(
+        embed_texts,
+        max_batch=settings.embedding_batch_max_size,
+        window_ms=settings.embedding_batch_window_ms,
+    )
+    for priority in ("interactive", "background")
+}
+
+
+async def embed_text(text: str) -> list[float]:
+    """
+    Embed one text; cached per (model, dims, normalised text), and
+    concurrent misses share a batched request.
+    """
+    key = content_key("embedding", EMBEDDING_VERSION, text)
+    cached = await ai_cache.get(key)
+    if cached is not None:
+        return cached
+
+    embedding = await embedding_batchers[llm_priority.get()].embed(text)
+    await ai_cache.put(key, "embedding", embedding)
+    return embedding
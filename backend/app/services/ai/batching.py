@@ -0,0 +1,101 @@
+"""
+app/services/ai/batching.py — Micro-batching coalescer for embedding calls.
+
+The embeddings API takes a list of inputs, so concurrent embed_text calls
+(analysis workers, searches) are collected for up to `window_ms` or
+`max_batch` items and sent as one request; each caller awaits a future
+that is resolved with its own vector. Identical texts in a batch are sent
+once.
+
+Batch-size counters are kept in-process and reported by GET /jobs/stats.
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+EmbedMany = Callable[[list[str]], Awaitable[list[list[float]]]]
+
+
+class EmbeddingBatcher:
+    """Coalesce concurrent single-text embed calls into batched requests."""
+
+    def __init__(self, embed_many: EmbedMany, *, max_batch: int, window_ms: float):
+        self._embed_many = embed_many
+        self.max_batch = max(1, max_batch)
+        self.window = max(0.0, window_ms) / 1000
+        self._pending: list[tuple[str, asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._inflight: set[asyncio.Task] = set()
+        # Metrics
+        self.batches = 0
+        self.items = 0
+        self.largest = 0
+
+    async def embed(self, text: str) -> list[float]:
+        if self.window == 0 or self.max_batch == 1:
+            self._record(1)
+            return (await self._embed_many([text]))[0]
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "largest_batch": self.largest,
+            "window_ms": self.window * 1000,
+            "max_batch": self.max_batch,
+        }
+
+    # ── internals ────────────────────────────────────────────────────────────
+
+    def _record(self, size: int) -> None:
+        self.batches += 1
+        self.items += size
+        self.largest = max(self.largest, size)
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        task = asyncio.create_task(self._send(batch))
+        self._inflight.add(task)              # keep a reference until it finishes
+        task.add_done_callback(self._inflight.discard)
+
+    async def _send(self, batch: list[tuple[str, asyncio.Future]]) -> None:
+        live = [(text, fut) for text, fut in batch if not fut.done()]   # skip cancelled callers
+        if not live:
+            return
+        unique = list(dict.fromkeys(text for text, _ in live))
+        self._record(len(live))
+        logger.debug("Embedding batch of %d (%d unique)", len(live), len(unique))
+
+        try:
+            results = await self._embed_many(unique)
+            if len(results) != len(unique):
+                raise ValueError(f"Embedding API returned {len(results)} vectors for {len(unique)} inputs")
+            vectors = dict(zip(unique, results))
+        except Exception as exc:
+            for _, fut in live:
+                if not fut.done():
+                    fut.set_exception(exc)
+            return
+
+        for text, fut in live:
+            if not fut.done():
+                fut.set_result(vectors[text])
@@ -0,0 +1,113 @@
+"""
+app/services/ai/cache.py — Content-hash cache for AI results.
+
+Autosave PUTs often resend identical (or whitespace-only different)
+content. Results are keyed on sha256 of the kind, a model/prompt
+fingerprint and the whitespace-normalised text, so unchanged content
+reuses the previous analysis or embedding, and editing SYSTEM_PROMPT or
+switching models changes every key (old entries simply age out).
+
+Two tiers:
+  1. In-process LRU (AI_CACHE_MAX_ITEMS)
+  2. Optional Postgres table public.ai_cache (ai_cache.sql), enabled by
+     AI_CACHE_PERSISTENT — survives restarts and is shared by processes.
+     Read and written with the service-role key; failures only cost a miss.
+     Reads go through ai_cache_get(), which refreshes the row's
+     last_used_at, so prune_ai_cache() evicts by disuse rather than age.
+"""
+
+import hashlib
+import logging
+import re
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any
+
+from app.core.config import settings
+from app.core.supabase import get_service_supabase
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_content(text: str) -> str:
+    """Collapse whitespace runs and trim — formatting-only edits hash equal."""
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+def content_key(kind: str, fingerprint: str, text: str) -> str:
+    raw = f"{kind}\x00{fingerprint}\x00{normalize_content(text)}"
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class ContentCache:
+    """LRU of JSON-serialisable values with an optional Postgres tier."""
+
+    def __init__(self, max_items: int, persistent: bool):
+        self.max_items = max_items
+        self.persistent = persistent
+        self._items: OrderedDict[str, Any] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, key: str) -> Any | None:
+        value = self._items.get(key)
+        if value is not None:
+            self._items.move_to_end(key)
+            self.hits += 1
+            return value
+
+        if self.persistent:
+            try:
+                result = await get_service_supabase().rpc("ai_cache_get", {"p_key": key}).execute()
+                if result.data is not None:
+                    value = result.data
+                    self._remember(key, value)
+                    self.hits += 1
+                    return value
+            except Exception as exc:
+                logger.warning("AI cache lookup failed: %s", exc)
+
+        self.misses += 1
+        return None
+
+    async def put(self, key: str, kind: str, value: Any) -> None:
+        self._remember(key, value)
+        if self.persistent:
+            try:
+                await (
+                    get_service_supabase().table("ai_cache")
+                    .upsert(
+                        {"key": key, "kind": kind, "value": value,
+                         "last_used_at": datetime.now(timezone.utc).isoformat()},
+                        on_conflict="key",
+                    )
+                    .execute()
+                )
+            except Exception as exc:
+                logger.warning("AI cache write failed: %s", exc)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "items": len(self._items),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "persistent": self.persistent,
+        }
+
+    def _remember(self, key: str, value: Any) -> None:
+        if self.max_items <= 0:
+            return
+        self._items[key] = value
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_items:
+            self._items.popitem(last=False)
+
+
+ai_cache = ContentCache(
+    max_items=settings.ai_cache_max_items,
+    persistent=settings.ai_cache_persistent,
+)
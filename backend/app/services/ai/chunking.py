@@ -0,0 +1,131 @@
+"""
+app/services/ai/chunking.py — Multi-vector embeddings for long entries.
+
+split_entry(content) cuts an entry into paragraph-anchored chunks: every
+paragraph starts a new chunk, paragraphs shorter than MIN_CHUNK_CHARS are
+joined to a neighbour, and paragraphs longer than CHUNK_CHARS are split
+on sentence boundaries (langchain-text-splitters). An edit therefore only
+changes the chunks covering the edited paragraphs.
+
+embed_entry(content, previous) embeds only chunks whose content hash is not
+in `previous` (the entry's stored chunks, see load_chunk_embeddings), and
+returns the per-chunk rows for apply_entry_chunks plus the normalised mean
+vector kept in entries.embedding (entry_chunks.sql).
+"""
+
+import asyncio
+import re
+from dataclasses import dataclass
+
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from app.services.ai.analyzer import EMBEDDING_VERSION, embed_text
+from app.services.ai.cache import content_key
+from app.services.repository import _parse_vector
+
+CHUNK_CHARS = 1200       # ≈ 300 tokens
+MIN_CHUNK_CHARS = 200    # shorter paragraphs ride along with the next one
+
+_PARAGRAPH_RE = re.compile(r"\n\s*\n")
+_splitter = RecursiveCharacterTextSplitter(
+    chunk_size=CHUNK_CHARS,
+    chunk_overlap=0,
+    separators=["\n", ". ", "? ", "! ", "; ", ", ", " ", ""],
+)
+
+
+@dataclass
+class EntryEmbedding:
+    chunks: list[dict]        # [{chunk_index, content_hash, embedding}]
+    embedding: list[float]    # normalised mean — entries.embedding
+    embedded: int             # chunks that needed an embedding call
+
+
+def split_entry(content: str) -> list[str]:
+    chunks: list[str] = []
+
+    def flush(short: str) -> None:
+        if chunks and len(chunks[-1]) + len(short) + 2 <= CHUNK_CHARS:
+            chunks[-1] = f"{chunks[-1]}\n\n{short}"
+        else:
+            chunks.append(short)
+
+    pending = ""
+    for paragraph in _PARAGRAPH_RE.split(content.strip()):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if pending:
+            joined = f"{pending}\n\n{paragraph}"
+            if len(joined) <= CHUNK_CHARS:
+                paragraph = joined
+            else:
+                flush(pending)
+            pending = ""
+        if len(paragraph) < MIN_CHUNK_CHARS:
+            pending = paragraph
+        elif len(paragraph) > CHUNK_CHARS:
+            chunks.extend(_splitter.split_text(paragraph))
+        else:
+            chunks.append(paragraph)
+    if pending:
+        flush(pending)
+    return chunks
+
+
+def chunk_hash(text: str) -> str:
+    """Same key as embed_text's cache entry, so a model change invalidates it."""
+    return content_key("embedding", EMBEDDING_VERSION, text)
+
+
+def mean_vector(vectors: list[list[float]]) -> list[float]:
+    total = [sum(column) for column in zip(*vectors)]
+    norm = sum(x * x for x in total) ** 0.5 or 1.0
+    return [x / norm for x in total]
+
+
+async def load_chunk_embeddings(sb, entry_id: str) -> dict[str, list[float]]:
+    """content_hash → embedding of the entry's stored chunks (service client)."""
+    result = await (
+        sb.table("entry_chunks")
+        .select("content_hash, embedding")
+        .eq("entry_id", entry_id)
+        .execute()
+    )
+    return {row["content_hash"]: _parse_vector(row["embedding"]) for row in result.data or []}
+
+
+async def load_chunk_embeddings_many(sb, entry_ids: list[str]) -> dict[str, dict[str, list[float]]]:
+    """entry_id → load_chunk_embeddings(entry_id), for many entries in one query."""
+    if not entry_ids:
+        return {}
+    result = await (
+        sb.table("entry_chunks")
+        .select("entry_id, content_hash, embedding")
+        .in_("entry_id", entry_ids)
+        .execute()
+    )
+    stored: dict[str, dict[str, list[float]]] = {}
+    for row in result.data or []:
+        stored.setdefault(row["entry_id"], {})[row["content_hash"]] = _parse_vector(row["embedding"])
+    return stored
+
+
+async def embed_entry(content: str, previous: dict[str, list[float]] | None = None) -> EntryEmbedding:
+    texts = split_entry(content)
+    hashes = [chunk_hash(t) for t in texts]
+    known = dict(previous or {})
+
+    missing = {h: t for h, t in zip(hashes, texts) if h not in known}
+    vectors = await asyncio.gather(*(embed_text(t) for t in missing.values()))
+    known.update(zip(missing, vectors))
+
+    chunks = [
+        {"chunk_index": i, "content_hash": h, "embedding": known[h]}
+        for i, h in enumerate(hashes)
+    ]
+    return EntryEmbedding(
+        chunks=chunks,
+        embedding=mean_vector([c["embedding"] for c in chunks]),
+        embedded=len(missing),
+    )
@@ -0,0 +1,165 @@
+"""
+app/services/ai/json_stream.py — Incremental parser for a streamed JSON object.
+
+The report model streams a flat JSON object token by token. JsonObjectStream
+is fed the raw chunks and reports, as soon as the bytes arrive:
+
+  ("delta", key, text)    new characters of a top-level *string* value
+  ("value", key, value)   a completed top-level value of any type
+
+so the UI can render `emotional_arc` while it is being written. Markdown
+fences or other text before the opening "{" are ignored. The parser never
+raises; the caller still json.loads() the full text for the final result.
+"""
+
+import json
+
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+
+class JsonObjectStream:
+    """Character-level state machine over one top-level JSON object."""
+
+    def __init__(self) -> None:
+        self._state = "before"     # before | key_wait | key | colon | value_wait | string | raw | after | done
+        self._key = ""
+        self._value = ""           # decoded string value so far
+        self._raw = ""             # raw text of a non-string value
+        self._escape = ""          # pending escape sequence ("\\", "\\u12"...)
+        self._high = ""            # high surrogate awaiting its low half
+        self._depth = 0            # nesting inside a raw value
+        self._raw_in_string = False
+        self._raw_escape = False
+
+    def feed(self, chunk: str) -> list[tuple[str, str, object]]:
+        events: list[tuple[str, str, object]] = []
+        delta = ""
+        for ch in chunk:
+            state = self._state
+            if state == "before":
+                if ch == "{":
+                    self._state = "key_wait"
+            elif state == "key_wait":
+                if ch == '"':
+                    self._key, self._state = "", "key"
+                elif ch == "}":
+                    self._state = "done"
+            elif state == "key":
+                if self._escape:
+                    self._key += ch
+                    self._escape = ""
+                elif ch == "\\":
+                    self._escape = "\\"
+                elif ch == '"':
+                    self._state = "colon"
+                else:
+                    self._key += ch
+            elif state == "colon":
+                if ch == ":":
+                    self._state = "value_wait"
+            elif state == "value_wait":
+                if ch == '"':
+                    self._value, self._state = "", "string"
+                elif not ch.isspace():
+                    self._raw, self._depth, self._state = "", 0, "raw"
+                    self._raw_in_string = self._raw_escape = False
+                    self._feed_raw(ch, events)
+            elif state == "string":
+                text = self._feed_string(ch)
+                if text is None:   # closing quote
+                    tail = self._take_high()
+                    self._value += tail
+                    delta += tail
+                    if delta:
+                        events.append(("delta", self._key, delta))
+                        delta = ""
+                    events.append(("value", self._key, self._value))
+                    self._state = "after"
+                else:
+                    self._value += text
+                    delta += text
+            elif state == "raw":
+                self._feed_raw(ch, events)
+            elif state == "after":
+                if ch == ",":
+                    self._state = "key_wait"
+                elif ch == "}":
+                    self._state = "done"
+
+        if delta:
+            events.append(("delta", self._key, delta))
+        return events
+
+    # ── helpers ──────────────────────────────────────────────────────────────
+
+    def _feed_string(self, ch: str) -> str | None:
+        """Decode one character of a string value; None means end of string."""
+        if self._escape:
+            self._escape += ch
+            if self._escape[1] != "u":
+                self._escape = ""
+                return self._take_high() + _ESCAPES.get(ch, ch)
+            if len(self._escape) < 6:
+                return ""
+            try:
+                code = int(self._escape[2:], 16)
+            except ValueError:
+                code = None
+            self._escape = ""
+            if code is None:
+                return self._take_high()
+            if 0xDC00 <= code <= 0xDFFF and self._high:
+                # Low half of a surrogate pair (chunks may split between them)
+                high = ord(self._high)
+                self._high = ""
+                return chr(0x10000 + ((high - 0xD800) << 10) + (code - 0xDC00))
+            out = self._take_high()
+            if 0xD800 <= code <= 0xDBFF:
+                self._high = chr(code)
+                return out
+            return out + chr(code)
+        if ch == "\\":
+            self._escape = "\\"
+            return ""
+        if ch == '"':
+            return None
+        return self._take_high() + ch
+
+    def _take_high(self) -> str:
+        """A pending high surrogate that wasn't followed by its low half."""
+        high, self._high = self._high, ""
+        return high
+
+    def _feed_raw(self, ch: str, events: list) -> None:
+        """Accumulate an array / object / number / literal until it ends."""
+        if self._raw_in_string:
+            self._raw += ch
+            if self._raw_escape:
+                self._raw_escape = False
+            elif ch == "\\":
+                self._raw_escape = True
+            elif ch == '"':
+                self._raw_in_string = False
+            return
+
+        if self._depth == 0 and ch in ",}":
+            self._finish_raw(events)
+            self._state = "key_wait" if ch == "," else "done"
+            return
+
+        self._raw += ch
+        if ch == '"':
+            self._raw_in_string = True
+        elif ch in "[{":
+            self._depth += 1
+        elif ch in "]}":
+            self._depth -= 1
+            if self._depth == 0:
+                self._finish_raw(events)
+                self._state = "after"
+
+    def _finish_raw(self, events: list) -> None:
+        try:
+            events.append(("value", self._key, json.loads(self._raw)))
+        except ValueError:
+            pass
@@ -0,0 +1,212 @@
+"""
+app/services/ai/limiter.py — Adaptive concurrency limits for LiteLLM calls.
+
+Every chat / embedding request goes through `limited_call`, which:
+
+  1. Waits out any proxy-wide cooldown set by a 429's Retry-After
+  2. Takes a slot from the caller's budget — "interactive" (search,
+     reports; the default) or "background" (analysis workers, backfill),
+     chosen by the `llm_priority` context variable
+  3. Adjusts that budget with AIMD: +1/limit per fast success, ×0.5 on a
+     429 / 5xx / timeout or a call much slower than the usual latency
+  4. Retries throttled and transient failures (Retry-After or jittered
+     exponential backoff) before giving up
+
+The OpenAI SDK's own retries are disabled (max_retries=0 in _get_client)
+so 429s reach the limiter instead of being absorbed silently.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Literal, TypeVar
+
+from openai import APIConnectionError, APIStatusError, APITimeoutError, RateLimitError
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+Priority = Literal["interactive", "background"]
+
+# Set to "background" by the analysis workers / batch scripts
+llm_priority: ContextVar[Priority] = ContextVar("llm_priority", default="interactive")
+
+T = TypeVar("T")
+
+_SLOW_FACTOR = 2.0        # latency > 2× its moving average counts as congestion
+_DECREASE_GAP = 1.0       # seconds — one multiplicative decrease per burst of errors
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit between `min_limit` and `max_limit`."""
+
+    def __init__(self, name: str, *, max_limit: int, min_limit: int = 1):
+        self.name = name
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = float(max(self.min_limit, self.max_limit // 2))
+        self._in_flight = 0
+        self._cond: asyncio.Condition | None = None   # made in the running loop, see _condition
+        self._cond_loop: asyncio.AbstractEventLoop | None = None
+        self._latency: dict[str, float] = {}   # EWMA per call kind
+        self._last_decrease = 0.0
+        # Metrics
+        self.successes = 0
+        self.overloads = 0
+        self.decreases = 0
+
+    def _condition(self) -> asyncio.Condition:
+        """
+        The slot condition of the running loop. The module-level limiters are
+        built at import time, before any loop runs, and a condition is bound
+        to the loop that first waits on it.
+        """
+        loop = asyncio.get_running_loop()
+        if self._cond is None or self._cond_loop is not loop:
+            self._cond, self._cond_loop = asyncio.Condition(), loop
+        return self._cond
+
+    @asynccontextmanager
+    async def slot(self):
+        cond = self._condition()
+        async with cond:
+            await cond.wait_for(lambda: self._in_flight < int(self.limit))
+            self._in_flight += 1
+        try:
+            yield
+        finally:
+            async with cond:
+                self._in_flight -= 1
+                cond.notify_all()
+
+    def on_success(self, kind: str, latency: float) -> None:
+        self.successes += 1
+        average = self._latency.get(kind)
+        self._latency[kind] = latency if average is None else 0.9 * average + 0.1 * latency
+        if average is not None and latency > _SLOW_FACTOR * average:
+            self._decrease()
+        else:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def on_overload(self) -> None:
+        self.overloads += 1
+        self._decrease()
+
+    def _decrease(self) -> None:
+        now = time.monotonic()
+        if now - self._last_decrease < _DECREASE_GAP:
+            return
+        self._last_decrease = now
+        self.limit = max(self.min_limit, self.limit * 0.5)
+        self.decreases += 1
+        logger.info("LLM %s concurrency limit reduced to %d", self.name, int(self.limit))
+
+    def stats(self) -> dict:
+        return {
+            "limit": int(self.limit),
+            "max_limit": self.max_limit,
+            "in_flight": self._in_flight,
+            "successes": self.successes,
+            "overloads": self.overloads,
+            "decreases": self.decreases,
+            "latency_ewma_ms": {k: round(v * 1000, 1) for k, v in self._latency.items()},
+        }
+
+
+limiters: dict[Priority, AdaptiveLimiter] = {
+    "interactive": AdaptiveLimiter("interactive", max_limit=settings.llm_interactive_max_concurrency),
+    "background": AdaptiveLimiter("background", max_limit=settings.llm_background_max_concurrency),
+}
+
+# Proxy-wide pause from the most recent Retry-After (monotonic deadline)
+_cooldown_until = 0.0
+
+
+# ---------------------------------------------------------------------------
+# Retry helpers
+# ---------------------------------------------------------------------------
+
+def _retry_after(exc: Exception) -> float | None:
+    """Seconds from a Retry-After / retry-after-ms header, if present."""
+    response = getattr(exc, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+    try:
+        if "retry-after-ms" in headers:
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if value is None:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_retryable(exc: Exception) -> bool:
+    if isinstance(exc, (RateLimitError, APITimeoutError, APIConnectionError)):
+        return True
+    return isinstance(exc, APIStatusError) and exc.status_code >= 500
+
+
+def _backoff(attempt: int) -> float:
+    ceiling = min(settings.llm_retry_max_seconds, 0.5 * 2 ** attempt)
+    return random.uniform(ceiling / 2, ceiling)
+
+
+# ---------------------------------------------------------------------------
+# Public API
+# ---------------------------------------------------------------------------
+
+async def limited_call(kind: str, fn: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any) -> T:
+    """Run `fn(*args, **kwargs)` under the current priority's adaptive limit."""
+    global _cooldown_until
+    limiter = limiters[llm_priority.get()]
+
+    for attempt in range(settings.llm_max_retries + 1):
+        wait = _cooldown_until - time.monotonic()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+        async with limiter.slot():
+            started = time.monotonic()
+            try:
+                result = await fn(*args, **kwargs)
+            except Exception as exc:
+                if not _is_retryable(exc):
+                    raise
+                limiter.on_overload()
+                if attempt == settings.llm_max_retries:
+                    raise
+                retry_after = _retry_after(exc)
+                if retry_after is not None:
+                    delay = min(retry_after, settings.llm_retry_max_seconds)
+                    _cooldown_until = max(_cooldown_until, time.monotonic() + delay)
+                else:
+                    delay = _backoff(attempt)
+                logger.warning(
+                    "LLM %s call failed (%s) — retry %d/%d in %.1fs",
+                    kind, type(exc).__name__, attempt + 1, settings.llm_max_retries, delay,
+                )
+            else:
+                limiter.on_success(kind, time.monotonic() - started)
+                return result
+
+        await asyncio.sleep(delay)   # outside the slot, so others can proceed
+
+    raise AssertionError("unreachable")
+
+
+def limiter_stats() -> dict:
+    return {
+        "cooldown_seconds": round(max(0.0, _cooldown_until - time.monotonic()), 1),
+        **{name: limiter.stats() for name, limiter in limiters.items()},
+    }
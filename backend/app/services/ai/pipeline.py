@@ -1,16 +1,30 @@
 """
-app/services/ai/pipeline.py — Async AI analysis background task.
+app/services/ai/pipeline.py — Async AI analysis job body.
 
-run_analysis_pipeline(entry_id, content, supabase_token) is called by
-FastAPI's BackgroundTasks immediately after an entry is saved. It:
+run_analysis_pipeline(entry_id, content, user_id) is run by the analysis
+worker pool (app/services/jobs.py) for every queued job. It:
 
-  1. Runs the LangChain/Gemini analysis chain (async)
-  2. Generates a sentence-transformers embedding (sync, in thread pool)
-  3. Updates the entry row in Supabase with results + analyzed = true
+  1. Runs the LLM analysis and the chunk embeddings concurrently (async);
+     only chunks whose text changed since the last run are embedded
+  2. Updates the entry row through the shared async Supabase pool, then
+     replaces its entry_chunks rows (entry_chunks.sql)
+  3. Refreshes the user's in-process vector index, if one is loaded
 
-On any failure:
+Jobs outlive the user's JWT, so writes use the service-role key and are
+pinned to the owner with an explicit user_id filter. When the job passes
+the entry's content_version, the write also requires it to be unchanged:
+if the entry was edited mid-analysis the stale result is dropped and the
+newer queued job publishes instead (analysis_debounce.sql).
+
+On failure, if the job has retries left the exception propagates so the
+worker can back off and retry. On the final attempt:
   - Sets analyzed = false and observation = "Analysis unavailable"
   - Logs the error — entry is always safe in the DB.
+
+Either way, listeners on GET /entries/{id}/analysis/stream are notified.
+
+The analyse / embed / write stages are timed and traced, and every run
+counts one outcome (app/core/metrics.py).
 """
 
 import asyncio
@@ -18,8 +32,21 @@ import json
 import logging
 from uuid import UUID
 
-from app.core.supabase import get_supabase
-from app.services.ai.analyzer import AnalysisResult, analyse_entry, embed_text
+from app.core.http_cache import bump_user_version
+from app.core.metrics import ANALYSIS_OUTCOMES, stage
+from app.core.supabase import get_service_supabase
+from app.services.ai.analyzer import (
+    EMBEDDING_VERSION,
+    AnalysisJSONError,
+    AnalysisResult,
+    AnalysisSchemaError,
+    analyse_entry,
+    analysis_version,
+)
+from app.services.ai.chunking import EntryEmbedding, embed_entry, load_chunk_embeddings
+from app.services.events import analysis_events, analysis_payload
+from app.services.repository import ANALYSIS_COLUMNS
+from app.services.vector_index import vector_indexes
 
 logger = logging.getLogger(__name__)
 
@@ -27,43 +54,85 @@ logger = logging.getLogger(__name__)
 MIN_WORDS = 20
 
 
+def _failure_outcome(exc: Exception) -> str:
+    if isinstance(exc, AnalysisJSONError):
+        return "json_error"
+    if isinstance(exc, AnalysisSchemaError):
+        return "schema_error"
+    return "llm_error"
+
+
 async def run_analysis_pipeline(
     entry_id: UUID,
     content: str,
-    supabase_token: str,
+    user_id: UUID,
+    *,
+    content_version: int | None = None,
+    final_attempt: bool = True,
+    precomputed: AnalysisResult | Exception | None = None,
 ) -> None:
     """
-    Background task: analyse `content`, store results back to the entry row.
+    Analyse `content` and store results back to the entry row.
+
+    With final_attempt=False, AI or DB failures are re-raised instead of
+    storing the fallback state, so the caller can retry later.
 
-    Uses the caller's JWT so Supabase RLS lets us UPDATE the correct row.
-    FastAPI runs this in the background — the HTTP response has already been
-    sent to the frontend by the time this executes.
+    `precomputed` is this entry's outcome from a batched analyse_entries
+    call (the worker pool batches queued jobs); an exception there counts
+    as the analysis failing.
     """
     entry_id_str = str(entry_id)
-    sb = get_supabase(access_token=supabase_token)
+    sb = get_service_supabase()
+
+    def _entry_row():
+        query = sb.table("entries").eq("id", entry_id_str).eq("user_id", str(user_id))
+        if content_version is not None:
+            query = query.eq("content_version", content_version)
+        return query
 
     # Guard: skip very short entries
     word_count = len(content.strip().split())
     if word_count < MIN_WORDS:
         logger.info("Entry %s too short (%d words) — skipping analysis.", entry_id_str, word_count)
-        sb.table("entries").update({
+        ANALYSIS_OUTCOMES.inc(outcome="too_short")
+        result = await _entry_row().update({
             "analyzed": False,
             "observation": f"Write at least {MIN_WORDS} words for AI insights.",
-        }).eq("id", entry_id_str).execute()
+        }).select(ANALYSIS_COLUMNS).execute()
+        if result.data:
+            bump_user_version(user_id)
+            analysis_events.publish(entry_id_str, "failed", analysis_payload(result.data[0]))
         return
 
     # ---- 1. Run LLM analysis + embedding concurrently (both are async I/O calls) ----
     analysis: AnalysisResult | None = None
-    embedding: list[float] | None = None
+    embedding: EntryEmbedding | None = None
     error_msg: str | None = None
 
+    async def _analyse() -> AnalysisResult:
+        if isinstance(precomputed, Exception):
+            raise precomputed
+        if precomputed is not None:
+            return precomputed   # timed as the worker's analyse_batch stage
+        with stage("analyse", entry_id=entry_id_str):
+            return await analyse_entry(content)
+
+    async def _embed() -> EntryEmbedding:
+        with stage("embed", entry_id=entry_id_str):
+            previous = await load_chunk_embeddings(sb, entry_id_str)
+            return await embed_entry(content, previous)
+
     try:
         analysis, embedding = await asyncio.gather(
-            analyse_entry(content),
-            embed_text(content),
+            _analyse(),
+            _embed(),
         )
 
     except Exception as exc:
+        ANALYSIS_OUTCOMES.inc(outcome=_failure_outcome(exc))
+        if not final_attempt:
+            logger.warning("AI analysis failed for entry %s (will retry): %s", entry_id_str, exc)
+            raise
         logger.error("AI analysis failed for entry %s: %s", entry_id_str, exc, exc_info=True)
         error_msg = str(exc)
 
@@ -77,14 +146,18 @@ async def run_analysis_pipeline(
             # Store distortions as list of {label} dicts to match jsonb schema
             "distortions": [{"label": d} for d in analysis.distortions],
             "observation": analysis.observation,
-            "embedding": embedding,   # pgvector accepts a plain list of floats
+            "embedding": embedding.embedding,   # pgvector accepts a plain list of floats
+            "analysis_version": analysis_version(),
+            "embedding_version": EMBEDDING_VERSION,
         }
         logger.info(
-            "Entry %s analysed — mood=%.1f themes=%s distortions=%s",
+            "Entry %s analysed — mood=%.1f themes=%s distortions=%s chunks=%d (%d embedded)",
             entry_id_str,
             analysis.mood_score,
             analysis.themes,
             analysis.distortions,
+            len(embedding.chunks),
+            embedding.embedded,
         )
     else:
         # Failure path — mark as unanalyzed with a user-facing fallback
@@ -96,9 +169,40 @@ async def run_analysis_pipeline(
 
     # ---- 3. Write back to Supabase ----
     try:
-        sb.table("entries").update(update_payload).eq("id", entry_id_str).execute()
+        with stage("write", entry_id=entry_id_str):
+            if "embedding" in update_payload:
+                # Chunks first: a retry after a failed row update then re-embeds nothing
+                await sb.rpc("apply_entry_chunks", {"p_rows": [{
+                    "id": entry_id_str,
+                    "content_version": content_version,
+                    "chunks": embedding.chunks,
+                }]}).execute()
+            result = await (
+                _entry_row()
+                .update(update_payload)
+                .select(ANALYSIS_COLUMNS)   # don't echo the embedding back
+                .execute()
+            )
     except Exception as db_exc:
+        ANALYSIS_OUTCOMES.inc(outcome="write_error")
+        if not final_attempt:
+            raise
         logger.error(
             "Failed to write analysis results to DB for entry %s: %s",
             entry_id_str, db_exc, exc_info=True
         )
+        analysis_events.publish(entry_id_str, "failed", analysis_payload({"id": entry_id_str, **update_payload}))
+        return
+
+    # ---- 4. Notify SSE listeners with the row as stored (unless superseded) ----
+    if not result.data:
+        logger.info("Entry %s changed or was deleted during analysis — result dropped.", entry_id_str)
+        ANALYSIS_OUTCOMES.inc(outcome="superseded")
+        return
+
+    bump_user_version(user_id)
+    if "embedding" in update_payload:
+        ANALYSIS_OUTCOMES.inc(outcome="success")
+        vector_indexes.upsert(user_id, entry_id_str, [c["embedding"] for c in embedding.chunks])
+    event = "analysis" if result.data[0].get("analyzed") else "failed"
+    analysis_events.publish(entry_id_str, event, analysis_payload(result.data[0]))
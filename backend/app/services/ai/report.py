@@ -3,13 +3,25 @@ app/services/ai/report.py — AI weekly report synthesis via LiteLLM.
 
 synthesise_report(entries) ingests a list of entry dicts and returns a
 structured dict: {dominant_emotion, top_themes, emotional_arc, ai_observation}.
+
+stream_report(entries) is the streaming variant: it yields report fields
+incrementally as the completion's tokens arrive (see json_stream.py) and
+finally the same normalised dict.
+
+report_fingerprint(entries) identifies a synthesis input (entry ids +
+updated_at, model, prompt version) so identical requests reuse the saved
+report (report_fingerprint.sql).
 """
 
+import hashlib
 import json
 import logging
+from typing import AsyncIterator
 
 from app.core.config import settings
 from app.services.ai.analyzer import _get_client
+from app.services.ai.json_stream import JsonObjectStream
+from app.services.ai.limiter import limited_call
 
 logger = logging.getLogger(__name__)
 
@@ -27,17 +39,25 @@ JSON schema (respond with exactly this shape):
 }
 """
 
+REPORT_PROMPT_VERSION = hashlib.sha256(REPORT_SYSTEM_PROMPT.encode()).hexdigest()[:12]
 
-async def synthesise_report(entries: list[dict]) -> dict:
+
+def report_fingerprint(entries: list[dict]) -> str:
     """
-    Synthesise a weekly psychological report from a list of entry dicts.
-    Each entry should have at least: content, mood_score, themes, observation, created_at.
-    Returns the structured report dict.
+    Hash of everything a report depends on. Entries need `id` and
+    `updated_at`; analysis write-backs bump updated_at too, so re-analysed
+    entries produce a new fingerprint.
     """
+    inputs = sorted(f"{e['id']}@{e['updated_at']}" for e in entries)
+    raw = "\n".join([settings.litellm_model, REPORT_PROMPT_VERSION, *inputs])
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _build_messages(entries: list[dict]) -> list[dict]:
+    """Build a compact digest of entries for the prompt."""
     if not entries:
         raise ValueError("No entries to synthesise — at least one entry is required.")
 
-    # Build a compact digest of entries for the prompt
     lines: list[str] = []
     for i, e in enumerate(entries, 1):
         mood = f"{e.get('mood_score', '?'):.1f}" if e.get('mood_score') is not None else "?"
@@ -52,19 +72,15 @@ async def synthesise_report(entries: list[dict]) -> dict:
 
     digest = "\n\n".join(lines)
     user_message = f"Here are the journal entries to analyse:\n\n{digest}"
+    return [
+        {"role": "system", "content": REPORT_SYSTEM_PROMPT},
+        {"role": "user",   "content": user_message},
+    ]
 
-    client = _get_client()
-    response = await client.chat.completions.create(
-        model=settings.litellm_model,
-        messages=[
-            {"role": "system", "content": REPORT_SYSTEM_PROMPT},
-            {"role": "user",   "content": user_message},
-        ],
-        temperature=0.5,
-        response_format={"type": "json_object"},
-    )
 
-    raw = response.choices[0].message.content.strip()
+def _parse_report(raw: str) -> dict:
+    """Parse and normalise the model's JSON reply."""
+    raw = raw.strip()
     if raw.startswith("```"):
         raw = "\n".join(raw.split("\n")[1:-1])
 
@@ -88,3 +104,68 @@ async def synthesise_report(entries: list[dict]) -> dict:
         data["top_themes"],
     )
     return data
+
+
+async def synthesise_report(entries: list[dict]) -> dict:
+    """
+    Synthesise a weekly psychological report from a list of entry dicts.
+    Each entry should have at least: content, mood_score, themes, observation, created_at.
+    Returns the structured report dict.
+    """
+    messages = _build_messages(entries)
+
+    client = _get_client()
+    response = await limited_call(
+        "chat",
+        client.chat.completions.create,
+        model=settings.litellm_model,
+        messages=messages,
+        temperature=0.5,
+        response_format={"type": "json_object"},
+    )
+    return _parse_report(response.choices[0].message.content)
+
+
+async def stream_report(entries: list[dict]) -> AsyncIterator[tuple[str, dict]]:
+    """
+    Streaming synthesise_report. Yields:
+      ("delta", {"field", "text"})   new characters of a string field
+      ("field", {"field", "value"})  a field whose value is complete
+      ("report", {...})              the final normalised report dict
+    Raises like synthesise_report if the completed text is not valid JSON.
+    """
+    messages = _build_messages(entries)
+
+    client = _get_client()
+    # The limiter slot covers the request up to the response headers;
+    # tokens are then read outside it. Its own kind, so time-to-headers
+    # doesn't drag down the latency average of whole completions.
+    stream = await limited_call(
+        "chat_stream",
+        client.chat.completions.create,
+        model=settings.litellm_model,
+        messages=messages,
+        temperature=0.5,
+        response_format={"type": "json_object"},
+        stream=True,
+    )
+
+    parser = JsonObjectStream()
+    parts: list[str] = []
+    # Closing the stream releases the upstream connection when the consumer
+    # stops early (client disconnect → aclose() / cancellation)
+    async with stream:
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            text = chunk.choices[0].delta.content or ""
+            if not text:
+                continue
+            parts.append(text)
+            for kind, field, value in parser.feed(text):
+                if kind == "delta":
+                    yield "delta", {"field": field, "text": value}
+                else:
+                    yield "field", {"field": field, "value": value}
+
+    yield "report", _parse_report("".join(parts))
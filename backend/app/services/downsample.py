@@ -0,0 +1,61 @@
+"""
+app/services/downsample.py — Shape-preserving downsampling for chart series.
+
+lttb(points, threshold, x, y) implements Largest-Triangle-Three-Buckets
+(Steinarsson, 2013): it keeps the first and last point and, from each of
+`threshold - 2` equal-width buckets in between, the point forming the
+largest triangle with the previously kept point and the next bucket's
+average. Peaks and dips survive, unlike plain striding or averaging.
+
+Points are arbitrary objects (the API's row dicts); `x` and `y` extract
+numeric coordinates, and the selected originals are returned unchanged.
+"""
+
+from typing import Callable, Sequence, TypeVar
+
+T = TypeVar("T")
+
+
+def lttb(
+    points: Sequence[T],
+    threshold: int,
+    x: Callable[[T], float],
+    y: Callable[[T], float],
+) -> list[T]:
+    """Return at most `threshold` points of `points` (assumed sorted by x)."""
+    n = len(points)
+    if threshold >= n:
+        return list(points)
+    if threshold < 3:
+        return [points[0], points[-1]][:max(threshold, 0)]
+
+    xs = [x(p) for p in points]
+    ys = [y(p) for p in points]
+
+    sampled = [points[0]]
+    every = (n - 2) / (threshold - 2)
+    a = 0   # index of the last selected point
+
+    for i in range(threshold - 2):
+        # Average of the *next* bucket — the triangle's third vertex
+        next_start = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        span = next_end - next_start
+        avg_x = sum(xs[next_start:next_end]) / span
+        avg_y = sum(ys[next_start:next_end]) / span
+
+        # Pick the point in the current bucket with the largest triangle area
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        ax, ay = xs[a], ys[a]
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+
+        sampled.append(points[best])
+        a = best
+
+    sampled.append(points[-1])
+    return sampled
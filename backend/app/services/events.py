@@ -0,0 +1,70 @@
+"""
+app/services/events.py — In-process pub/sub for analysis completion.
+
+run_analysis_pipeline publishes to `analysis_events` once it has written an
+entry's results (or its fallback state) back to the database; the SSE
+route GET /entries/{id}/analysis/stream subscribes per entry and forwards
+the first event to the browser, replacing the old 3-second polling loop.
+
+Like the ETag versions, subscribers live in process memory: the pipeline
+and the SSE connection must run in the same API process.
+"""
+
+import asyncio
+import json
+import logging
+from collections import defaultdict
+
+logger = logging.getLogger(__name__)
+
+
+def analysis_payload(row: dict) -> dict:
+    """The body returned by GET /entries/{id}/analysis for an entry row."""
+    return {
+        "entry_id": row["id"],
+        "analyzed": row["analyzed"],
+        "mood_score": row.get("mood_score"),
+        "themes": row.get("themes") or [],
+        "distortions": row.get("distortions") or [],
+        "observation": row.get("observation"),
+    }
+
+
+def sse_message(event: str, data: dict) -> str:
+    """Format one Server-Sent Events message."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+class AnalysisEvents:
+    """Fan-out of (event, payload) tuples to per-entry subscriber queues."""
+
+    def __init__(self) -> None:
+        self._subscribers: dict[str, set[asyncio.Queue]] = defaultdict(set)
+
+    def subscribe(self, entry_id) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers[str(entry_id)].add(queue)
+        return queue
+
+    def unsubscribe(self, entry_id, queue: asyncio.Queue) -> None:
+        key = str(entry_id)
+        subscribers = self._subscribers.get(key)
+        if subscribers is None:
+            return
+        subscribers.discard(queue)
+        if not subscribers:
+            del self._subscribers[key]
+
+    def publish(self, entry_id, event: str, payload: dict) -> None:
+        subscribers = self._subscribers.get(str(entry_id), ())
+        for queue in subscribers:
+            queue.put_nowait((event, payload))
+        if subscribers:
+            logger.debug("Published %s for entry %s to %d listener(s)", event, entry_id, len(subscribers))
+
+    @property
+    def listener_count(self) -> int:
+        return sum(len(s) for s in self._subscribers.values())
+
+
+analysis_events = AnalysisEvents()
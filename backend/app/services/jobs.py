@@ -0,0 +1,277 @@
+"""
+app/services/jobs.py — Bounded worker pool for the durable analysis queue.
+
+Entry writes enqueue a row in public.analysis_jobs (analysis_jobs.sql, via
+trigger, in the same transaction as the write). AnalysisWorkerPool runs a
+fixed number of asyncio workers in the API process; each one:
+
+  1. Leases up to ANALYSIS_BATCH_MAX_SIZE ready jobs with
+     claim_analysis_jobs (FOR UPDATE SKIP LOCKED)
+  2. Loads the entries' current content (+ content_version); when several
+     jobs were claimed, analyses them in one batched completion
+     (analyse_entries), then runs run_analysis_pipeline per entry, whose
+     write-back is dropped if the entry was edited meanwhile
+  3. Marks the job done, or fails it with exponential backoff + jitter —
+     after max_attempts the job is dead-lettered and the fallback state is
+     stored on the entry
+
+Workers sleep on an asyncio.Event between polls, so routes call
+`worker_pool.notify()` after creating an entry to start the job without
+waiting for the next poll. Edits are debounced in SQL (the job becomes
+ready after a quiet period) and are simply picked up by polling. Jobs
+abandoned by a crashed process are reclaimed once their lease expires,
+so at-least-once delivery holds across restarts.
+
+Queue wait (ready → claimed), the batched analysis and each pipeline run
+are recorded as stages in vesper_analysis_stage_seconds (metrics.py).
+"""
+
+import asyncio
+import logging
+import os
+import random
+import socket
+from datetime import datetime
+from uuid import UUID
+
+from app.core.config import settings
+from app.core.metrics import ANALYSIS_STAGE_SECONDS, stage
+from app.core.supabase import get_service_supabase
+from app.services.ai.analyzer import analyse_entries
+from app.services.ai.limiter import llm_priority
+from app.services.ai.pipeline import MIN_WORDS, run_analysis_pipeline
+
+logger = logging.getLogger(__name__)
+
+
+def backoff_seconds(attempt: int) -> float:
+    """Full-jitter exponential backoff for the retry after `attempt` (1-based)."""
+    ceiling = min(
+        settings.job_backoff_max_seconds,
+        settings.job_backoff_base_seconds * 2 ** max(attempt - 1, 0),
+    )
+    return random.uniform(ceiling / 2, ceiling)
+
+
+class AnalysisWorkerPool:
+    """Fixed-size pool of asyncio workers draining public.analysis_jobs."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.name = f"{socket.gethostname()}:{os.getpid()}"
+        self._wake = asyncio.Event()
+        self._stopping = False
+        self._tasks: list[asyncio.Task] = []
+        self._in_flight = 0
+        self._batches = 0
+        self._completed = 0
+        self._retried = 0
+        self._dead = 0
+
+    # ── lifecycle ────────────────────────────────────────────────────────────
+
+    def start(self) -> None:
+        if self._tasks or self.size <= 0:
+            return
+        if not settings.supabase_service_key:
+            # Workers claim and write with the service role; without it every
+            # job would sit in the queue while stats() looked healthy.
+            logger.error(
+                "SUPABASE_SERVICE_KEY is not set — analysis workers not started; "
+                "jobs will queue until a process with the key drains them."
+            )
+            return
+        self._stopping = False
+        self._tasks = [
+            asyncio.create_task(self._worker(f"{self.name}/{i}"), name=f"analysis-worker-{i}")
+            for i in range(self.size)
+        ]
+        logger.info("Started %d analysis worker(s) as %s", self.size, self.name)
+
+    async def stop(self) -> None:
+        """Stop claiming, let in-flight jobs finish (up to the drain timeout)."""
+        if not self._tasks:
+            return
+        self._stopping = True
+        self._wake.set()
+        _, pending = await asyncio.wait(self._tasks, timeout=settings.job_drain_timeout_seconds)
+        for task in pending:
+            task.cancel()   # their leases expire and another process reclaims them
+        await asyncio.gather(*pending, return_exceptions=True)
+        self._tasks = []
+        logger.info("Analysis workers stopped (%d cancelled mid-job)", len(pending))
+
+    def notify(self) -> None:
+        """Wake idle workers — call after enqueuing."""
+        self._wake.set()
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.size if self._tasks else 0,
+            "in_flight": self._in_flight,
+            "batches": self._batches,
+            "completed": self._completed,
+            "retried": self._retried,
+            "dead": self._dead,
+        }
+
+    # ── worker loop ──────────────────────────────────────────────────────────
+
+    async def _worker(self, worker_name: str) -> None:
+        llm_priority.set("background")   # task-local: only this worker's LLM calls
+        sb = get_service_supabase()
+        while not self._stopping:
+            try:
+                result = await sb.rpc("claim_analysis_jobs", {
+                    "p_worker": worker_name,
+                    "p_limit": max(1, settings.analysis_batch_max_size),
+                    "p_lease_seconds": settings.job_lease_seconds,
+                }).execute()
+                jobs = result.data or []
+            except Exception as exc:
+                logger.warning("Could not claim analysis jobs: %s", exc)
+                jobs = []
+
+            if not jobs:
+                await self._idle()
+                continue
+
+            for job in jobs:
+                _observe_queue_wait(job)
+            self._in_flight += len(jobs)
+            try:
+                if len(jobs) == 1:
+                    await self._run(sb, jobs[0])
+                else:
+                    await self._run_batch(sb, jobs)
+            except Exception as exc:
+                # Keep the worker alive; unfinished jobs are reclaimed when their lease expires
+                logger.error(
+                    "Unexpected error running %d analysis job(s): %s", len(jobs), exc, exc_info=True,
+                )
+            finally:
+                self._in_flight -= len(jobs)
+
+    async def _idle(self) -> None:
+        try:
+            await asyncio.wait_for(self._wake.wait(), timeout=settings.job_poll_interval_seconds)
+        except asyncio.TimeoutError:
+            pass
+        self._wake.clear()
+
+    async def _run_batch(self, sb, jobs: list[dict]) -> None:
+        """Several jobs: one entries read and one batched analysis, then per-entry pipelines."""
+        try:
+            result = await (
+                sb.table("entries")
+                .select("id, user_id, content, content_version")
+                .in_("id", [job["entry_id"] for job in jobs])
+                .execute()
+            )
+            entries = {row["id"]: row for row in result.data or []}
+        except Exception as exc:
+            logger.warning("Could not load entries for %d analysis jobs: %s", len(jobs), exc)
+            await asyncio.gather(*(self._run(sb, job) for job in jobs))
+            return
+
+        entries = {
+            job["id"]: entries[job["entry_id"]]
+            for job in jobs
+            if job["entry_id"] in entries and entries[job["entry_id"]]["user_id"] == job["user_id"]
+        }
+        texts = {
+            str(job_id): row["content"]
+            for job_id, row in entries.items()
+            if len(row["content"].strip().split()) >= MIN_WORDS
+        }
+        analyses: dict = {}
+        if texts:
+            with stage("analyse_batch", entries=len(texts)):
+                analyses = await analyse_entries(texts)
+        self._batches += 1
+
+        await asyncio.gather(*(
+            self._run(sb, job, entry=entries.get(job["id"]), preloaded=True,
+                      precomputed=analyses.get(str(job["id"])))
+            for job in jobs
+        ))
+
+    async def _run(self, sb, job: dict, *, entry: dict | None = None, preloaded: bool = False,
+                   precomputed=None) -> None:
+        job_id = job["id"]
+        entry_id = job["entry_id"]
+        user_id = job["user_id"]
+
+        try:
+            if not preloaded:
+                result = await (
+                    sb.table("entries")
+                    .select("content, content_version")
+                    .eq("id", entry_id)
+                    .eq("user_id", user_id)
+                    .limit(1)
+                    .execute()
+                )
+                entry = result.data[0] if result.data else None
+            if entry is None:
+                # Entry deleted after enqueue (the FK cascade usually beats us)
+                await sb.rpc("complete_analysis_job", {"p_job_id": job_id}).execute()
+                return
+
+            with stage("pipeline", job_id=job_id, entry_id=entry_id, attempt=job["attempts"]):
+                await run_analysis_pipeline(
+                    entry_id=UUID(entry_id),
+                    content=entry["content"],
+                    user_id=UUID(user_id),
+                    content_version=entry["content_version"],
+                    final_attempt=job["attempts"] >= job["max_attempts"],
+                    precomputed=precomputed,
+                )
+        except Exception as exc:
+            await self._fail(sb, job, exc)
+            return
+
+        try:
+            await sb.rpc("complete_analysis_job", {"p_job_id": job_id}).execute()
+            self._completed += 1
+        except Exception as exc:
+            # The lease will expire and the job re-run; analysis is idempotent
+            logger.warning("Could not mark analysis job %s done: %s", job_id, exc)
+
+    async def _fail(self, sb, job: dict, exc: Exception) -> None:
+        delay = backoff_seconds(job["attempts"])
+        try:
+            result = await sb.rpc("fail_analysis_job", {
+                "p_job_id": job["id"],
+                "p_error": f"{type(exc).__name__}: {exc}",
+                "p_retry_seconds": delay,
+            }).execute()
+            new_status = result.data
+        except Exception as rpc_exc:
+            logger.warning("Could not record failure of analysis job %s: %s", job["id"], rpc_exc)
+            return
+
+        if new_status == "dead":
+            self._dead += 1
+            logger.error(
+                "Analysis job %s for entry %s dead-lettered after %d attempts: %s",
+                job["id"], job["entry_id"], job["attempts"], exc,
+            )
+        elif new_status == "queued":
+            self._retried += 1
+            logger.info(
+                "Analysis job %s for entry %s failed (attempt %d/%d) — retrying in %.0fs",
+                job["id"], job["entry_id"], job["attempts"], job["max_attempts"], delay,
+            )
+
+
+def _observe_queue_wait(job: dict) -> None:
+    """Ready → claimed, from the database's own timestamps (no clock skew)."""
+    try:
+        waited = datetime.fromisoformat(job["started_at"]) - datetime.fromisoformat(job["run_after"])
+    except (KeyError, TypeError, ValueError):
+        return
+    ANALYSIS_STAGE_SECONDS.observe(max(waited.total_seconds(), 0.0), stage="queue_wait", outcome="ok")
+
+
+worker_pool = AnalysisWorkerPool(size=settings.analysis_workers)
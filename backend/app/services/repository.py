@@ -0,0 +1,318 @@
+"""
+app/services/repository.py — Entry read paths behind a swappable backend.
+
+Two implementations with the same async interface:
+  PostgrestEntryRepository — HTTP via the pooled PostgREST client (default)
+  PgEntryRepository        — direct asyncpg with prepared statements,
+                             used when app.core.pg.pg_enabled() is true
+
+Both return plain dicts shaped exactly like the PostgREST JSON rows, so the
+routers and response models don't care which one served the request.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+import re
+from typing import Any
+from uuid import UUID
+
+from app.core.pg import pg_enabled, rls_transaction
+from app.core.supabase import get_supabase
+
+ENTRY_COLUMNS = (
+    "id, user_id, content, created_at, updated_at, "
+    "mood_score, themes, distortions, observation, analyzed"
+)
+ANALYSIS_COLUMNS = "id, analyzed, mood_score, themes, distortions, observation"
+# `preview` is a PostgREST computed field — see entries_pagination.sql
+SUMMARY_COLUMNS = "id, created_at, updated_at, mood_score, themes, analyzed, preview"
+PREVIEW_CHARS = 280   # keep in sync with public.preview(entries)
+# The match_entries row shape, minus `similarity`
+MATCH_COLUMNS = (
+    "id, content, created_at, updated_at, "
+    "mood_score, themes, distortions, observation, analyzed"
+)
+VECTOR_PAGE_SIZE = 1000
+
+# Explicit user_id predicate lets the planner use entries_user_id_idx;
+# RLS still applies on top of it.
+_SELECT_ENTRY_SQL = f"""
+    SELECT {ENTRY_COLUMNS}
+    FROM public.entries
+    WHERE id = $1 AND user_id = auth.uid()
+"""
+
+_SELECT_ANALYSIS_SQL = f"""
+    SELECT {ANALYSIS_COLUMNS}
+    FROM public.entries
+    WHERE id = $1 AND user_id = auth.uid()
+"""
+
+_SELECT_BY_IDS_SQL = f"""
+    SELECT {MATCH_COLUMNS}
+    FROM public.entries
+    WHERE id = ANY($1::uuid[]) AND user_id = auth.uid()
+"""
+
+_ENTRY_VECTORS_SQL = "SELECT * FROM public.entry_vectors($1, $2, $3)"
+_MATCH_ENTRIES_SQL = "SELECT * FROM public.match_entries($1::text::vector, $2)"
+_LEXICAL_SEARCH_SQL = "SELECT * FROM public.lexical_search($1, $2)"
+_HYBRID_SEARCH_SQL = "SELECT * FROM public.hybrid_search($1, $2::text::vector, $3)"
+
+# Keyset pages walk entries_created_at_idx (user_id, created_at DESC);
+# id breaks ties between entries saved in the same microsecond.
+_LIST_COLUMNS_SQL = {
+    False: ENTRY_COLUMNS,
+    True: (
+        "id, created_at, updated_at, mood_score, themes, analyzed, "
+        f"left(content, {PREVIEW_CHARS}) AS preview"
+    ),
+}
+_LIST_FIRST_PAGE_SQL = """
+    SELECT {columns}
+    FROM public.entries
+    WHERE user_id = auth.uid()
+    ORDER BY created_at DESC, id DESC
+    LIMIT $1
+"""
+_LIST_NEXT_PAGE_SQL = """
+    SELECT {columns}
+    FROM public.entries
+    WHERE user_id = auth.uid()
+      AND (created_at, id) < ($2::text::timestamptz, $3::uuid)
+    ORDER BY created_at DESC, id DESC
+    LIMIT $1
+"""
+
+
+# ---------------------------------------------------------------------------
+# Cursor helpers — opaque base64url of [created_at, id]
+# ---------------------------------------------------------------------------
+
+def encode_cursor(row: dict) -> str:
+    raw = json.dumps([row["created_at"], str(row["id"])]).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+_TIMESTAMP_RE = re.compile(r"^\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(\.\d+)?([+-]\d{2}:?\d{2}|Z)?$")
+
+
+def decode_cursor(cursor: str) -> tuple[str, UUID]:
+    """Return (created_at ISO string, id). Raises ValueError on a malformed cursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, entry_id = json.loads(base64.urlsafe_b64decode(padded))
+        if not _TIMESTAMP_RE.match(created_at):
+            raise ValueError("bad timestamp")
+        return created_at, UUID(entry_id)
+    except Exception as exc:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from exc
+
+
+def _split_page(rows: list[dict], limit: int | None) -> tuple[list[dict], str | None]:
+    """Rows were fetched with limit + 1; trim and derive the next cursor."""
+    if limit is None or len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    return page, encode_cursor(page[-1])
+
+
+def _row_to_dict(record) -> dict[str, Any]:
+    """Convert an asyncpg Record into PostgREST-shaped JSON values."""
+    row = dict(record)
+    for key, value in row.items():
+        if isinstance(value, UUID):
+            row[key] = str(value)
+        elif hasattr(value, "isoformat"):
+            row[key] = value.isoformat()
+    return row
+
+
+def _vector_literal(embedding: list[float]) -> str:
+    return "[" + ",".join(repr(float(x)) for x in embedding) + "]"
+
+
+def _parse_vector(value: str | list[float]) -> list[float]:
+    """pgvector's text form "[0.1,0.2]" is valid JSON."""
+    return json.loads(value) if isinstance(value, str) else value
+
+
+# ---------------------------------------------------------------------------
+# PostgREST backend
+# ---------------------------------------------------------------------------
+
+class PostgrestEntryRepository:
+    def __init__(self, access_token: str):
+        self._sb = get_supabase(access_token=access_token)
+
+    async def get_entry(self, entry_id: UUID) -> dict | None:
+        result = await (
+            self._sb.table("entries")
+            .select(ENTRY_COLUMNS)
+            .eq("id", str(entry_id))
+            .limit(1)
+            .execute()
+        )
+        return result.data[0] if result.data else None
+
+    async def list_entries(
+        self, limit: int | None = None, cursor: str | None = None, summary: bool = False,
+    ) -> tuple[list[dict], str | None]:
+        query = (
+            self._sb.table("entries")
+            .select(SUMMARY_COLUMNS if summary else ENTRY_COLUMNS)
+            .order("created_at", desc=True)
+            .order("id", desc=True)
+        )
+        if cursor:
+            created_at, entry_id = decode_cursor(cursor)
+            # The redundant lte gives the planner an index range bound;
+            # the or() does the exact (created_at, id) < cursor comparison.
+            query = query.lte("created_at", created_at).or_(
+                f'created_at.lt."{created_at}",'
+                f'and(created_at.eq."{created_at}",id.lt.{entry_id})'
+            )
+        if limit is not None:
+            query = query.limit(limit + 1)
+        result = await query.execute()
+        return _split_page(result.data or [], limit)
+
+    async def get_analysis(self, entry_id: UUID) -> dict | None:
+        result = await (
+            self._sb.table("entries")
+            .select(ANALYSIS_COLUMNS)
+            .eq("id", str(entry_id))
+            .limit(1)
+            .execute()
+        )
+        return result.data[0] if result.data else None
+
+    async def get_entries_by_ids(self, entry_ids: list[str]) -> list[dict]:
+        """Rows for the given ids (match_entries shape), in no particular order."""
+        if not entry_ids:
+            return []
+        result = await (
+            self._sb.table("entries")
+            .select(MATCH_COLUMNS)
+            .in_("id", entry_ids)
+            .execute()
+        )
+        return result.data or []
+
+    async def list_vectors(self) -> list[tuple[str, list[float]]]:
+        """
+        Every stored (entry id, vector) of the user's entries — one per chunk,
+        or the entry-level vector for unchunked entries (entry_chunks.sql).
+        """
+        pairs: list[tuple[str, list[float]]] = []
+        after: dict | None = None
+        while True:
+            result = await self._sb.rpc("entry_vectors", {
+                "p_after_entry": after and after["entry_id"],
+                "p_after_chunk": after and after["chunk_index"],
+                "p_limit": VECTOR_PAGE_SIZE,
+            }).execute()
+            rows = result.data or []
+            pairs.extend((r["entry_id"], _parse_vector(r["embedding"])) for r in rows)
+            if len(rows) < VECTOR_PAGE_SIZE:
+                return pairs
+            after = rows[-1]
+
+    async def match_entries(self, embedding: list[float], match_count: int) -> list[dict]:
+        result = await self._sb.rpc(
+            "match_entries",
+            {"query_embedding": embedding, "match_count": match_count},
+        ).execute()
+        return result.data or []
+
+    async def lexical_search(self, query: str, match_count: int) -> list[dict]:
+        result = await self._sb.rpc(
+            "lexical_search",
+            {"query_text": query, "match_count": match_count},
+        ).execute()
+        return result.data or []
+
+    async def hybrid_search(self, query: str, embedding: list[float], match_count: int) -> list[dict]:
+        result = await self._sb.rpc(
+            "hybrid_search",
+            {"query_text": query, "query_embedding": embedding, "match_count": match_count},
+        ).execute()
+        return result.data or []
+
+
+# ---------------------------------------------------------------------------
+# asyncpg backend
+# ---------------------------------------------------------------------------
+
+class PgEntryRepository:
+    def __init__(self, access_token: str):
+        self._token = access_token
+
+    async def get_entry(self, entry_id: UUID) -> dict | None:
+        async with rls_transaction(self._token) as conn:
+            record = await conn.fetchrow(_SELECT_ENTRY_SQL, entry_id)
+        return _row_to_dict(record) if record else None
+
+    async def list_entries(
+        self, limit: int | None = None, cursor: str | None = None, summary: bool = False,
+    ) -> tuple[list[dict], str | None]:
+        columns = _LIST_COLUMNS_SQL[summary]
+        # LIMIT NULL means "no limit" in Postgres — keeps the legacy full list
+        fetch = limit + 1 if limit is not None else None
+        async with rls_transaction(self._token) as conn:
+            if cursor:
+                created_at, entry_id = decode_cursor(cursor)
+                records = await conn.fetch(
+                    _LIST_NEXT_PAGE_SQL.format(columns=columns),
+                    fetch, created_at, entry_id,
+                )
+            else:
+                records = await conn.fetch(_LIST_FIRST_PAGE_SQL.format(columns=columns), fetch)
+        return _split_page([_row_to_dict(r) for r in records], limit)
+
+    async def get_analysis(self, entry_id: UUID) -> dict | None:
+        async with rls_transaction(self._token) as conn:
+            record = await conn.fetchrow(_SELECT_ANALYSIS_SQL, entry_id)
+        return _row_to_dict(record) if record else None
+
+    async def get_entries_by_ids(self, entry_ids: list[str]) -> list[dict]:
+        if not entry_ids:
+            return []
+        async with rls_transaction(self._token) as conn:
+            records = await conn.fetch(_SELECT_BY_IDS_SQL, [UUID(i) for i in entry_ids])
+        return [_row_to_dict(r) for r in records]
+
+    async def list_vectors(self) -> list[tuple[str, list[float]]]:
+        pairs: list[tuple[str, list[float]]] = []
+        after_entry, after_chunk = None, None
+        async with rls_transaction(self._token) as conn:
+            while True:
+                records = await conn.fetch(_ENTRY_VECTORS_SQL, after_entry, after_chunk, VECTOR_PAGE_SIZE)
+                pairs.extend((str(r["entry_id"]), _parse_vector(r["embedding"])) for r in records)
+                if len(records) < VECTOR_PAGE_SIZE:
+                    return pairs
+                after_entry, after_chunk = records[-1]["entry_id"], records[-1]["chunk_index"]
+
+    async def match_entries(self, embedding: list[float], match_count: int) -> list[dict]:
+        async with rls_transaction(self._token) as conn:
+            records = await conn.fetch(_MATCH_ENTRIES_SQL, _vector_literal(embedding), match_count)
+        return [_row_to_dict(r) for r in records]
+
+    async def lexical_search(self, query: str, match_count: int) -> list[dict]:
+        async with rls_transaction(self._token) as conn:
+            records = await conn.fetch(_LEXICAL_SEARCH_SQL, query, match_count)
+        return [_row_to_dict(r) for r in records]
+
+    async def hybrid_search(self, query: str, embedding: list[float], match_count: int) -> list[dict]:
+        async with rls_transaction(self._token) as conn:
+            records = await conn.fetch(_HYBRID_SEARCH_SQL, query, _vector_literal(embedding), match_count)
+        return [_row_to_dict(r) for r in records]
+
+
+def get_entry_repository(access_token: str) -> PostgrestEntryRepository | PgEntryRepository:
+    """Pick the direct Postgres backend when configured, PostgREST otherwise."""
+    if pg_enabled():
+        return PgEntryRepository(access_token)
+    return PostgrestEntryRepository(access_token)
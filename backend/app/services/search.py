@@ -0,0 +1,33 @@
+"""
+app/services/search.py — Query routing for POST /entries/search.
+
+Keyword-like queries (a name, a place, a quoted phrase) are answered by the
+full-text index alone — one DB round-trip and no embedding call. Everything
+else goes to hybrid_search, which fuses full-text and vector rankings
+(hybrid_search.sql). The lexical fast path falls back to hybrid when it
+finds nothing, so a misclassified query still gets semantic results.
+"""
+
+import re
+
+# Words that mark a natural-language, "meaning" query rather than a lookup
+_QUESTION_WORDS = frozenset({
+    "how", "why", "what", "when", "where", "who", "which",
+    "feel", "feeling", "felt", "about", "times", "like",
+})
+_TOKEN_RE = re.compile(r"[\w'@.-]+")
+
+
+def looks_like_keywords(query: str) -> bool:
+    """Heuristic: should this query skip the embedding and search lexically?"""
+    q = query.strip()
+    if len(q) >= 2 and q[0] == q[-1] == '"':
+        return True   # explicit phrase
+
+    tokens = _TOKEN_RE.findall(q)
+    if not tokens or any(t.lower() in _QUESTION_WORDS for t in tokens):
+        return False
+    if len(tokens) <= 2:
+        return True
+    # "Priya Sharma Berlin", "Q3 OKRs": proper nouns / codes, no prose
+    return len(tokens) <= 4 and all(t[0].isupper() or any(c.isdigit() for c in t) for t in tokens)
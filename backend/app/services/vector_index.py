@@ -0,0 +1,223 @@
+"""
+app/services/vector_index.py — Optional in-process per-user vector index.
+
+A user's corpus is small (thousands of 384-dim vectors), so exact search
+over a contiguous, L2-normalised NumPy matrix is one matrix-vector product:
+sub-millisecond once warm, and exact — unlike the global ANN index,
+which filters to one user's small subset after the scan.
+
+  * Loaded lazily per user on first search (keyset-paged through the
+    user-scoped repository, so RLS still guards the load); one row per
+    chunk, entries ranked by their best chunk like match_entries
+  * Kept fresh by the analysis pipeline (upsert) and entry deletes (remove);
+    reloaded after VECTOR_INDEX_TTL_SECONDS to pick up out-of-process
+    writes such as the backfill script
+  * Evicted least-recently-used beyond VECTOR_INDEX_MAX_BYTES
+  * Optionally int8-quantised (VECTOR_INDEX_QUANTIZE) — 4× smaller,
+    approximate scores
+
+The index only yields (entry id, similarity); callers always fetch the rows
+through the repository with the caller's JWT, so a forged token cannot read
+another user's entries through a warm index.
+
+Enabled by VECTOR_INDEX_ENABLED=true; requires numpy.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable
+
+from app.core.config import settings
+
+try:
+    import numpy as np
+except ImportError:   # optional dependency — match_entries RPC is the default
+    np = None
+
+logger = logging.getLogger(__name__)
+
+_Q = 127.0   # int8 scale for unit vectors (components lie in [-1, 1])
+EMBEDDING_DIMS = 384   # as analyzer.EMBEDDING_DIMS — not imported to avoid pulling in the OpenAI SDK
+
+
+def vector_index_enabled() -> bool:
+    return settings.vector_index_enabled and np is not None
+
+
+class UserVectorIndex:
+    """
+    Exact cosine top-k over one user's embeddings. An entry may own several
+    rows (one per chunk, entry_chunks.sql); it is ranked by its best row.
+    """
+
+    def __init__(self, ids: list[str], vectors: list[list[float]], quantize: bool):
+        self.quantize = quantize
+        self.loaded_at = time.monotonic()
+        self._ids = list(ids)   # entry id of each matrix row
+        self._rows: dict[str, list[int]] = {}
+        for i, entry_id in enumerate(self._ids):
+            self._rows.setdefault(entry_id, []).append(i)
+        matrix = np.asarray(vectors, dtype=np.float32)
+        self._matrix = self._encode(matrix.reshape(len(ids), -1) if ids else matrix)
+
+    @property
+    def nbytes(self) -> int:
+        return self._matrix.nbytes + 64 * len(self._ids)   # + rough id/dict overhead
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def search(self, query: list[float], k: int) -> list[tuple[str, float]]:
+        if not self._ids:
+            return []
+        q = self._encode(np.asarray(query, dtype=np.float32)[None, :])[0]
+        if self.quantize:
+            scores = (self._matrix.astype(np.int32) @ q.astype(np.int32)) / (_Q * _Q)
+        else:
+            scores = self._matrix @ q
+
+        n = len(scores)
+        want = min(k, len(self._rows))
+        take = min(n, want * 4)   # headroom for entries with several strong chunks
+        while True:
+            top = np.argpartition(-scores, take - 1)[:take] if take < n else np.arange(n)
+            top = top[np.argsort(-scores[top])]
+            hits: list[tuple[str, float]] = []
+            seen: set[str] = set()
+            for i in top:
+                entry_id = self._ids[i]
+                if entry_id not in seen:
+                    seen.add(entry_id)
+                    hits.append((entry_id, float(scores[i])))
+                    if len(hits) == want:
+                        return hits
+            if take == n:
+                return hits
+            take = min(n, take * 4)
+
+    def upsert(self, entry_id: str, vectors: list[list[float]]) -> None:
+        """Replace all of the entry's rows."""
+        self.remove(entry_id)
+        if not vectors:
+            return
+        rows = self._encode(np.asarray(vectors, dtype=np.float32).reshape(len(vectors), -1))
+        start = len(self._ids)
+        self._rows[entry_id] = list(range(start, start + len(vectors)))
+        self._ids.extend([entry_id] * len(vectors))
+        self._matrix = np.vstack([self._matrix, rows]) if len(self._matrix) else rows
+
+    def remove(self, entry_id: str) -> None:
+        rows = self._rows.pop(entry_id, None)
+        if not rows:
+            return
+        # Swap-remove from the highest row down keeps the matrix contiguous;
+        # the row moved into each hole never belongs to `entry_id`.
+        for i in sorted(rows, reverse=True):
+            last = len(self._ids) - 1
+            if i != last:
+                moved = self._ids[last]
+                self._matrix[i] = self._matrix[last]
+                self._ids[i] = moved
+                positions = self._rows[moved]
+                positions[positions.index(last)] = i
+            self._ids.pop()
+        self._matrix = self._matrix[:len(self._ids)].copy()
+
+    def _encode(self, vectors: "np.ndarray") -> "np.ndarray":
+        if vectors.size == 0:
+            return np.empty((0, EMBEDDING_DIMS), dtype=np.int8 if self.quantize else np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        unit = vectors / np.maximum(norms, 1e-12)
+        if self.quantize:
+            return np.clip(np.rint(unit * _Q), -127, 127).astype(np.int8)
+        return np.ascontiguousarray(unit, dtype=np.float32)
+
+
+Loader = Callable[[], Awaitable[list[tuple[str, list[float]]]]]
+
+
+class VectorIndexCache:
+    """LRU of UserVectorIndex objects bounded by total matrix bytes."""
+
+    def __init__(self, max_bytes: int, ttl_seconds: float, quantize: bool):
+        self.max_bytes = max_bytes
+        self.ttl = ttl_seconds
+        self.quantize = quantize
+        self._indexes: OrderedDict[str, UserVectorIndex] = OrderedDict()
+        self._locks: dict[str, asyncio.Lock] = {}
+        self.loads = 0
+        self.evictions = 0
+
+    async def get(self, user_id, loader: Loader) -> UserVectorIndex:
+        """Return the user's index, loading it (once, even under concurrency) if needed."""
+        key = str(user_id)
+        index = self._fresh(key)
+        if index is not None:
+            return index
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            index = self._fresh(key)
+            if index is None:
+                started = time.perf_counter()
+                rows = await loader()
+                index = UserVectorIndex([r[0] for r in rows], [r[1] for r in rows], self.quantize)
+                self._indexes[key] = index
+                self.loads += 1
+                logger.info(
+                    "Loaded vector index for user %s: %d vectors, %.1f KiB in %.0f ms",
+                    key, len(index), index.nbytes / 1024, (time.perf_counter() - started) * 1000,
+                )
+                self._evict()
+        self._locks.pop(key, None)
+        return index
+
+    def upsert(self, user_id, entry_id, vectors: list[list[float]]) -> None:
+        index = self._indexes.get(str(user_id))
+        if index is not None:   # cold users load fresh on their next search
+            index.upsert(str(entry_id), vectors)
+            self._evict()
+
+    def remove(self, user_id, entry_id) -> None:
+        index = self._indexes.get(str(user_id))
+        if index is not None:
+            index.remove(str(entry_id))
+
+    def stats(self) -> dict:
+        return {
+            "users": len(self._indexes),
+            "vectors": sum(len(i) for i in self._indexes.values()),   # chunk rows
+            "bytes": sum(i.nbytes for i in self._indexes.values()),
+            "max_bytes": self.max_bytes,
+            "loads": self.loads,
+            "evictions": self.evictions,
+            "quantized": self.quantize,
+        }
+
+    def _fresh(self, key: str) -> UserVectorIndex | None:
+        index = self._indexes.get(key)
+        if index is None:
+            return None
+        if time.monotonic() - index.loaded_at > self.ttl:
+            del self._indexes[key]
+            return None
+        self._indexes.move_to_end(key)
+        return index
+
+    def _evict(self) -> None:
+        total = sum(i.nbytes for i in self._indexes.values())
+        while total > self.max_bytes and len(self._indexes) > 1:
+            _, evicted = self._indexes.popitem(last=False)
+            total -= evicted.nbytes
+            self.evictions += 1
+
+
+vector_indexes = VectorIndexCache(
+    max_bytes=settings.vector_index_max_bytes,
+    ttl_seconds=settings.vector_index_ttl_seconds,
+    quantize=settings.vector_index_quantize,
+)
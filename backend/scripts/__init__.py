@@ -0,0 +1 @@
+# Vesper maintenance & benchmark scripts
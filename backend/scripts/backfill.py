@@ -0,0 +1,216 @@
+"""
+scripts/backfill.py — Resumable bulk (re)analysis and re-embedding.
+
+Finds entries whose analysis or embedding is missing, or was produced by a
+different model / prompt than the current settings (analysis_version /
+embedding_version, see entry_backfill.sql), or that have no chunk
+embeddings yet (entry_chunks.sql). It pages through them by id. Each row
+says which half is stale (needs_analysis / needs_embedding), so a prompt
+change doesn't re-embed and a model change doesn't re-analyse. The page's
+stale analyses run as batched completions (analyse_entries); stale
+embeddings run embed_entry with bounded concurrency, reusing the entry's
+stored chunk vectors for unchanged chunks. All calls use the background
+LLM budget. Each page is written back in one apply_entry_backfill call
+(plus one apply_entry_chunks call for the chunk embeddings).
+Pages are guarded by content_version, so entries edited meanwhile are left
+to the normal analysis queue.
+
+Progress is checkpointed to a JSON file after every page; re-running the
+same command resumes after the last written page. Results also land in the
+AI content cache, so a repeated page is cheap.
+
+The API keeps ETag versions in its own process memory, so clients may see
+cached pre-backfill responses for up to RESPONSE_CACHE_TTL_SECONDS
+(http_cache.py), or until their next write.
+
+Usage (from backend/):
+    python -m scripts.backfill                          # analysis + embeddings
+    python -m scripts.backfill --mode embedding         # after an EMBEDDING_MODEL change
+    python -m scripts.backfill --mode analysis --concurrency 4
+    python -m scripts.backfill --restart                # ignore the checkpoint
+
+Point LITELLM_BASE_URL at a local stand-in (scripts/llm_standin.py) to
+dry-run without API spend; tests/test_backfill.py runs it in-process.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from pathlib import Path
+
+from app.core.config import settings
+from app.core.supabase import close_supabase, get_service_supabase
+from app.services.ai.analyzer import EMBEDDING_VERSION, AnalysisResult, analyse_entries, analysis_version
+from app.services.ai.chunking import embed_entry, load_chunk_embeddings_many
+from app.services.ai.limiter import llm_priority
+from app.services.ai.pipeline import MIN_WORDS
+
+DEFAULT_CHECKPOINT = Path(".backfill_checkpoint.json")
+
+
+# ---------------------------------------------------------------------------
+# Checkpoint
+# ---------------------------------------------------------------------------
+
+def load_checkpoint(path: Path, scope: dict, restart: bool) -> dict:
+    fresh = {**scope, "after": None, "written": 0, "skipped": 0, "failed": 0}
+    if restart or not path.exists():
+        return fresh
+    saved = json.loads(path.read_text())
+    if any(saved.get(k) != v for k, v in scope.items()):
+        print(f"Checkpoint {path} is for a different mode/version — starting over.")
+        return fresh
+    print(f"Resuming after entry {saved['after']} ({saved['written']} already written).")
+    return saved
+
+
+def save_checkpoint(path: Path, state: dict) -> None:
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(state, indent=2))
+    tmp.replace(path)   # atomic: an interrupt never leaves half a file
+
+
+# ---------------------------------------------------------------------------
+# Per-entry work
+# ---------------------------------------------------------------------------
+
+def is_too_short(entry: dict) -> bool:
+    return len(entry["content"].strip().split()) < MIN_WORDS
+
+
+async def process_entry(
+    entry: dict,
+    sem: asyncio.Semaphore,
+    analysis: AnalysisResult | Exception | None,
+    previous: dict[str, list[float]] | None = None,
+) -> tuple[dict | None, dict | None, bool]:
+    """
+    Return (apply_entry_backfill row or None if nothing was produced,
+    apply_entry_chunks row or None, whether any AI call failed).
+    `analysis` is the entry's result from the page's analyse_entries call
+    (None when its analysis is current); the entry is re-embedded only if
+    flagged needs_embedding, reusing `previous` (its stored chunks).
+    """
+    if is_too_short(entry):
+        return None, None, False
+
+    row = {"id": entry["id"], "content_version": entry["content_version"]}
+    chunks = None
+    failed = False
+    async with sem:
+        if isinstance(analysis, Exception):
+            failed = True
+            print(f"  analysis failed for {entry['id']}: {analysis}")
+        elif analysis is not None:
+            row.update({
+                "analyzed": True,
+                "mood_score": round(analysis.mood_score, 1),
+                "themes": analysis.themes,
+                "distortions": [{"label": d} for d in analysis.distortions],
+                "observation": analysis.observation,
+                "analysis_version": analysis_version(),
+            })
+        if entry["needs_embedding"]:
+            try:
+                embedded = await embed_entry(entry["content"], previous)
+                row["embedding"] = embedded.embedding
+                row["embedding_version"] = EMBEDDING_VERSION
+                chunks = {"id": entry["id"], "content_version": entry["content_version"], "chunks": embedded.chunks}
+            except Exception as exc:
+                failed = True
+                print(f"  embedding failed for {entry['id']}: {exc}")
+
+    return (row if len(row) > 2 else None), chunks, failed
+
+
+def _eta(seconds: float) -> str:
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h{minutes:02d}m" if hours else f"{minutes}m{secs:02d}s"
+
+
+# ---------------------------------------------------------------------------
+# Main loop
+# ---------------------------------------------------------------------------
+
+async def main(args: argparse.Namespace) -> None:
+    if not settings.supabase_service_key:
+        raise SystemExit("SUPABASE_SERVICE_KEY is required to backfill.")
+
+    llm_priority.set("background")
+    sb = get_service_supabase()
+    scope = {
+        "mode": args.mode,
+        "analysis_version": analysis_version(),
+        "embedding_version": EMBEDDING_VERSION,
+    }
+    versions = {
+        "p_analysis_version": scope["analysis_version"],
+        "p_embedding_version": scope["embedding_version"],
+        "p_mode": args.mode,
+    }
+    state = load_checkpoint(args.checkpoint, scope, args.restart)
+    sem = asyncio.Semaphore(args.concurrency)
+
+    try:
+        total = (await sb.rpc("backfill_entry_count", {**versions, "p_after": state["after"]}).execute()).data
+        print(f"{total} entries to process (mode={args.mode}, {scope['analysis_version']}, {EMBEDDING_VERSION})")
+
+        done = 0
+        start = time.perf_counter()
+        while True:
+            page = (await sb.rpc("backfill_entry_batch", {
+                **versions,
+                "p_after": state["after"],
+                "p_limit": args.batch_size,
+            }).execute()).data
+            if not page:
+                break
+
+            pending = [e for e in page if not is_too_short(e)]
+            analyses = await analyse_entries({e["id"]: e["content"] for e in pending if e["needs_analysis"]})
+            previous = await load_chunk_embeddings_many(sb, [e["id"] for e in pending if e["needs_embedding"]])
+            results = await asyncio.gather(*(
+                process_entry(e, sem, analyses.get(e["id"]), previous.get(e["id"])) for e in page
+            ))
+            payload = [row for row, _, _ in results if row is not None]
+            chunk_payload = [chunks for _, chunks, _ in results if chunks is not None]
+            written = 0
+            if chunk_payload:
+                await sb.rpc("apply_entry_chunks", {"p_rows": chunk_payload}).execute()
+            if payload:
+                written = (await sb.rpc("apply_entry_backfill", {"p_rows": payload}).execute()).data
+
+            state["after"] = page[-1]["id"]
+            state["written"] += written
+            state["skipped"] += len(page) - len(payload)
+            state["failed"] += sum(1 for _, _, failed in results if failed)
+            save_checkpoint(args.checkpoint, state)
+
+            done += len(page)
+            elapsed = time.perf_counter() - start
+            rate = done / elapsed if elapsed else 0.0
+            remaining = max(total - done, 0)
+            print(
+                f"{done}/{total}  written={state['written']} skipped={state['skipped']}  "
+                f"{rate:.1f} entries/s  ETA {_eta(remaining / rate) if rate else '?'}"
+            )
+    finally:
+        await close_supabase()
+
+    print(
+        f"Done: {state['written']} written, {state['skipped']} skipped "
+        f"(too short / nothing produced), {state['failed']} with failed AI calls. "
+        f"Checkpoint: {args.checkpoint}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["all", "analysis", "embedding"], default="all")
+    parser.add_argument("--batch-size", type=int, default=100, help="entries per page / bulk write")
+    parser.add_argument("--concurrency", type=int, default=8, help="entries processed at once")
+    parser.add_argument("--checkpoint", type=Path, default=DEFAULT_CHECKPOINT)
+    parser.add_argument("--restart", action="store_true", help="ignore an existing checkpoint")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,133 @@
+"""
+scripts/bench_repository.py — Side-by-side latency: PostgREST vs asyncpg.
+
+Seeds one synthetic user with N entries into the local fixture
+(scripts/local_pg/docker-compose.yml), then times get_entry / get_analysis
+through both repository backends at a fixed concurrency and prints
+p50 / p95 / p99 per backend.
+
+Usage (from backend/, fixture running, env vars from the compose file set):
+    python -m scripts.bench_repository --entries 2000 --requests 2000 --concurrency 32
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import random
+import statistics
+import time
+import uuid
+
+from app.core import pg
+from app.core.config import settings
+from app.core.supabase import close_supabase
+from app.services.repository import PgEntryRepository, PostgrestEntryRepository
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def mint_jwt(claims: dict, secret: str) -> str:
+    """HS256-sign `claims` the same way Supabase Auth does."""
+    header = _b64(json.dumps({"alg": "HS256", "typ": "JWT"}).encode())
+    payload = _b64(json.dumps(claims).encode())
+    signature = hmac.new(secret.encode(), f"{header}.{payload}".encode(), hashlib.sha256).digest()
+    return f"{header}.{payload}.{_b64(signature)}"
+
+
+async def seed(user_id: uuid.UUID, n_entries: int) -> list[uuid.UUID]:
+    """Insert a user and `n_entries` analyzed entries as the superuser (bypasses RLS)."""
+    pool = await pg.get_pool()
+    ids = [uuid.uuid4() for _ in range(n_entries)]
+    async with pool.acquire() as conn:
+        await conn.execute("INSERT INTO auth.users (id, email) VALUES ($1, $2)", user_id, f"{user_id}@bench.local")
+        await conn.executemany(
+            """
+            INSERT INTO public.entries
+                (id, user_id, content, mood_score, themes, distortions, observation, analyzed)
+            VALUES ($1, $2, $3, $4, $5, $6, $7, true)
+            """,
+            [
+                (
+                    entry_id, user_id,
+                    "Synthetic benchmark entry. " * random.randint(5, 60),
+                    round(random.uniform(1, 10), 1),
+                    ["work pressure", "sleep"],
+                    [{"label": "Filtering"}],
+                    "A synthetic observation for benchmarking.",
+                )
+                for entry_id in ids
+            ],
+        )
+    return ids
+
+
+async def cleanup(user_id: uuid.UUID) -> None:
+    pool = await pg.get_pool()
+    async with pool.acquire() as conn:
+        await conn.execute("DELETE FROM auth.users WHERE id = $1", user_id)
+
+
+async def time_backend(repo, method: str, ids: list[uuid.UUID], n_requests: int, concurrency: int) -> list[float]:
+    sem = asyncio.Semaphore(concurrency)
+    samples: list[float] = []
+
+    async def one() -> None:
+        async with sem:
+            start = time.perf_counter()
+            row = await getattr(repo, method)(random.choice(ids))
+            samples.append((time.perf_counter() - start) * 1000)
+            assert row is not None, "RLS hid a row the user owns"
+
+    # Warm both pools / statement caches before measuring
+    await asyncio.gather(*(getattr(repo, method)(ids[0]) for _ in range(concurrency)))
+    await asyncio.gather(*(one() for _ in range(n_requests)))
+    return samples
+
+
+def _pct(samples: list[float], p: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+async def main(args: argparse.Namespace) -> None:
+    if not pg.pg_enabled():
+        raise SystemExit("Set DATABASE_URL and SUPABASE_JWT_SECRET (and install asyncpg) first.")
+
+    user_id = uuid.uuid4()
+    token = mint_jwt(
+        {"sub": str(user_id), "role": "authenticated", "exp": int(time.time()) + 3600},
+        settings.supabase_jwt_secret,
+    )
+    ids = await seed(user_id, args.entries)
+
+    backends = {
+        "postgrest": PostgrestEntryRepository(token),
+        "asyncpg": PgEntryRepository(token),
+    }
+    try:
+        print(f"{'backend':<10} {'method':<13} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'mean ms':>8}")
+        for method in ("get_entry", "get_analysis"):
+            for name, repo in backends.items():
+                samples = await time_backend(repo, method, ids, args.requests, args.concurrency)
+                print(
+                    f"{name:<10} {method:<13} "
+                    f"{_pct(samples, 0.50):>8.2f} {_pct(samples, 0.95):>8.2f} "
+                    f"{_pct(samples, 0.99):>8.2f} {statistics.mean(samples):>8.2f}"
+                )
+    finally:
+        await cleanup(user_id)
+        await close_supabase()
+        await pg.close_pool()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=1000, help="entries to seed for the synthetic user")
+    parser.add_argument("--requests", type=int, default=1000, help="timed requests per backend and method")
+    parser.add_argument("--concurrency", type=int, default=16, help="in-flight requests")
+    asyncio.run(main(parser.parse_args()))
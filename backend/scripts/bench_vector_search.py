@@ -0,0 +1,278 @@
+"""
+scripts/bench_vector_search.py — Latency vs recall of match_entries per ANN index.
+
+Seeds synthetic users (entry counts cycled from --entries, so small and
+large histories share one table) with clustered random 384-dim embeddings
+into the local fixture (scripts/local_pg/docker-compose.yml). Then, for
+each index configuration:
+
+  exact                    no ANN index (user_id index + sort) — ground truth
+  ivfflat lists=L probes=P for every L in --ivfflat-lists, P in --ivfflat-probes
+  hnsw m=M ef_search=E     for every E in --hnsw-ef-search
+
+it rebuilds entries_embedding_idx, sets the configuration's query
+settings on the search functions (ALTER FUNCTION — the migrations pin
+ivfflat.probes there, which would override a session setting), runs the
+same queries through the match_entries RPC as each user (asyncpg backend,
+RLS applied) and prints
+build time, index size, p50 / p99 latency, recall@k against the exact
+results and the mean number of rows returned (a filtered ANN scan can
+return fewer than k).
+
+The fixture's original index definition and function settings are
+restored afterwards and the synthetic users are deleted. Results for the
+committed configuration are recorded in vector_index.sql.
+
+Usage (from backend/, fixture running, env vars from the compose file set):
+    python -m scripts.bench_vector_search --users 20 --entries 200,2000,20000
+    python -m scripts.bench_vector_search --iterative   # pgvector >= 0.8 iterative scans
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import uuid
+
+from app.core import pg
+from app.core.config import settings
+from app.services.repository import _vector_literal
+from scripts.bench_repository import _pct, mint_jwt
+
+DIMS = 384   # entries.embedding is vector(384)
+INDEX = "entries_embedding_idx"
+
+_MATCH_SQL = "SELECT id FROM public.match_entries($1::text::vector, $2)"
+# Functions on match_entries' path that may carry their own query settings
+_TUNED_FUNCTIONS = (
+    "public.match_entries(vector, int)",
+    "public.entry_vector_distances(vector, int)",
+)
+
+
+# ---------------------------------------------------------------------------
+# Synthetic data
+# ---------------------------------------------------------------------------
+
+def _unit(vector: list[float]) -> list[float]:
+    norm = sum(x * x for x in vector) ** 0.5 or 1.0
+    return [x / norm for x in vector]
+
+
+def _near(center: list[float], noise: float) -> list[float]:
+    return _unit([x + random.gauss(0, noise) for x in center])
+
+
+def make_topics(n: int) -> list[list[float]]:
+    """Journals cluster around recurring themes; uniform noise would flatter no index."""
+    return [_unit([random.gauss(0, 1) for _ in range(DIMS)]) for _ in range(n)]
+
+
+async def seed(users: int, sizes: list[int], topics: list[list[float]]) -> dict[uuid.UUID, list[list[float]]]:
+    """Insert users and embedded entries as the superuser (bypasses RLS)."""
+    pool = await pg.get_pool()
+    corpus: dict[uuid.UUID, list[list[float]]] = {}
+    async with pool.acquire() as conn:
+        for i in range(users):
+            user_id = uuid.uuid4()
+            # Each user writes about a handful of the global topics
+            own = random.sample(topics, k=min(len(topics), 5))
+            vectors = [_near(random.choice(own), 0.6) for _ in range(sizes[i % len(sizes)])]
+            corpus[user_id] = vectors
+            await conn.execute("INSERT INTO auth.users (id, email) VALUES ($1, $2)", user_id, f"{user_id}@bench.local")
+            await conn.executemany(
+                """
+                INSERT INTO public.entries (user_id, content, analyzed, embedding)
+                VALUES ($1, 'Synthetic vector benchmark entry.', true, $2::text::vector)
+                """,
+                [(user_id, _vector_literal(v)) for v in vectors],
+            )
+            print(f"  seeded user {i + 1}/{users}: {len(vectors)} entries")
+        await conn.execute("ANALYZE public.entries")
+    return corpus
+
+
+async def cleanup(user_ids: list[uuid.UUID]) -> None:
+    pool = await pg.get_pool()
+    async with pool.acquire() as conn:
+        await conn.execute("DELETE FROM auth.users WHERE id = ANY($1::uuid[])", user_ids)
+
+
+# ---------------------------------------------------------------------------
+# Index configurations
+# ---------------------------------------------------------------------------
+
+def configurations(args: argparse.Namespace) -> list[tuple[str, str | None, dict[str, str]]]:
+    """(label, CREATE INDEX using-clause or None, per-query GUCs)."""
+    configs: list[tuple[str, str | None, dict[str, str]]] = [("exact", None, {})]
+    for lists in args.ivfflat_lists:
+        for probes in args.ivfflat_probes:
+            if probes > lists:
+                continue
+            gucs = {"ivfflat.probes": str(probes)}
+            if args.iterative:
+                gucs["ivfflat.iterative_scan"] = "relaxed_order"
+            configs.append((
+                f"ivfflat lists={lists} probes={probes}",
+                f"ivfflat (embedding vector_cosine_ops) WITH (lists = {lists})",
+                gucs,
+            ))
+    for ef_search in args.hnsw_ef_search:
+        gucs = {"hnsw.ef_search": str(ef_search)}
+        if args.iterative:
+            gucs["hnsw.iterative_scan"] = "strict_order"
+        configs.append((
+            f"hnsw m={args.hnsw_m} ef={ef_search}",
+            f"hnsw (embedding vector_cosine_ops) WITH (m = {args.hnsw_m}, ef_construction = {args.hnsw_ef_construction})",
+            gucs,
+        ))
+    return configs
+
+
+async def build_index(using: str | None) -> tuple[float, int]:
+    """Replace entries_embedding_idx; return (build seconds, index bytes)."""
+    pool = await pg.get_pool()
+    async with pool.acquire() as conn:
+        await conn.execute(f"DROP INDEX IF EXISTS public.{INDEX}")
+        if using is None:
+            return 0.0, 0
+        start = time.perf_counter()
+        await conn.execute("SET maintenance_work_mem = '512MB'")
+        await conn.execute(f"CREATE INDEX {INDEX} ON public.entries USING {using}")
+        elapsed = time.perf_counter() - start
+        await conn.execute("RESET maintenance_work_mem")
+        size = await conn.fetchval("SELECT pg_relation_size($1::regclass)", f"public.{INDEX}")
+        return elapsed, size
+
+
+async def function_settings() -> dict[str, list[str]]:
+    """Current `name=value` settings of each existing _TUNED_FUNCTIONS entry."""
+    pool = await pg.get_pool()
+    settings_by_fn = {}
+    async with pool.acquire() as conn:
+        for fn in _TUNED_FUNCTIONS:
+            row = await conn.fetchrow("SELECT proconfig FROM pg_proc WHERE oid = to_regprocedure($1)", fn)
+            if row is not None:
+                settings_by_fn[fn] = list(row["proconfig"] or [])
+    return settings_by_fn
+
+
+async def set_function_settings(functions: list[str], gucs: dict[str, str], reset: bool = False) -> None:
+    pool = await pg.get_pool()
+    async with pool.acquire() as conn:
+        for fn in functions:
+            if reset:
+                await conn.execute(f"ALTER FUNCTION {fn} RESET ALL")
+            for name, value in gucs.items():
+                await conn.execute(f"ALTER FUNCTION {fn} SET {name} = '{value}'")
+
+
+# ---------------------------------------------------------------------------
+# Queries
+# ---------------------------------------------------------------------------
+
+async def run_queries(
+    queries: list[tuple[str, list[float]]], k: int, concurrency: int,
+) -> tuple[list[float], list[list[str]]]:
+    sem = asyncio.Semaphore(concurrency)
+    samples: list[float] = [0.0] * len(queries)
+    results: list[list[str]] = [[] for _ in queries]
+
+    async def one(i: int, token: str, vector: list[float]) -> None:
+        async with sem:
+            start = time.perf_counter()
+            async with pg.rls_transaction(token) as conn:
+                records = await conn.fetch(_MATCH_SQL, _vector_literal(vector), k)
+            samples[i] = (time.perf_counter() - start) * 1000
+            results[i] = [str(r["id"]) for r in records]
+
+    # Warm the pool and the index pages before measuring
+    await asyncio.gather(*(one(i, t, v) for i, (t, v) in enumerate(queries[:concurrency])))
+    await asyncio.gather(*(one(i, t, v) for i, (t, v) in enumerate(queries)))
+    return samples, results
+
+
+def recall(found: list[list[str]], truth: list[list[str]]) -> float:
+    scores = [len(set(f) & set(t)) / len(t) for f, t in zip(found, truth) if t]
+    return statistics.mean(scores) if scores else 0.0
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+async def main(args: argparse.Namespace) -> None:
+    if not pg.pg_enabled():
+        raise SystemExit("Set DATABASE_URL and SUPABASE_JWT_SECRET (and install asyncpg) first.")
+    random.seed(args.seed)
+
+    pool = await pg.get_pool()
+    async with pool.acquire() as conn:
+        original = await conn.fetchval("SELECT indexdef FROM pg_indexes WHERE indexname = $1", INDEX)
+    original_settings = await function_settings()
+
+    print(f"Seeding {args.users} users ({', '.join(map(str, args.entries))} entries each, cycled)...")
+    corpus = await seed(args.users, args.entries, make_topics(args.topics))
+    expires = int(time.time()) + 24 * 3600
+    tokens = {
+        user_id: mint_jwt({"sub": str(user_id), "role": "authenticated", "exp": expires}, settings.supabase_jwt_secret)
+        for user_id in corpus
+    }
+    # Queries resemble the user's own writing: a perturbed entry of theirs
+    queries = []
+    for _ in range(args.queries):
+        user_id = random.choice(list(corpus))
+        queries.append((tokens[user_id], _near(random.choice(corpus[user_id]), 0.3)))
+
+    truth: list[list[str]] = []
+    try:
+        print(
+            f"\n{'index':<32} {'build s':>8} {'size MB':>8} {'p50 ms':>8} {'p99 ms':>8} "
+            f"{'recall@' + str(args.k):>9} {'rows':>5}"
+        )
+        built = ...   # configurations are grouped, so each index is built once
+        for label, using, gucs in configurations(args):
+            if using != built:
+                build_s, size = await build_index(using)
+                built = using
+            await set_function_settings(list(original_settings), gucs)
+            samples, found = await run_queries(queries, args.k, args.concurrency)
+            if using is None:
+                truth = found
+            print(
+                f"{label:<32} {build_s:>8.1f} {size / 2**20:>8.1f} "
+                f"{_pct(samples, 0.50):>8.2f} {_pct(samples, 0.99):>8.2f} "
+                f"{recall(found, truth):>9.3f} {statistics.mean(len(f) for f in found):>5.1f}"
+            )
+    finally:
+        await cleanup(list(corpus))
+        async with pool.acquire() as conn:
+            await conn.execute(f"DROP INDEX IF EXISTS public.{INDEX}")
+            if original:
+                await conn.execute(original)
+        for fn, config in original_settings.items():
+            await set_function_settings([fn], dict(c.split("=", 1) for c in config), reset=True)
+        await pg.close_pool()
+
+
+def _ints(value: str) -> list[int]:
+    return [int(v) for v in value.split(",") if v]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20, help="synthetic users to seed")
+    parser.add_argument("--entries", type=_ints, default=[200, 2000], help="entries per user, cycled (comma list)")
+    parser.add_argument("--topics", type=int, default=64, help="embedding clusters shared across users")
+    parser.add_argument("--queries", type=int, default=500, help="timed queries per configuration")
+    parser.add_argument("--k", type=int, default=8, help="match_count (search limit)")
+    parser.add_argument("--concurrency", type=int, default=8, help="in-flight queries")
+    parser.add_argument("--ivfflat-lists", type=_ints, default=[100, 500])
+    parser.add_argument("--ivfflat-probes", type=_ints, default=[1, 10, 40])
+    parser.add_argument("--hnsw-m", type=int, default=16)
+    parser.add_argument("--hnsw-ef-construction", type=int, default=64)
+    parser.add_argument("--hnsw-ef-search", type=_ints, default=[40, 100, 200])
+    parser.add_argument("--iterative", action="store_true", help="enable pgvector >= 0.8 iterative index scans")
+    parser.add_argument("--seed", type=int, default=7, help="random seed for reproducible data")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,317 @@
+"""
+scripts/llm_standin.py — Offline OpenAI-compatible stand-in for the LiteLLM proxy.
+
+Serves just enough of the OpenAI API for Vesper to run without spending
+quota:
+
+  POST /v1/chat/completions   analysis JSON, batched analysis
+                              ({"results": [...]}, ids from the [eN] labels)
+                              or weekly-report JSON, chosen by the system
+                              prompt; supports stream=true
+  POST /v1/embeddings         deterministic unit vectors (default 384 dims):
+                              a sum of per-word hashed vectors, so texts
+                              sharing words are similar and search results
+                              are meaningful
+  GET  /v1/models             the model names it answers to
+  GET  /stats                 request / injected-failure counters
+
+Latency and failures are injectable, to exercise the adaptive limiter and
+retries (limiter.py) under load:
+
+  --latency-ms / --jitter-ms       per chat completion (embeddings use
+                                   --embedding-latency-ms)
+  --error-rate                     fraction answered with 500
+  --rate-limit-rate                fraction answered with 429 + Retry-After
+  --max-concurrency                beyond this many in-flight requests,
+                                   answer 429 (a saturated provider)
+
+Usage (from backend/):
+    python -m scripts.llm_standin --port 4010 --latency-ms 400 --rate-limit-rate 0.02
+then run the API with
+    LITELLM_BASE_URL=http://localhost:4010/v1 LITELLM_API_KEY=sk-local
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import re
+import time
+import uuid
+from dataclasses import dataclass
+from functools import lru_cache
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from app.services.ai.analyzer import VALID_DISTORTIONS
+
+DEFAULT_DIMS = 384
+
+_WORD_RE = re.compile(r"[a-z']+")
+_LABEL_RE = re.compile(r"^\[(e\d+)\]", re.MULTILINE)
+
+_THEMES = {
+    "work": "work pressure", "deadline": "work pressure", "boss": "work pressure",
+    "sleep": "sleep", "tired": "sleep", "family": "family", "mother": "family",
+    "friend": "friendship", "lonely": "loneliness", "run": "exercise", "gym": "exercise",
+    "money": "finances", "rent": "finances", "anxious": "anxiety", "worried": "anxiety",
+    "grateful": "gratitude", "happy": "joy", "study": "learning", "exam": "learning",
+}
+_EMOTIONS = ["reflective", "anxious", "hopeful", "tired", "content", "restless"]
+
+
+@dataclass
+class Config:
+    latency_ms: float = 300.0
+    jitter_ms: float = 100.0
+    embedding_latency_ms: float = 40.0
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    retry_after_seconds: float = 1.0
+    max_concurrency: int = 0   # 0 = unlimited
+    stream_chunk_chars: int = 12
+
+
+config = Config()
+counters = {"chat": 0, "embeddings": 0, "inputs_embedded": 0, "errors_500": 0, "errors_429": 0, "in_flight": 0}
+
+app = FastAPI(title="Vesper LLM stand-in")
+
+
+# ---------------------------------------------------------------------------
+# Deterministic content
+# ---------------------------------------------------------------------------
+
+def _seed(text: str) -> int:
+    return int.from_bytes(hashlib.sha256(text.encode()).digest()[:8], "big")
+
+
+@lru_cache(maxsize=50_000)
+def _word_vector(word: str, dims: int) -> tuple[float, ...]:
+    rng = random.Random(_seed(word))
+    return tuple(rng.gauss(0, 1) for _ in range(dims))
+
+
+def embed(text: str, dims: int) -> list[float]:
+    words = _WORD_RE.findall(text.lower()) or [text]
+    total = [0.0] * dims
+    for word in words:
+        for i, x in enumerate(_word_vector(word, dims)):
+            total[i] += x
+    norm = sum(x * x for x in total) ** 0.5 or 1.0
+    return [x / norm for x in total]
+
+
+def analysis_for(text: str) -> dict:
+    rng = random.Random(_seed(text))
+    words = set(_WORD_RE.findall(text.lower()))
+    themes = sorted({theme for word, theme in _THEMES.items() if word in words})[:3] or ["daily life"]
+    distortions = rng.sample(sorted(VALID_DISTORTIONS), k=rng.choice([0, 0, 1, 2]))
+    return {
+        "mood_score": round(rng.uniform(2.0, 9.0), 1),
+        "themes": themes,
+        "distortions": distortions,
+        "observation": (
+            f"Writing about {themes[0]} shows real self-awareness, and naming it "
+            "clearly is a meaningful first step toward feeling steadier."
+        ),
+    }
+
+
+def report_for(text: str) -> dict:
+    rng = random.Random(_seed(text))
+    words = set(_WORD_RE.findall(text.lower()))
+    themes = sorted({theme for word, theme in _THEMES.items() if word in words})[:3] or ["daily life"]
+    return {
+        "dominant_emotion": rng.choice(_EMOTIONS),
+        "top_themes": themes,
+        "emotional_arc": (
+            "The week opened with some tension and gradually settled. Later entries "
+            "read calmer and more reflective than the first ones."
+        ),
+        "ai_observation": (
+            f"{themes[0].capitalize()} came up repeatedly, which suggests it matters a great deal right now. "
+            "There is a steady habit of noticing feelings instead of avoiding them. "
+            "A small, regular wind-down ritual could make the harder days feel more manageable."
+        ),
+    }
+
+
+def completion_content(messages: list[dict]) -> str:
+    system = next((m["content"] for m in messages if m.get("role") == "system"), "")
+    user = "\n".join(m["content"] for m in messages if m.get("role") == "user")
+    if "dominant_emotion" in system:
+        return json.dumps(report_for(user))
+    labels = _LABEL_RE.findall(user)
+    if labels:
+        parts = re.split(r"^\[e\d+\]$", user, flags=re.MULTILINE)[1:]
+        return json.dumps({
+            "results": [{"id": label, **analysis_for(part)} for label, part in zip(labels, parts)]
+        })
+    return json.dumps(analysis_for(user))
+
+
+# ---------------------------------------------------------------------------
+# Failure / latency injection
+# ---------------------------------------------------------------------------
+
+def _error(status: int, kind: str, message: str, headers: dict | None = None) -> JSONResponse:
+    return JSONResponse(
+        {"error": {"message": message, "type": kind, "code": status}},
+        status_code=status,
+        headers=headers,
+    )
+
+
+def _injected_failure() -> JSONResponse | None:
+    if config.max_concurrency and counters["in_flight"] > config.max_concurrency:
+        counters["errors_429"] += 1
+        return _error(429, "rate_limit_error", "Stand-in saturated",
+                      {"retry-after": str(config.retry_after_seconds)})
+    roll = random.random()
+    if roll < config.rate_limit_rate:
+        counters["errors_429"] += 1
+        return _error(429, "rate_limit_error", "Injected rate limit",
+                      {"retry-after": str(config.retry_after_seconds)})
+    if roll < config.rate_limit_rate + config.error_rate:
+        counters["errors_500"] += 1
+        return _error(500, "server_error", "Injected server error")
+    return None
+
+
+async def _sleep(base_ms: float) -> None:
+    delay = base_ms + random.uniform(-config.jitter_ms, config.jitter_ms)
+    await asyncio.sleep(max(0.0, delay) / 1000)
+
+
+@app.middleware("http")
+async def count_in_flight(request: Request, call_next):
+    counters["in_flight"] += 1
+    try:
+        return await call_next(request)
+    finally:
+        counters["in_flight"] -= 1
+
+
+# ---------------------------------------------------------------------------
+# Routes
+# ---------------------------------------------------------------------------
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    counters["chat"] += 1
+    failure = _injected_failure()
+    if failure is not None:
+        return failure
+
+    content = completion_content(body.get("messages", []))
+    model = body.get("model", "standin")
+    completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+    created = int(time.time())
+    usage = {"prompt_tokens": 0, "completion_tokens": len(content) // 4, "total_tokens": len(content) // 4}
+
+    if not body.get("stream"):
+        await _sleep(config.latency_ms)
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": usage,
+        }
+
+    async def events():
+        # Time to first token ≈ a quarter of the latency, the rest spread over chunks
+        await _sleep(config.latency_ms / 4)
+        pieces = [content[i:i + config.stream_chunk_chars] for i in range(0, len(content), config.stream_chunk_chars)]
+        pause = (config.latency_ms * 3 / 4) / max(len(pieces), 1) / 1000
+        for i, piece in enumerate(pieces):
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}],
+            }
+            if i == 0:
+                chunk["choices"][0]["delta"]["role"] = "assistant"
+            yield f"data: {json.dumps(chunk)}\n\n"
+            await asyncio.sleep(pause)
+        done = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": model,
+            "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+        }
+        yield f"data: {json.dumps(done)}\n\n"
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+@app.post("/v1/embeddings")
+async def embeddings(request: Request):
+    body = await request.json()
+    counters["embeddings"] += 1
+    failure = _injected_failure()
+    if failure is not None:
+        return failure
+
+    inputs = body.get("input", [])
+    if isinstance(inputs, str):
+        inputs = [inputs]
+    dims = int(body.get("dimensions") or DEFAULT_DIMS)
+    counters["inputs_embedded"] += len(inputs)
+    await _sleep(config.embedding_latency_ms)
+    return {
+        "object": "list",
+        "data": [
+            {"object": "embedding", "index": i, "embedding": embed(text, dims)}
+            for i, text in enumerate(inputs)
+        ],
+        "model": body.get("model", "standin-embedding"),
+        "usage": {"prompt_tokens": sum(len(t) // 4 for t in inputs), "total_tokens": sum(len(t) // 4 for t in inputs)},
+    }
+
+
+@app.get("/v1/models")
+async def models():
+    return {"object": "list", "data": [{"id": "standin", "object": "model", "owned_by": "vesper"}]}
+
+
+@app.get("/stats")
+async def stats():
+    return {**counters, "config": config.__dict__}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=4010)
+    parser.add_argument("--latency-ms", type=float, default=config.latency_ms, help="mean chat completion latency")
+    parser.add_argument("--jitter-ms", type=float, default=config.jitter_ms, help="± uniform jitter on every latency")
+    parser.add_argument("--embedding-latency-ms", type=float, default=config.embedding_latency_ms)
+    parser.add_argument("--error-rate", type=float, default=config.error_rate, help="fraction of 500 responses")
+    parser.add_argument("--rate-limit-rate", type=float, default=config.rate_limit_rate, help="fraction of 429 responses")
+    parser.add_argument("--retry-after", type=float, default=config.retry_after_seconds, help="Retry-After on 429s (s)")
+    parser.add_argument("--max-concurrency", type=int, default=config.max_concurrency, help="429 above this many in flight (0 = off)")
+    args = parser.parse_args()
+
+    config.latency_ms = args.latency_ms
+    config.jitter_ms = args.jitter_ms
+    config.embedding_latency_ms = args.embedding_latency_ms
+    config.error_rate = args.error_rate
+    config.rate_limit_rate = args.rate_limit_rate
+    config.retry_after_seconds = args.retry_after
+    config.max_concurrency = args.max_concurrency
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
@@ -0,0 +1,284 @@
+"""
+scripts/loadtest.py — Open-loop HTTP load test of the API against local Postgres.
+
+Drives a running API (uvicorn app.main:app) at a target request rate with
+a weighted mix of the hot endpoints:
+
+  create     POST /entries                    (enqueues analysis)
+  update     PUT  /entries/{id}               (re-analysis)
+  list       GET  /entries?limit=20&view=summary
+  search     POST /entries/search             (auto mode)
+  dashboard  GET  /dashboard/stats
+  themes     GET  /drift/themes?with_counts=true
+  timeline   GET  /drift/timeline?bucket=day&max_points=200
+  report     POST /reports/generate
+
+Arrivals are Poisson at --rps regardless of how fast responses come back
+(open loop), so a saturated server shows up as growing latency and, past
+--max-in-flight, as dropped requests — not as a quietly lower request rate.
+Per endpoint it prints completed requests, throughput, non-2xx responses and
+p50 / p95 / p99 / max latency.
+
+Synthetic users are inserted into auth.users of the local fixture
+(scripts/local_pg/docker-compose.yml), authenticated with minted JWTs, given
+--seed-entries entries each through the API, and deleted afterwards.
+Run the API and the analysis workers against the offline LLM stand-in
+(scripts/llm_standin.py) so no model quota is spent.
+
+Usage (from backend/, fixture running, env vars from the compose file set):
+    python -m scripts.llm_standin --port 4010 &
+    LITELLM_BASE_URL=http://localhost:4010/v1 uvicorn app.main:app --port 8000 &
+    python -m scripts.loadtest --rps 50 --duration 60 --users 20
+    python -m scripts.loadtest --mix list=5,search=3,dashboard=2   # read-only
+"""
+
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+import httpx
+
+from app.core import pg
+from app.core.config import settings
+from scripts.bench_repository import _pct, mint_jwt
+
+DEFAULT_MIX = "create=2,update=1,list=6,search=3,dashboard=3,themes=2,timeline=2,report=0.2"
+
+_TOPICS = {
+    "work": ["deadline", "meeting", "boss", "project", "presentation", "inbox"],
+    "sleep": ["tired", "insomnia", "nap", "woke", "dreams", "alarm"],
+    "family": ["mother", "father", "sister", "dinner", "call", "visit"],
+    "exercise": ["gym", "run", "walk", "yoga", "stretch", "bike"],
+    "money": ["rent", "budget", "bills", "savings", "salary", "groceries"],
+    "friends": ["friend", "party", "message", "lonely", "coffee", "laughed"],
+}
+_FEELINGS = ["anxious", "happy", "grateful", "worried", "calm", "frustrated", "hopeful", "drained"]
+
+
+def entry_text(rng: random.Random) -> str:
+    """A few paragraphs about one or two topics — enough for search and themes to vary."""
+    topics = rng.sample(list(_TOPICS), k=rng.choice([1, 2]))
+    paragraphs = []
+    for _ in range(rng.randint(1, 4)):
+        sentences = []
+        for _ in range(rng.randint(2, 6)):
+            topic = rng.choice(topics)
+            words = rng.sample(_TOPICS[topic], k=2)
+            sentences.append(
+                f"Today the {words[0]} left me feeling {rng.choice(_FEELINGS)}, "
+                f"and I kept thinking about the {words[1]} and what it means for me."
+            )
+        paragraphs.append(" ".join(sentences))
+    return "\n\n".join(paragraphs)
+
+
+def search_query(rng: random.Random) -> str:
+    topic = rng.choice(list(_TOPICS))
+    if rng.random() < 0.5:
+        return rng.choice(_TOPICS[topic])   # keyword → lexical fast path
+    return f"times I felt {rng.choice(_FEELINGS)} about {rng.choice(_TOPICS[topic])}"
+
+
+# ---------------------------------------------------------------------------
+# Users
+# ---------------------------------------------------------------------------
+
+@dataclass
+class User:
+    id: uuid.UUID
+    headers: dict[str, str]
+    entry_ids: list[str] = field(default_factory=list)
+
+
+async def create_users(n: int) -> list[User]:
+    """Insert users as the superuser (bypasses RLS) and mint their JWTs."""
+    pool = await pg.get_pool()
+    expires = int(time.time()) + 24 * 3600
+    users = []
+    async with pool.acquire() as conn:
+        for _ in range(n):
+            user_id = uuid.uuid4()
+            await conn.execute("INSERT INTO auth.users (id, email) VALUES ($1, $2)", user_id, f"{user_id}@load.local")
+            token = mint_jwt({"sub": str(user_id), "role": "authenticated", "exp": expires}, settings.supabase_jwt_secret)
+            users.append(User(user_id, {"Authorization": f"Bearer {token}"}))
+    return users
+
+
+async def cleanup(users: list[User]) -> None:
+    pool = await pg.get_pool()
+    async with pool.acquire() as conn:
+        await conn.execute("DELETE FROM auth.users WHERE id = ANY($1::uuid[])", [u.id for u in users])
+
+
+async def seed_entries(client: httpx.AsyncClient, users: list[User], per_user: int, rng: random.Random) -> None:
+    sem = asyncio.Semaphore(16)
+
+    async def one(user: User) -> None:
+        async with sem:
+            response = await client.post("/entries", json={"content": entry_text(rng)}, headers=user.headers)
+            response.raise_for_status()
+            user.entry_ids.append(response.json()["id"])
+
+    await asyncio.gather(*(one(u) for u in users for _ in range(per_user)))
+
+
+# ---------------------------------------------------------------------------
+# Endpoint mix
+# ---------------------------------------------------------------------------
+
+async def call(name: str, client: httpx.AsyncClient, user: User, rng: random.Random) -> httpx.Response:
+    h = user.headers
+    if name == "create":
+        response = await client.post("/entries", json={"content": entry_text(rng)}, headers=h)
+        if response.status_code == 201:
+            user.entry_ids.append(response.json()["id"])
+        return response
+    if name == "update":
+        if not user.entry_ids:
+            return await client.post("/entries", json={"content": entry_text(rng)}, headers=h)
+        entry_id = rng.choice(user.entry_ids)
+        return await client.put(f"/entries/{entry_id}", json={"content": entry_text(rng)}, headers=h)
+    if name == "list":
+        return await client.get("/entries", params={"limit": 20, "view": "summary"}, headers=h)
+    if name == "search":
+        return await client.post("/entries/search", json={"query": search_query(rng)}, headers=h)
+    if name == "dashboard":
+        return await client.get("/dashboard/stats", headers=h)
+    if name == "themes":
+        return await client.get("/drift/themes", params={"with_counts": "true"}, headers=h)
+    if name == "timeline":
+        return await client.get("/drift/timeline", params={"bucket": "day", "max_points": 200}, headers=h)
+    if name == "report":
+        return await client.post("/reports/generate", headers=h)
+    raise ValueError(f"Unknown endpoint {name!r}")
+
+
+def parse_mix(value: str) -> dict[str, float]:
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+# ---------------------------------------------------------------------------
+# Run
+# ---------------------------------------------------------------------------
+
+@dataclass
+class Results:
+    latencies: dict[str, list[float]] = field(default_factory=lambda: defaultdict(list))
+    errors: dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    statuses: dict[str, dict[int, int]] = field(default_factory=lambda: defaultdict(lambda: defaultdict(int)))
+    dropped: int = 0
+
+
+async def run(client: httpx.AsyncClient, users: list[User], args: argparse.Namespace, rng: random.Random) -> tuple[Results, float]:
+    mix = parse_mix(args.mix)
+    for name in mix:
+        if name not in ("create", "update", "list", "search", "dashboard", "themes", "timeline", "report"):
+            raise SystemExit(f"Unknown endpoint in --mix: {name}")
+    names, weights = list(mix), list(mix.values())
+    results = Results()
+    in_flight: set[asyncio.Task] = set()
+
+    async def one(name: str, user: User) -> None:
+        start = time.perf_counter()
+        try:
+            response = await call(name, client, user, rng)
+            status = response.status_code
+        except httpx.HTTPError:
+            status = 0   # connection error / timeout
+        results.latencies[name].append((time.perf_counter() - start) * 1000)
+        results.statuses[name][status] += 1
+        if not 200 <= status < 300:
+            results.errors[name] += 1
+
+    started = time.perf_counter()
+    deadline = started + args.duration
+    next_at = started
+    while next_at < deadline:
+        delay = next_at - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if len(in_flight) >= args.max_in_flight:
+            results.dropped += 1
+        else:
+            name = rng.choices(names, weights)[0]
+            task = asyncio.create_task(one(name, rng.choice(users)))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+        next_at += rng.expovariate(args.rps)
+
+    if in_flight:
+        await asyncio.wait(in_flight)
+    return results, time.perf_counter() - started
+
+
+def report(results: Results, elapsed: float) -> None:
+    print(
+        f"\n{'endpoint':<10} {'count':>7} {'req/s':>7} {'errors':>7} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}  statuses"
+    )
+    everything: list[float] = []
+    for name in sorted(results.latencies):
+        samples = results.latencies[name]
+        everything.extend(samples)
+        statuses = " ".join(f"{s}×{n}" for s, n in sorted(results.statuses[name].items()))
+        print(
+            f"{name:<10} {len(samples):>7} {len(samples) / elapsed:>7.1f} {results.errors[name]:>7} "
+            f"{_pct(samples, 0.50):>8.1f} {_pct(samples, 0.95):>8.1f} {_pct(samples, 0.99):>8.1f} "
+            f"{max(samples):>8.1f}  {statuses}"
+        )
+    if everything:
+        print(
+            f"{'total':<10} {len(everything):>7} {len(everything) / elapsed:>7.1f} "
+            f"{sum(results.errors.values()):>7} {_pct(everything, 0.50):>8.1f} "
+            f"{_pct(everything, 0.95):>8.1f} {_pct(everything, 0.99):>8.1f} {max(everything):>8.1f}"
+        )
+    if results.dropped:
+        print(f"\n{results.dropped} arrivals dropped at --max-in-flight — the server is not keeping up.")
+
+
+async def main(args: argparse.Namespace) -> None:
+    if not pg.pg_enabled():
+        raise SystemExit("Set DATABASE_URL and SUPABASE_JWT_SECRET (and install asyncpg) first.")
+    rng = random.Random(args.seed)
+
+    users = await create_users(args.users)
+    limits = httpx.Limits(max_connections=args.max_in_flight, max_keepalive_connections=args.max_in_flight)
+    try:
+        async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+            print(f"Seeding {args.users} users × {args.seed_entries} entries through the API...")
+            await seed_entries(client, users, args.seed_entries, rng)
+            if args.settle:
+                print(f"Waiting {args.settle:.0f}s for the analysis queue to drain...")
+                await asyncio.sleep(args.settle)
+
+            print(f"Running {args.duration:.0f}s at {args.rps:g} req/s (mix: {args.mix})...")
+            results, elapsed = await run(client, users, args, rng)
+        report(results, elapsed)
+    finally:
+        if not args.keep:
+            await cleanup(users)
+        await pg.close_pool()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000", help="running API")
+    parser.add_argument("--rps", type=float, default=20, help="target arrival rate")
+    parser.add_argument("--duration", type=float, default=60, help="seconds of load")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="endpoint=weight comma list")
+    parser.add_argument("--users", type=int, default=10, help="synthetic users (requests pick one at random)")
+    parser.add_argument("--seed-entries", type=int, default=30, help="entries created per user before the run")
+    parser.add_argument("--settle", type=float, default=10, help="seconds to let seeded entries be analysed")
+    parser.add_argument("--max-in-flight", type=int, default=256, help="arrivals beyond this are dropped")
+    parser.add_argument("--timeout", type=float, default=30, help="per-request timeout (s)")
+    parser.add_argument("--keep", action="store_true", help="keep the synthetic users afterwards")
+    parser.add_argument("--seed", type=int, default=7, help="random seed for reproducible traffic")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,63 @@
+-- =============================================================================
+-- Vesper — Local Postgres stand-in for the Supabase platform schema
+-- =============================================================================
+-- Recreates just enough of Supabase (roles, auth.users, auth.uid()) for
+-- supabase_init.sql and match_entries_rpc.sql to run unchanged on a plain
+-- pgvector-enabled Postgres. Used by docker-compose.yml in this folder.
+-- =============================================================================
+
+
+-- -----------------------------------------------------------------------------
+-- 1. ROLES — same names PostgREST / Supabase use
+-- -----------------------------------------------------------------------------
+
+CREATE ROLE anon          NOLOGIN;
+CREATE ROLE authenticated NOLOGIN;
+CREATE ROLE service_role  NOLOGIN BYPASSRLS;
+
+-- PostgREST logs in as authenticator and switches role per request
+CREATE ROLE authenticator LOGIN PASSWORD 'postgres' NOINHERIT;
+GRANT anon, authenticated, service_role TO authenticator;
+GRANT anon, authenticated, service_role TO postgres;
+
+
+-- -----------------------------------------------------------------------------
+-- 2. AUTH SCHEMA
+-- -----------------------------------------------------------------------------
+
+CREATE SCHEMA IF NOT EXISTS auth;
+
+CREATE TABLE IF NOT EXISTS auth.users (
+    id      uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    email   text
+);
+
+-- Same resolution order as Supabase: legacy per-claim GUC, then the JSON blob
+CREATE OR REPLACE FUNCTION auth.uid()
+RETURNS uuid
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT nullif(
+    coalesce(
+      current_setting('request.jwt.claim.sub', true),
+      current_setting('request.jwt.claims', true)::jsonb ->> 'sub'
+    ),
+    ''
+  )::uuid;
+$$;
+
+
+-- -----------------------------------------------------------------------------
+-- 3. GRANTS
+-- -----------------------------------------------------------------------------
+
+GRANT USAGE ON SCHEMA auth, public TO anon, authenticated, service_role;
+GRANT SELECT ON auth.users TO authenticated, service_role;
+
+ALTER DEFAULT PRIVILEGES IN SCHEMA public
+    GRANT ALL ON TABLES TO anon, authenticated, service_role;
+ALTER DEFAULT PRIVILEGES IN SCHEMA public
+    GRANT ALL ON SEQUENCES TO anon, authenticated, service_role;
+ALTER DEFAULT PRIVILEGES IN SCHEMA public
+    GRANT EXECUTE ON FUNCTIONS TO anon, authenticated, service_role;
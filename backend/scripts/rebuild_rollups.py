@@ -0,0 +1,46 @@
+"""
+scripts/rebuild_rollups.py — Repair drift in public.daily_rollups.
+
+Recomputes every rollup row from the entries table via the
+rebuild_daily_rollups RPC (daily_rollups.sql). Runs with the service-role
+key, so it can rebuild all users or a single one.
+
+The API can't see this write: cached /dashboard and /drift responses stay
+stale for up to RESPONSE_CACHE_TTL_SECONDS (http_cache.py).
+
+Usage (from backend/):
+    python -m scripts.rebuild_rollups                 # every user
+    python -m scripts.rebuild_rollups --user <uuid>   # one user
+"""
+
+import argparse
+import asyncio
+import time
+from uuid import UUID
+
+from app.core.config import settings
+from app.core.supabase import close_supabase, get_supabase
+
+
+async def main(user_id: UUID | None) -> None:
+    if not settings.supabase_service_key:
+        raise SystemExit("SUPABASE_SERVICE_KEY is required to rebuild rollups.")
+
+    sb = get_supabase(access_token=settings.supabase_service_key)
+    start = time.perf_counter()
+    try:
+        result = await sb.rpc(
+            "rebuild_daily_rollups",
+            {"p_user": str(user_id) if user_id else None},
+        ).execute()
+    finally:
+        await close_supabase()
+
+    scope = f"user {user_id}" if user_id else "all users"
+    print(f"Rebuilt {result.data} day rollups for {scope} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--user", type=UUID, default=None, help="only rebuild this user's rollups")
+    asyncio.run(main(parser.parse_args().user))
@@ -0,0 +1,101 @@
+"""
+tests/conftest.py — Shared fixtures.
+
+Database tests run against the local Postgres + PostgREST fixture
+(scripts/local_pg/docker-compose.yml) with the env vars from its header
+set; they are skipped when it isn't reachable, so `python -m pytest`
+from backend/ always runs the pure unit tests.
+
+Everything async runs on one session-wide event loop (`run`), because the
+asyncpg and PostgREST pools are process-wide singletons bound to the loop
+that created them.
+
+`standin` points the analyzer's OpenAI client at scripts/llm_standin.py
+in-process (no port, no latency), so AI calls cost nothing and are
+deterministic.
+"""
+
+import asyncio
+import time
+import uuid
+
+import httpx
+import pytest
+from openai import AsyncOpenAI
+
+from app.core import pg
+from app.core.config import settings
+from app.core.supabase import close_supabase
+from app.services.ai import analyzer
+from scripts import llm_standin
+from scripts.bench_repository import mint_jwt
+
+
+@pytest.fixture(scope="session")
+def run():
+    loop = asyncio.new_event_loop()
+    yield loop.run_until_complete
+    loop.run_until_complete(close_supabase())
+    loop.run_until_complete(pg.close_pool())
+    loop.close()
+
+
+@pytest.fixture(scope="session")
+def local_pg(run):
+    """The asyncpg superuser pool of the local fixture, or skip."""
+    if not pg.pg_enabled():
+        pytest.skip("local Postgres not configured (DATABASE_URL, SUPABASE_JWT_SECRET, asyncpg)")
+    try:
+        pool = run(asyncio.wait_for(pg.get_pool(), timeout=5))
+    except Exception as exc:
+        pytest.skip(f"local Postgres unavailable: {exc}")
+    return pool
+
+
+@pytest.fixture(scope="session")
+def local_postgrest(local_pg):
+    """Skip unless the fixture's PostgREST answers too."""
+    if not settings.postgrest_url:
+        pytest.skip("POSTGREST_URL not set")
+    try:
+        httpx.get(settings.postgrest_url, timeout=2)
+    except httpx.HTTPError as exc:
+        pytest.skip(f"PostgREST unavailable: {exc}")
+
+
+@pytest.fixture
+def make_user(run, local_pg):
+    """Factory: insert a user into auth.users, return (user_id, JWT); deleted afterwards."""
+    created: list[uuid.UUID] = []
+
+    def factory() -> tuple[uuid.UUID, str]:
+        user_id = uuid.uuid4()
+        run(local_pg.execute(
+            "INSERT INTO auth.users (id, email) VALUES ($1, $2)", user_id, f"{user_id}@test.local",
+        ))
+        created.append(user_id)
+        token = mint_jwt(
+            {"sub": str(user_id), "role": "authenticated", "exp": int(time.time()) + 3600},
+            settings.supabase_jwt_secret,
+        )
+        return user_id, token
+
+    yield factory
+    if created:
+        run(local_pg.execute("DELETE FROM auth.users WHERE id = ANY($1::uuid[])", created))
+
+
+@pytest.fixture
+def standin(monkeypatch):
+    """Route analyzer calls to the in-process LLM stand-in; yields its counters."""
+    monkeypatch.setattr(llm_standin, "config", llm_standin.Config(latency_ms=0, jitter_ms=0, embedding_latency_ms=0))
+    for key in llm_standin.counters:
+        monkeypatch.setitem(llm_standin.counters, key, 0)
+    client = AsyncOpenAI(
+        api_key="sk-test",
+        base_url="http://standin/v1",
+        http_client=httpx.AsyncClient(transport=httpx.ASGITransport(app=llm_standin.app)),
+        max_retries=0,
+    )
+    monkeypatch.setattr(analyzer, "_client", client)
+    yield llm_standin.counters
@@ -0,0 +1,74 @@
+"""
+tests/test_analyse_batch.py — Reply shapes of the batched analysis completion.
+
+limited_call is stubbed with a canned reply; analyse_entry records which
+entries fall back to a single-entry call.
+"""
+
+import json
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+from app.services.ai import analyzer
+from app.services.ai.analyzer import AnalysisResult
+
+
+def _item(label: str, **overrides) -> dict:
+    return {
+        "id": label, "mood_score": 6, "themes": ["work"], "distortions": ["catastrophizing"],
+        "observation": f"Observation for {label.strip('[] ')}.", **overrides,
+    }
+
+
+@pytest.mark.parametrize("reply, retried", [
+    (json.dumps({"results": [_item("e1"), _item("e2"), _item("e3")]}), set()),
+    (json.dumps({"e1": _item("e1"), "e2": _item("e2"), "e3": _item("e3")}), set()),            # keyed by id
+    (json.dumps({"results": [_item("[e1]"), _item(" e2 "), _item("[e3]")]}), set()),          # bracketed ids
+    ("```json\n" + json.dumps({"results": [_item("e1"), _item("e2"), _item("e3")]}) + "\n```", set()),
+    (json.dumps({"results": [_item("e1"), _item("e3")]}), {"b"}),                             # item missing
+    (json.dumps({"results": [_item("e1"), _item("e2", mood_score="high"), _item("e3")]}), {"b"}),
+    (json.dumps({"results": [_item("e1"), _item("e2", themes="work"), _item("e3")]}), {"b"}),  # wrong type
+    (json.dumps({"results": [_item("e1"), "e2", _item("e9"), _item("e3")]}), {"b"}),         # junk items
+    (json.dumps({"results": [_item("e1"), _item("e1", mood_score=1), _item("e2"), _item("e3")]}), set()),
+    (json.dumps([_item("e1"), _item("e2"), _item("e3")]), {"a", "b", "c"}),                   # not an object
+    (json.dumps({"summary": "no items"}), {"a", "b", "c"}),
+    ("Sorry, I can't help with that.", {"a", "b", "c"}),                                     # not JSON
+], ids=[
+    "results", "keyed", "bracketed", "fenced", "missing", "invalid-mood", "invalid-themes",
+    "junk", "duplicate", "array", "no-items", "non-json",
+])
+def test_reply_shapes(run, monkeypatch, reply, retried):
+    calls = []
+
+    async def limited_call(kind, fn, **kwargs):
+        calls.append((kind, kwargs["messages"][1]["content"]))
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=reply))])
+
+    singles = []
+
+    async def analyse_entry(text):
+        singles.append(text)
+        return AnalysisResult(mood_score=5, themes=[], distortions=[], observation="single")
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=None)))
+    monkeypatch.setattr(analyzer, "_get_client", lambda: client)
+    monkeypatch.setattr(analyzer, "limited_call", limited_call)
+    monkeypatch.setattr(analyzer, "analyse_entry", analyse_entry)
+
+    tag = uuid4().hex   # unique texts: nothing comes from the AI cache
+    texts = {key: f"Entry {key} {tag}: a long enough journal entry about work." for key in "abc"}
+    results = run(analyzer.analyse_entries(texts))
+
+    assert [kind for kind, _ in calls] == ["chat_batch"]
+    assert all(f"[e{i}]" in calls[0][1] for i in (1, 2, 3))
+    assert set(singles) == {texts[key] for key in retried}
+    assert set(results) == set(texts)
+    for n, key in enumerate("abc", 1):
+        result = results[key]
+        assert isinstance(result, AnalysisResult)
+        if key in retried:
+            assert result.observation == "single"
+        else:   # the first item with a given id wins
+            assert result.observation == f"Observation for e{n}." and result.mood_score == 6
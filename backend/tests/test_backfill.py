@@ -0,0 +1,133 @@
+"""
+tests/test_backfill.py — scripts/backfill.py against the in-process LLM stand-in.
+"""
+
+import argparse
+import asyncio
+import json
+from uuid import uuid4
+
+import pytest
+
+from app.core.config import settings
+from app.services.ai.analyzer import EMBEDDING_VERSION, analysis_version
+from scripts import backfill
+
+LONG_TEXT = (
+    "Work was stressful again and the deadline kept me up late, so I slept badly "
+    "and felt anxious all morning before a long walk with a friend helped a lot."
+)
+
+
+def _args(tmp_path, **overrides) -> argparse.Namespace:
+    defaults = dict(mode="all", batch_size=2, concurrency=4, checkpoint=tmp_path / "checkpoint.json", restart=False)
+    return argparse.Namespace(**{**defaults, **overrides})
+
+
+def test_checkpoint_is_discarded_when_versions_change(tmp_path):
+    path = tmp_path / "checkpoint.json"
+    scope = {"mode": "all", "analysis_version": "m:1", "embedding_version": "e:1"}
+    backfill.save_checkpoint(path, {**scope, "after": "abc", "written": 3, "skipped": 0, "failed": 0})
+
+    assert backfill.load_checkpoint(path, scope, restart=False)["after"] == "abc"
+    assert backfill.load_checkpoint(path, scope, restart=True)["after"] is None
+    changed = {**scope, "analysis_version": "m:2"}
+    assert backfill.load_checkpoint(path, changed, restart=False)["after"] is None
+    assert json.loads(path.read_text())["written"] == 3
+
+
+def _entry(content: str = LONG_TEXT, **flags) -> dict:
+    return {
+        "id": str(uuid4()), "content_version": 1, "content": content,
+        "needs_analysis": True, "needs_embedding": True, **flags,
+    }
+
+
+def test_process_entry_stamps_versions(run, standin):
+    entry = _entry()
+    analyses = run(backfill.analyse_entries({entry["id"]: entry["content"]}))
+    row, chunks, failed = run(backfill.process_entry(entry, asyncio.Semaphore(1), analyses[entry["id"]]))
+
+    assert not failed
+    assert row["analysis_version"] == analysis_version()
+    assert row["embedding_version"] == EMBEDDING_VERSION
+    assert row["content_version"] == 1 and len(row["embedding"]) == 384
+    assert chunks["id"] == entry["id"] and len(chunks["chunks"]) == 1
+
+    short = _entry("Too short.")
+    assert run(backfill.process_entry(short, asyncio.Semaphore(1), None)) == (None, None, False)
+
+
+def test_process_entry_only_redoes_the_stale_half(run, standin):
+    entry = _entry(needs_embedding=False)
+    analyses = run(backfill.analyse_entries({entry["id"]: entry["content"]}))
+    row, chunks, _ = run(backfill.process_entry(entry, asyncio.Semaphore(1), analyses[entry["id"]]))
+    assert row["analysis_version"] == analysis_version()
+    assert "embedding" not in row and chunks is None
+    assert standin["embeddings"] == 0
+
+    calls = dict(standin)
+    entry = _entry(needs_analysis=False)
+    row, chunks, _ = run(backfill.process_entry(entry, asyncio.Semaphore(1), None))
+    assert "analysis_version" not in row and row["embedding_version"] == EMBEDDING_VERSION
+    assert standin["chat"] == calls["chat"]
+
+    # Stored chunks with the same content hash are reused, not re-embedded
+    calls = dict(standin)
+    previous = {c["content_hash"]: c["embedding"] for c in chunks["chunks"]}
+    again, _, _ = run(backfill.process_entry(entry, asyncio.Semaphore(1), None, previous))
+    assert again["embedding"] == row["embedding"]
+    assert standin["embeddings"] == calls["embeddings"]
+
+
+@pytest.mark.usefixtures("local_postgrest")
+def test_backfill_stamps_versions_and_reruns_skip_done_rows(run, local_pg, make_user, standin, tmp_path):
+    if not settings.supabase_service_key:
+        pytest.skip("SUPABASE_SERVICE_KEY not set")
+    user_id, _ = make_user()
+    long_ids = [uuid4() for _ in range(3)]
+    short_id = uuid4()
+    run(local_pg.executemany(
+        "INSERT INTO public.entries (id, user_id, content) VALUES ($1, $2, $3)",
+        [(i, user_id, f"{LONG_TEXT} Entry {n}.") for n, i in enumerate(long_ids)] + [(short_id, user_id, "Too short.")],
+    ))
+
+    run(backfill.main(_args(tmp_path)))
+
+    rows = {r["id"]: r for r in run(local_pg.fetch(
+        """
+        SELECT e.id, e.analyzed, e.analysis_version, e.embedding_version,
+               (SELECT count(*) FROM public.entry_chunks c WHERE c.entry_id = e.id) AS chunks
+        FROM public.entries e WHERE e.user_id = $1
+        """,
+        user_id,
+    ))}
+    for entry_id in long_ids:
+        assert rows[entry_id]["analyzed"]
+        assert rows[entry_id]["analysis_version"] == analysis_version()
+        assert rows[entry_id]["embedding_version"] == EMBEDDING_VERSION
+        assert rows[entry_id]["chunks"] >= 1
+    assert rows[short_id]["analysis_version"] is None   # too short: left alone
+    assert standin["chat"] >= 1 and standin["inputs_embedded"] >= len(long_ids)
+
+    # Stamped rows no longer qualify (the AI cache would hide a re-run's calls)
+    pending = run(local_pg.fetch(
+        "SELECT id FROM public.backfill_entry_batch($1, $2, 'all', NULL, 10000)",
+        analysis_version(), EMBEDDING_VERSION,
+    ))
+    assert not {r["id"] for r in pending} & set(long_ids)
+
+    # A new prompt only flags the analysis half
+    flagged = run(local_pg.fetch(
+        "SELECT id, needs_analysis, needs_embedding FROM public.backfill_entry_batch($1, $2, 'all', NULL, 10000)",
+        "other-model:prompt", EMBEDDING_VERSION,
+    ))
+    flagged = {r["id"]: r for r in flagged if r["id"] in long_ids}
+    assert set(flagged) == set(long_ids)
+    assert all(r["needs_analysis"] and not r["needs_embedding"] for r in flagged.values())
+
+    # ... so a rerun from scratch makes no AI calls for them
+    calls = dict(standin)
+    run(backfill.main(_args(tmp_path, restart=True)))
+    assert standin["chat"] == calls["chat"]
+    assert standin["embeddings"] == calls["embeddings"]
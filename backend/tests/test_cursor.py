@@ -0,0 +1,36 @@
+"""
+tests/test_cursor.py — Keyset cursors for GET /entries (app/services/repository.py).
+"""
+
+from uuid import uuid4
+
+import pytest
+
+from app.services.repository import _split_page, decode_cursor, encode_cursor
+
+
+def test_round_trip():
+    entry_id = uuid4()
+    cursor = encode_cursor({"created_at": "2026-03-01T09:15:00.123456+00:00", "id": entry_id})
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == ("2026-03-01T09:15:00.123456+00:00", entry_id)
+
+
+@pytest.mark.parametrize("cursor", [
+    "",
+    "not-base64!",
+    encode_cursor({"created_at": "yesterday", "id": uuid4()}),
+    encode_cursor({"created_at": "2026-03-01T09:15:00Z", "id": "not-a-uuid"}),
+    encode_cursor({"created_at": "2026-03-01T09:15:00Z'; DROP TABLE entries; --", "id": uuid4()}),
+])
+def test_malformed_cursors_raise_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_split_page_cursor_points_at_the_last_returned_row():
+    rows = [{"created_at": f"2026-03-0{9 - i}T00:00:00Z", "id": uuid4()} for i in range(4)]
+    page, cursor = _split_page(rows, 3)
+    assert page == rows[:3]
+    assert decode_cursor(cursor) == (rows[2]["created_at"], rows[2]["id"])
+    assert _split_page(rows, 4) == (rows, None)
@@ -0,0 +1,53 @@
+"""
+tests/test_downsample.py — Largest-Triangle-Three-Buckets (app/services/downsample.py).
+"""
+
+import math
+
+import pytest
+
+from app.services.downsample import lttb
+
+
+def _series(n: int) -> list[tuple[float, float]]:
+    return [(float(i), math.sin(i / 7) * 10 + (i % 3)) for i in range(n)]
+
+
+def _lttb(points, threshold):
+    return lttb(points, threshold, x=lambda p: p[0], y=lambda p: p[1])
+
+
+@pytest.mark.parametrize("threshold", [3, 4, 10, 99])
+def test_keeps_endpoints_and_respects_threshold(threshold):
+    points = _series(100)
+    sampled = _lttb(points, threshold)
+    assert len(sampled) == threshold
+    assert sampled[0] == points[0]
+    assert sampled[-1] == points[-1]
+
+
+def test_returns_original_points_in_order():
+    points = _series(500)
+    sampled = _lttb(points, 40)
+    assert all(p in points for p in sampled)
+    assert [p[0] for p in sampled] == sorted(p[0] for p in sampled)
+    assert len({p[0] for p in sampled}) == len(sampled)
+
+
+def test_short_series_are_returned_whole():
+    points = _series(5)
+    assert _lttb(points, 5) == points
+    assert _lttb(points, 50) == points
+
+
+def test_tiny_thresholds():
+    points = _series(10)
+    assert _lttb(points, 2) == [points[0], points[-1]]
+    assert _lttb(points, 1) == [points[0]]
+    assert _lttb(points, 0) == []
+
+
+def test_keeps_a_lone_spike():
+    points = [(float(i), 0.0) for i in range(200)]
+    points[123] = (123.0, 50.0)
+    assert (123.0, 50.0) in _lttb(points, 20)
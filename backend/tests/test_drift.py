@@ -0,0 +1,59 @@
+"""
+tests/test_drift.py — Timeline bucketing in app/api/drift.py.
+"""
+
+from datetime import date
+from zoneinfo import ZoneInfo
+
+from app.api.drift import _bucket_rollups, _bucket_start, _entry_rollups
+
+
+def _day(day: str, *scores: float) -> dict:
+    return {
+        "day": day, "mood_count": len(scores), "mood_sum": float(sum(scores)),
+        "mood_min": min(scores, default=None), "mood_max": max(scores, default=None),
+    }
+
+
+def test_bucket_boundaries():
+    assert _bucket_start(date(2026, 3, 1), "week") == date(2026, 2, 23)    # Sunday → Monday before
+    assert _bucket_start(date(2026, 3, 2), "week") == date(2026, 3, 2)     # Monday starts its week
+    assert _bucket_start(date(2026, 3, 31), "month") == date(2026, 3, 1)
+    assert _bucket_start(date(2026, 3, 31), "day") == date(2026, 3, 31)
+
+
+def test_weeks_split_between_sunday_and_monday():
+    rows = [_day("2026-03-01", 4), _day("2026-03-02", 8), _day("2026-03-08", 6)]
+    points = _bucket_rollups(rows, "week")
+    assert [p["bucket"] for p in points] == ["2026-02-23", "2026-03-02"]
+    assert points[1] == {"bucket": "2026-03-02", "mood_mean": 7.0, "mood_min": 6, "mood_max": 8, "count": 2}
+
+
+def test_months_merge_days_and_skip_empty_ones():
+    rows = [_day("2026-01-31", 2), _day("2026-02-01"), _day("2026-02-01", 3, 9), _day("2026-02-28", 6)]
+    points = _bucket_rollups(rows, "month")
+    assert points == [
+        {"bucket": "2026-01-01", "mood_mean": 2.0, "mood_min": 2, "mood_max": 2, "count": 1},
+        {"bucket": "2026-02-01", "mood_mean": 6.0, "mood_min": 3, "mood_max": 9, "count": 3},
+    ]
+
+
+def test_entry_rollups_use_the_local_day():
+    entries = [
+        {"created_at": "2026-03-01T22:30:00+00:00", "mood_score": 4.0},   # 23:30 in Berlin
+        {"created_at": "2026-03-01T23:30:00.5+00:00", "mood_score": 8.0},  # 00:30 next day
+    ]
+    assert [r["day"] for r in _entry_rollups(entries, ZoneInfo("UTC"))] == ["2026-03-01"]
+    assert [r["day"] for r in _entry_rollups(entries, ZoneInfo("Europe/Berlin"))] == ["2026-03-01", "2026-03-02"]
+
+
+def test_theme_filtered_buckets_count_each_entry_once():
+    # drift_timeline returns each matching entry once, whatever its themes
+    entries = [
+        {"created_at": "2026-03-02T09:00:00Z", "mood_score": 2.0, "themes": ["work stress", "work travel"]},
+        {"created_at": "2026-03-04T09:00:00Z", "mood_score": 8.0, "themes": ["work stress"]},
+    ]
+    for bucket in ("day", "week", "month"):
+        points = _bucket_rollups(_entry_rollups(entries, ZoneInfo("UTC")), bucket)
+        assert sum(p["count"] for p in points) == 2
+    assert _bucket_rollups(_entry_rollups(entries, ZoneInfo("UTC")), "week")[0]["mood_mean"] == 5.0
@@ -0,0 +1,89 @@
+"""
+tests/test_http_cache.py — ETag / 304 handling in ConditionalGetMiddleware.
+"""
+
+import time
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core import http_cache
+from app.core.config import settings
+from scripts.bench_repository import mint_jwt
+
+SECRET = "test-jwt-secret-at-least-32-characters-long"
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(settings, "supabase_jwt_secret", SECRET)
+    monkeypatch.setattr(http_cache, "response_cache", http_cache.ResponseCache(max_bytes=1 << 20))
+    app = FastAPI()
+    app.add_middleware(http_cache.ConditionalGetMiddleware)
+
+    @app.get("/entries")
+    async def entries():
+        return []
+
+    @app.get("/dashboard/stats")
+    async def stats():
+        return {}
+
+    return TestClient(app)
+
+
+def _token(sub: str, secret: str = SECRET, exp_in: int = 3600) -> dict:
+    token = mint_jwt({"sub": sub, "role": "authenticated", "exp": int(time.time()) + exp_in}, secret)
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_valid_token_revalidates_with_304(client):
+    headers = _token(str(uuid.uuid4()))
+    etag = client.get("/entries", headers=headers).headers["etag"]
+    assert client.get("/entries", headers={**headers, "If-None-Match": etag}).status_code == 304
+
+
+@pytest.mark.parametrize("forged", [
+    lambda sub: _token(sub, secret="some-other-secret-of-at-least-32-chars"),
+    lambda sub: _token(sub, exp_in=-60),
+])
+def test_forged_or_expired_token_gets_no_304_or_etag(client, forged):
+    victim = str(uuid.uuid4())
+    etag = client.get("/entries", headers=_token(victim)).headers["etag"]
+
+    response = client.get("/entries", headers={**forged(victim), "If-None-Match": etag})
+    assert response.status_code != 304
+    assert "etag" not in response.headers
+
+
+def test_etag_rolls_over_with_the_ttl_window(client, monkeypatch):
+    headers = _token(str(uuid.uuid4()))
+    monkeypatch.setattr(settings, "response_cache_ttl_seconds", 60.0)
+    first = client.get("/entries", headers=headers).headers["etag"]
+    monkeypatch.setattr(http_cache.time, "time", lambda: time.time_ns() / 1e9 + 120)
+    assert client.get("/entries", headers=headers).headers["etag"] != first
+
+
+def test_dashboard_etag_rolls_over_at_the_stored_zones_midnight(client, monkeypatch):
+    user_id = str(uuid.uuid4())
+    headers = _token(user_id)
+
+    class Clock(datetime):
+        instant = datetime(2026, 1, 1, 23, 30, tzinfo=timezone.utc)
+
+        @classmethod
+        def now(cls, tz=None):
+            return cls.instant.astimezone(tz)
+
+    monkeypatch.setattr(http_cache, "datetime", Clock)
+    http_cache.remember_user_timezone(user_id, "Pacific/Auckland")   # already Jan 2 there
+    etag = client.get("/dashboard/stats?tz=UTC", headers=headers).headers["etag"]
+    assert "2026-01-02" in etag
+
+    # Auckland's day doesn't change at UTC midnight, so the 304 still holds
+    Clock.instant = datetime(2026, 1, 2, 0, 30, tzinfo=timezone.utc)
+    response = client.get("/dashboard/stats", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304
@@ -0,0 +1,58 @@
+"""
+tests/test_json_stream.py — JsonObjectStream against json.loads, split at every offset.
+"""
+
+import json
+
+import pytest
+
+from app.services.ai.json_stream import JsonObjectStream
+
+REPORT = json.dumps({
+    "dominant_emotion": "reflective",
+    "top_themes": ["work", "sleep", "friends [and] family"],
+    "emotional_arc": 'Started "anxious", then calmer.\nEnded hopeful \\ rested',
+    "ai_observation": "You noticed a pattern — and kept going \U0001f331.",
+})
+
+NESTED = (
+    '{"score": -7.5e-1, "ok": true, "missing": null, "count": 3 ,'
+    ' "meta": {"tags": ["a", {"b": "}]\\"{"}], "n": [1, [2, 3]]},'
+    ' "text": "tab\\there \\u00e9\\ud83c\\udf31 \\/ end"}'
+)
+
+
+def _events(chunks: list[str]) -> list[tuple[str, str, object]]:
+    parser = JsonObjectStream()
+    return [event for chunk in chunks for event in parser.feed(chunk)]
+
+
+def _check(events, expected: dict) -> None:
+    values = {key: value for kind, key, value in events if kind == "value"}
+    assert values == expected
+    for key, value in expected.items():
+        if isinstance(value, str):
+            assert "".join(t for kind, k, t in events if kind == "delta" and k == key) == value
+
+
+@pytest.mark.parametrize("text", [REPORT, NESTED, "```json\n" + REPORT + "\n```"], ids=["report", "nested", "fenced"])
+def test_every_split_matches_json_loads(text):
+    expected = json.loads(text.strip("`\njson") if text.startswith("```") else text)
+    for i in range(len(text) + 1):
+        _check(_events([text[:i], text[i:]]), expected)
+    _check(_events(list(text)), expected)   # one character per chunk
+
+
+def test_string_deltas_arrive_before_the_value_completes():
+    parser = JsonObjectStream()
+    assert parser.feed('{"emotional_arc": "A calm') == [("delta", "emotional_arc", "A calm")]
+    assert parser.feed(' week"') == [("delta", "emotional_arc", " week"), ("value", "emotional_arc", "A calm week")]
+
+
+def test_surrogate_pair_split_across_chunks_decodes_once():
+    events = _events(['{"t": "\\ud83c', '\\udf31"}'])
+    assert events == [("delta", "t", "\U0001f331"), ("value", "t", "\U0001f331")]
+
+
+def test_invalid_raw_value_is_skipped_without_raising():
+    assert _events(['{"a": tru, "b": "ok"}']) == [("delta", "b", "ok"), ("value", "b", "ok")]
@@ -0,0 +1,133 @@
+"""
+tests/test_limiter.py — AIMD limits and Retry-After cooldowns in limited_call.
+"""
+
+import asyncio
+
+import httpx
+import pytest
+from openai import RateLimitError
+
+from app.core.config import settings
+from app.services.ai import limiter
+from app.services.ai.limiter import AdaptiveLimiter, limited_call
+
+
+class FakeClock:
+    """time.monotonic() that only moves when limited_call sleeps."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps: list[float] = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        self.sleeps.append(round(seconds, 3))
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(limiter.time, "monotonic", fake.monotonic)
+    monkeypatch.setattr(asyncio, "sleep", fake.sleep)
+    monkeypatch.setattr(limiter, "_cooldown_until", 0.0)
+    return fake
+
+
+@pytest.fixture
+def budget(monkeypatch) -> AdaptiveLimiter:
+    fresh = AdaptiveLimiter("interactive", max_limit=8)
+    fresh.limit = 8.0
+    monkeypatch.setitem(limiter.limiters, "interactive", fresh)
+    return fresh
+
+
+def _rate_limited(retry_after: str) -> RateLimitError:
+    response = httpx.Response(
+        429, headers={"retry-after": retry_after}, request=httpx.Request("POST", "http://litellm/v1/chat/completions"),
+    )
+    return RateLimitError("rate limited", response=response, body=None)
+
+
+def _flaky(failures: list[Exception], result="ok"):
+    async def call():
+        if failures:
+            raise failures.pop(0)
+        return result
+    return call
+
+
+def test_429_halves_the_limit_and_waits_out_retry_after(run, clock, budget):
+    assert run(limited_call("chat", _flaky([_rate_limited("2")]))) == "ok"
+
+    assert clock.sleeps == [2.0]              # Retry-After, not the jittered backoff
+    assert budget.overloads == 1 and budget.decreases == 1
+    assert budget.limit == pytest.approx(4 + 1 / 4)   # ×0.5, then +1/limit for the success
+
+
+def test_cooldown_is_shared_by_calls_that_start_during_it(run, clock, budget):
+    run(limited_call("chat", _flaky([_rate_limited("3")])))
+    limiter._cooldown_until = clock.now + 1.5   # another call's 429, still cooling down
+
+    assert run(limited_call("embedding", _flaky([]))) == "ok"
+    assert clock.sleeps == [3.0, 1.5]
+
+
+def test_retry_after_is_capped(run, clock, budget, monkeypatch):
+    monkeypatch.setattr(settings, "llm_retry_max_seconds", 5.0)
+    run(limited_call("chat", _flaky([_rate_limited("120")])))
+    assert clock.sleeps == [5.0]
+
+
+def test_burst_of_429s_halves_once_per_gap(clock, budget):
+    budget.on_overload()
+    budget.on_overload()   # same instant: one decrease per burst
+    assert budget.limit == 4 and budget.decreases == 1
+    clock.now += 1.5
+    budget.on_overload()
+    assert budget.limit == 2 and budget.decreases == 2
+
+
+def test_limit_grows_back_additively(run, clock, budget):
+    budget.limit = 2.0
+    limits = []
+    for _ in range(6):
+        run(limited_call("chat", _flaky([])))
+        limits.append(budget.limit)
+
+    # +1/limit per success: about one slot per `limit` successes
+    assert limits == pytest.approx([2.5, 2.9, 3.245, 3.553, 3.834, 4.095], abs=1e-3)
+    for _ in range(200):
+        run(limited_call("chat", _flaky([])))
+    assert budget.limit == budget.max_limit
+
+
+def test_slow_call_counts_as_congestion(run, clock, budget):
+    async def takes(seconds):
+        clock.now += seconds
+        return "ok"
+
+    run(limited_call("chat", takes, 1.0))
+    run(limited_call("chat", takes, 1.0))
+    before = budget.limit
+    run(limited_call("chat", takes, 5.0))   # > 2× the moving average
+    assert budget.limit == pytest.approx(before / 2)
+
+
+def test_non_retryable_errors_pass_through_untouched(run, clock, budget):
+    with pytest.raises(ValueError):
+        run(limited_call("chat", _flaky([ValueError("bad request")])))
+    assert clock.sleeps == [] and budget.overloads == 0 and budget.limit == 8
+
+
+def test_condition_is_bound_to_the_running_loop(budget):
+    assert budget._cond is None   # nothing built at import / construction
+    for _ in range(2):   # a fresh loop each time, like separate asyncio.run() calls
+        loop = asyncio.new_event_loop()
+        try:
+            assert loop.run_until_complete(limited_call("chat", _flaky([]))) == "ok"
+        finally:
+            loop.close()
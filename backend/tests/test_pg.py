@@ -0,0 +1,56 @@
+"""
+tests/test_pg.py — Lazy asyncpg pool creation (app/core/pg.py).
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.core import pg
+from app.core.config import settings
+
+
+class FakePool:
+    closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def fake_asyncpg(monkeypatch):
+    created = []
+
+    async def create_pool(**kwargs):
+        await asyncio.sleep(0.01)   # let the other first requests arrive meanwhile
+        created.append(FakePool())
+        return created[-1]
+
+    monkeypatch.setattr(pg, "asyncpg", SimpleNamespace(create_pool=create_pool))
+    monkeypatch.setattr(settings, "database_url", "postgresql://fake/db")
+    monkeypatch.setattr(settings, "supabase_jwt_secret", "test-jwt-secret-at-least-32-characters-long")
+    monkeypatch.setattr(pg, "_pool", None)
+    monkeypatch.setattr(pg, "_pool_lock", None)
+    return created
+
+
+def test_concurrent_first_requests_share_one_pool(run, fake_asyncpg):
+    async def first_requests():
+        return await asyncio.gather(*(pg.get_pool() for _ in range(5)))
+
+    pools = run(first_requests())
+    assert len(fake_asyncpg) == 1 and all(p is fake_asyncpg[0] for p in pools)
+    assert run(pg.get_pool()) is fake_asyncpg[0]
+
+    run(pg.close_pool())
+    assert fake_asyncpg[0].closed and pg._pool is None
+    assert run(pg.get_pool()) is fake_asyncpg[1]   # recreated after close
+    run(pg.close_pool())
+
+
+def test_unconfigured_backend_raises(run, monkeypatch):
+    monkeypatch.setattr(settings, "database_url", "")
+    monkeypatch.setattr(pg, "_pool", None)
+    with pytest.raises(RuntimeError):
+        run(pg.get_pool())
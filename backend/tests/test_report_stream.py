@@ -0,0 +1,52 @@
+"""
+tests/test_report_stream.py — stream_report against the in-process LLM stand-in.
+"""
+
+from datetime import datetime, timezone
+
+from app.services.ai import report
+
+ENTRIES = [
+    {"created_at": datetime(2026, 3, d, tzinfo=timezone.utc).isoformat(), "content": f"Day {d}: long week at work.",
+     "mood_score": 5.0, "themes": ["work"], "observation": "Tired."}
+    for d in range(1, 4)
+]
+
+
+def _capture_streams(monkeypatch) -> list:
+    calls = []
+    real = report.limited_call
+
+    async def limited_call(kind, fn, *args, **kwargs):
+        stream = await real(kind, fn, *args, **kwargs)
+        calls.append((kind, stream))
+        return stream
+
+    monkeypatch.setattr(report, "limited_call", limited_call)
+    return calls
+
+
+def test_stream_yields_fields_then_the_report(run, standin, monkeypatch):
+    calls = _capture_streams(monkeypatch)
+
+    async def collect():
+        return [event async for event in report.stream_report(ENTRIES)]
+
+    events = run(collect())
+    assert events[-1][0] == "report"
+    assert {name for name, _ in events[:-1]} <= {"delta", "field"}
+    assert [kind for kind, _ in calls] == ["chat_stream"]
+    assert calls[0][1].response.is_closed
+
+
+def test_closing_early_closes_the_model_stream(run, standin, monkeypatch):
+    calls = _capture_streams(monkeypatch)
+
+    async def first_then_close():
+        events = report.stream_report(ENTRIES)
+        first = await events.__anext__()
+        await events.aclose()   # what a client disconnect does
+        return first
+
+    assert run(first_then_close())[0] in ("delta", "field")
+    assert calls[0][1].response.is_closed
@@ -0,0 +1,101 @@
+"""
+tests/test_repository.py — PostgREST and asyncpg repositories agree, under RLS.
+
+PgEntryRepository re-implements PostgREST's RLS scoping (role +
+request.jwt.claims per transaction, pg.rls_transaction); these tests pin
+that both backends return the same rows for the owner and nothing for
+anyone else.
+"""
+
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+
+from app.services.repository import PgEntryRepository, PostgrestEntryRepository
+
+pytestmark = pytest.mark.usefixtures("local_postgrest")
+
+
+def _seed(run, pool, user_id, n: int) -> list:
+    ids = [uuid4() for _ in range(n)]
+    run(pool.executemany(
+        """
+        INSERT INTO public.entries
+            (id, user_id, content, mood_score, themes, distortions, observation, analyzed,
+             created_at)
+        VALUES ($1, $2, $3, $4, $5, $6, $7, true, now() - make_interval(mins => $8))
+        """,
+        [
+            (entry_id, user_id, f"Repository test entry number {i}.", 3.5 + i % 5,
+             ["work pressure", "sleep"], [{"label": "Filtering"}], "An observation.", i)
+            for i, entry_id in enumerate(ids)
+        ],
+    ))
+    return ids
+
+
+def _comparable(row: dict | None) -> dict | None:
+    """Timestamps compare as instants — the backends format fractional seconds differently."""
+    if row is None:
+        return None
+    return {
+        k: datetime.fromisoformat(v) if k.endswith("_at") and isinstance(v, str) else v
+        for k, v in row.items()
+    }
+
+
+def _backends(token: str) -> tuple[PostgrestEntryRepository, PgEntryRepository]:
+    return PostgrestEntryRepository(token), PgEntryRepository(token)
+
+
+def test_backends_return_the_same_rows(run, local_pg, make_user):
+    user_id, token = make_user()
+    ids = _seed(run, local_pg, user_id, 5)
+    rest, direct = _backends(token)
+
+    for entry_id in ids:
+        assert _comparable(run(rest.get_entry(entry_id))) == _comparable(run(direct.get_entry(entry_id)))
+        assert _comparable(run(rest.get_analysis(entry_id))) == _comparable(run(direct.get_analysis(entry_id)))
+
+    for summary in (False, True):
+        rest_rows, rest_cursor = run(rest.list_entries(limit=3, summary=summary))
+        direct_rows, direct_cursor = run(direct.list_entries(limit=3, summary=summary))
+        assert [_comparable(r) for r in rest_rows] == [_comparable(r) for r in direct_rows]
+        assert [r["id"] for r in direct_rows] == [str(i) for i in ids[:3]]   # newest first
+        assert rest_cursor == direct_cursor
+
+        rest_rows, _ = run(rest.list_entries(limit=3, cursor=rest_cursor, summary=summary))
+        direct_rows, next_cursor = run(direct.list_entries(limit=3, cursor=direct_cursor, summary=summary))
+        assert [_comparable(r) for r in rest_rows] == [_comparable(r) for r in direct_rows]
+        assert [r["id"] for r in direct_rows] == [str(i) for i in ids[3:]]
+        assert next_cursor is None
+
+
+def test_cross_user_reads_return_nothing(run, local_pg, make_user):
+    owner_id, _ = make_user()
+    _, other_token = make_user()
+    ids = _seed(run, local_pg, owner_id, 3)
+
+    for repo in _backends(other_token):
+        assert run(repo.get_entry(ids[0])) is None
+        assert run(repo.get_analysis(ids[0])) is None
+        assert run(repo.get_entries_by_ids([str(i) for i in ids])) == []
+        assert run(repo.list_entries()) == ([], None)
+        assert run(repo.lexical_search("repository", 10)) == []
+
+
+def test_rls_claims_do_not_leak_between_transactions(run, local_pg, make_user):
+    """role / request.jwt.claims are transaction-local: a pooled connection comes back clean."""
+    user_id, token = make_user()
+    _seed(run, local_pg, user_id, 1)
+    run(PgEntryRepository(token).list_entries())
+
+    async def claims_on_every_connection():
+        async with local_pg.acquire() as a, local_pg.acquire() as b:
+            return [
+                await conn.fetchval("SELECT current_setting('request.jwt.claims', true)")
+                for conn in (a, b)
+            ]
+
+    assert all(not value for value in run(claims_on_every_connection()))
@@ -0,0 +1,42 @@
+"""
+tests/test_search.py — Lexical vs hybrid routing of POST /entries/search (app/services/search.py).
+"""
+
+import pytest
+
+from app.services.search import looks_like_keywords
+
+
+@pytest.mark.parametrize("query", [
+    '"panic attack"',                     # quoted phrase
+    '  "why do I feel like this"  ',      # quotes win over question words
+    "Priya",
+    "berlin trip",                        # two tokens, any case
+    "therapy",
+    "priya@example.com",
+    "Q3 OKRs",
+    "Priya Sharma Berlin",
+    "Dr. Okafor 2024",
+    "Lisbon",
+])
+def test_keyword_queries_route_lexical(query):
+    assert looks_like_keywords(query)
+
+
+@pytest.mark.parametrize("query", [
+    "how did I feel after the move",
+    "why am I always tired on Mondays",
+    "times I felt proud of myself",
+    "what about work",
+    "Where",                              # a lone question word
+    "felt anxious",
+    "arguments with my sister",           # lowercase prose, three tokens
+    "Priya Sharma Berlin Lisbon Madrid",  # more than four proper nouns
+    "Priya and Berlin",                   # a lowercase word among names
+    "",
+    "   ",
+    "?!",
+    '"',                                  # a single quote character is no phrase
+])
+def test_natural_language_queries_route_hybrid(query):
+    assert not looks_like_keywords(query)
@@ -0,0 +1,142 @@
+"""
+tests/test_vector_index.py — In-process per-user vector index (app/services/vector_index.py).
+"""
+
+import asyncio
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from app.services import vector_index
+from app.services.vector_index import EMBEDDING_DIMS, UserVectorIndex, VectorIndexCache
+
+
+def _vec(*weights: float) -> list[float]:
+    """A vector with the given leading components (not normalised)."""
+    v = [0.0] * EMBEDDING_DIMS
+    v[:len(weights)] = weights
+    return v
+
+
+def _index(rows: list[tuple[str, list[float]]], quantize: bool = False) -> UserVectorIndex:
+    return UserVectorIndex([r[0] for r in rows], [r[1] for r in rows], quantize)
+
+
+ROWS = [
+    ("a", _vec(1, 0, 0)),
+    ("b", _vec(0.8, 0.6, 0)),
+    ("c", _vec(0, 1, 0)),
+    ("d", _vec(0, 0, 1)),
+]
+
+
+@pytest.mark.parametrize("quantize", [False, True])
+def test_top_k_in_descending_similarity(quantize):
+    hits = _index(ROWS, quantize).search(_vec(1, 0.1, 0), k=3)
+    assert [entry_id for entry_id, _ in hits] == ["a", "b", "c"]
+    scores = [score for _, score in hits]
+    assert scores == sorted(scores, reverse=True)
+    assert scores[0] == pytest.approx(1 / np.hypot(1, 0.1), abs=0.02 if quantize else 1e-6)
+
+
+def test_k_larger_than_the_corpus_returns_every_entry_once():
+    hits = _index(ROWS).search(_vec(1), k=10)
+    assert sorted(entry_id for entry_id, _ in hits) == ["a", "b", "c", "d"]
+    assert _index([]).search(_vec(1), k=5) == []
+
+
+def test_entry_is_ranked_by_its_best_chunk_and_listed_once():
+    rows = [("long", _vec(1, 0.1)), ("long", _vec(1, 0.2)), ("long", _vec(0, 0, 1)), ("other", _vec(0.5, 1))]
+    hits = _index(rows).search(_vec(1), k=2)
+    assert [entry_id for entry_id, _ in hits] == ["long", "other"]
+    assert hits[0][1] == pytest.approx(1 / np.hypot(1, 0.1))
+
+
+def test_dominant_entry_does_not_crowd_out_the_rest():
+    # More strong chunks than the 4× headroom of the first partition
+    rows = [("many", _vec(1, i / 100)) for i in range(20)] + [("few", _vec(0.1, 1))]
+    hits = _index(rows).search(_vec(1), k=2)
+    assert [entry_id for entry_id, _ in hits] == ["many", "few"]
+
+
+def test_remove_after_delete_keeps_the_other_rows_intact():
+    rows = [("x", _vec(1, 0, 0)), ("y", _vec(0, 1, 0)), ("x", _vec(1, 1, 0)), ("z", _vec(0, 0, 1))]
+    index = _index(rows)
+    before = dict(index.search(_vec(0, 1, 1), k=3))
+
+    index.remove("x")
+    after = dict(index.search(_vec(0, 1, 1), k=3))
+    assert set(after) == {"y", "z"} and len(index) == 2
+    assert after["y"] == pytest.approx(before["y"]) and after["z"] == pytest.approx(before["z"])
+
+    index.remove("x")   # already gone: no-op
+    assert len(index) == 2
+
+
+def test_upsert_replaces_an_entrys_rows():
+    index = _index(ROWS)
+    index.upsert("d", [_vec(1, 0, 0.01), _vec(0, 0, 1)])
+    assert len(index) == 5
+    assert index.search(_vec(1), k=1)[0][0] in {"a", "d"}
+    index.upsert("d", [_vec(0, 0, 1)])
+    assert len(index) == 4
+    assert "d" not in dict(index.search(_vec(1), k=2))
+
+
+def _loader(rows, calls: list):
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(0)
+        return rows
+    return load
+
+
+def test_cache_loads_once_under_concurrency(run):
+    cache = VectorIndexCache(max_bytes=1 << 20, ttl_seconds=60, quantize=False)
+    calls = []
+
+    async def both():
+        return await asyncio.gather(*(cache.get("u1", _loader(ROWS, calls)) for _ in range(3)))
+
+    first, *rest = run(both())
+    assert calls == [1] and all(index is first for index in rest)
+
+
+def test_cache_reloads_once_the_ttl_has_passed(run, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(vector_index.time, "monotonic", lambda: clock[0])
+    cache = VectorIndexCache(max_bytes=1 << 20, ttl_seconds=60, quantize=False)
+    calls = []
+
+    stale = run(cache.get("u1", _loader(ROWS, calls)))
+    clock[0] += 30
+    assert run(cache.get("u1", _loader(ROWS, calls))) is stale
+    clock[0] += 31   # out-of-process writes (backfill) show up after the TTL
+    fresh = run(cache.get("u1", _loader(ROWS[:2], calls)))
+    assert fresh is not stale and len(fresh) == 2 and calls == [1, 1]
+
+
+def test_cache_applies_writes_to_warm_indexes_only(run):
+    cache = VectorIndexCache(max_bytes=1 << 20, ttl_seconds=60, quantize=False)
+    cache.upsert("cold", "e1", [_vec(1)])   # nothing loaded: left for the next load
+    assert cache.stats()["users"] == 0
+
+    index = run(cache.get("u1", _loader(ROWS, [])))
+    cache.upsert("u1", "e", [_vec(0, 0, 0, 1)])
+    assert index.search(_vec(0, 0, 0, 1), k=1)[0][0] == "e"
+    cache.remove("u1", "e")
+    assert "e" not in dict(index.search(_vec(0, 0, 0, 1), k=5))
+
+
+def test_cache_evicts_least_recently_used_beyond_max_bytes(run):
+    one = _index(ROWS).nbytes
+    cache = VectorIndexCache(max_bytes=int(one * 2.5), ttl_seconds=60, quantize=False)
+    for user in ("u1", "u2"):
+        run(cache.get(user, _loader(ROWS, [])))
+    run(cache.get("u1", _loader(ROWS, [])))   # u1 is now the most recent
+    run(cache.get("u3", _loader(ROWS, [])))
+    assert cache.stats()["users"] == 2 and cache.evictions == 1
+    calls = []
+    run(cache.get("u2", _loader(ROWS, calls)))
+    assert calls == [1]   # u2 was evicted, u1 stayed warm
@@ -0,0 +1,295 @@
+-- =============================================================================
+-- Vesper — Per-user daily rollups
+-- =============================================================================
+-- Run this in the Supabase SQL Editor (after supabase_init.sql).
+--
+-- daily_rollups holds one row per (user, local day) with entry counts, mood
+-- aggregates, per-theme mood stats and distortion counts. A trigger on
+-- entries re-aggregates only the day(s) a write touches, so the dashboard
+-- and drift views read O(days) rows instead of O(entries).
+--
+-- Days are bucketed in the user's time zone (user_settings.timezone,
+-- default UTC). set_rollup_timezone(tz) switches it and rebuilds the
+-- caller's rollups; the API exposes it as PUT /settings/timezone.
+--
+-- Repair: SELECT public.rebuild_daily_rollups();          -- all users (service role)
+--         SELECT public.rebuild_daily_rollups(auth.uid()); -- caller only
+-- or `python -m scripts.rebuild_rollups` from backend/.
+-- =============================================================================
+
+
+-- -----------------------------------------------------------------------------
+-- 1. TABLES
+-- -----------------------------------------------------------------------------
+
+CREATE TABLE IF NOT EXISTS public.user_settings (
+    user_id     uuid        PRIMARY KEY REFERENCES auth.users(id) ON DELETE CASCADE,
+    timezone    text        NOT NULL DEFAULT 'UTC'
+);
+
+CREATE TABLE IF NOT EXISTS public.daily_rollups (
+    user_id             uuid        NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+    day                 date        NOT NULL,                -- local day in user_settings.timezone
+    entry_count         int         NOT NULL DEFAULT 0,
+    mood_sum            float       NOT NULL DEFAULT 0,
+    mood_count          int         NOT NULL DEFAULT 0,
+    mood_min            float,
+    mood_max            float,
+    theme_stats         jsonb       NOT NULL DEFAULT '{}',   -- {theme: {count, mood_sum, mood_min, mood_max}}; an entry counts under each of its themes
+    distortion_counts   jsonb       NOT NULL DEFAULT '{}',   -- {label: count}
+    updated_at          timestamptz NOT NULL DEFAULT now(),
+    PRIMARY KEY (user_id, day)
+);
+
+
+-- -----------------------------------------------------------------------------
+-- 2. ROW LEVEL SECURITY — users read their own rollups; only the
+--    SECURITY DEFINER functions below write them
+-- -----------------------------------------------------------------------------
+
+ALTER TABLE public.user_settings ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.daily_rollups ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "user_settings: select own"
+    ON public.user_settings
+    FOR SELECT
+    USING (auth.uid() = user_id);
+
+CREATE POLICY "user_settings: insert own"
+    ON public.user_settings
+    FOR INSERT
+    WITH CHECK (auth.uid() = user_id);
+
+CREATE POLICY "user_settings: update own"
+    ON public.user_settings
+    FOR UPDATE
+    USING (auth.uid() = user_id)
+    WITH CHECK (auth.uid() = user_id);
+
+CREATE POLICY "daily_rollups: select own"
+    ON public.daily_rollups
+    FOR SELECT
+    USING (auth.uid() = user_id);
+
+
+-- -----------------------------------------------------------------------------
+-- 3. FUNCTIONS
+-- -----------------------------------------------------------------------------
+
+CREATE OR REPLACE FUNCTION public.rollup_timezone(p_user uuid)
+RETURNS text
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  SELECT coalesce((SELECT timezone FROM public.user_settings WHERE user_id = p_user), 'UTC');
+$$;
+
+
+-- Re-aggregate one (user, local day) from entries; deletes the row when the
+-- day is empty. Range scan on entries_created_at_idx.
+CREATE OR REPLACE FUNCTION public.refresh_daily_rollup(p_user uuid, p_day date)
+RETURNS void
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  tz          text        := public.rollup_timezone(p_user);
+  day_start   timestamptz := p_day::timestamp AT TIME ZONE tz;
+  day_end     timestamptz := (p_day + 1)::timestamp AT TIME ZONE tz;
+  n_entries   int;
+  m_sum       float;
+  m_count     int;
+  m_min       float;
+  m_max       float;
+  t_stats     jsonb;
+  d_counts    jsonb;
+BEGIN
+  -- Mood, theme and distortion aggregates count analysed entries only, like
+  -- the per-entry drift timeline: an edited entry awaiting re-analysis
+  -- drops out until its new results land. entry_count (streaks) counts all.
+  SELECT count(*),
+         coalesce(sum(mood_score) FILTER (WHERE analyzed), 0),
+         count(mood_score) FILTER (WHERE analyzed),
+         min(mood_score) FILTER (WHERE analyzed),
+         max(mood_score) FILTER (WHERE analyzed)
+    INTO n_entries, m_sum, m_count, m_min, m_max
+  FROM public.entries
+  WHERE user_id = p_user
+    AND created_at >= day_start
+    AND created_at <  day_end;
+
+  IF n_entries = 0 THEN
+    DELETE FROM public.daily_rollups WHERE user_id = p_user AND day = p_day;
+    RETURN;
+  END IF;
+
+  SELECT coalesce(jsonb_object_agg(theme, jsonb_build_object(
+           'count',    n,
+           'mood_sum', s,
+           'mood_min', lo,
+           'mood_max', hi
+         )), '{}')
+    INTO t_stats
+  FROM (
+    SELECT trim(t) AS theme, count(*) AS n, sum(e.mood_score) AS s,
+           min(e.mood_score) AS lo, max(e.mood_score) AS hi
+    FROM public.entries e, unnest(e.themes) AS t
+    WHERE e.user_id = p_user
+      AND e.created_at >= day_start
+      AND e.created_at <  day_end
+      AND e.analyzed
+      AND e.mood_score IS NOT NULL
+      AND trim(t) <> ''
+    GROUP BY 1
+  ) per_theme;
+
+  SELECT coalesce(jsonb_object_agg(label, n), '{}')
+    INTO d_counts
+  FROM (
+    SELECT d ->> 'label' AS label, count(*) AS n
+    FROM public.entries e, jsonb_array_elements(coalesce(e.distortions, '[]'::jsonb)) AS d
+    WHERE e.user_id = p_user
+      AND e.created_at >= day_start
+      AND e.created_at <  day_end
+      AND e.analyzed
+      AND e.mood_score IS NOT NULL
+      AND d ->> 'label' IS NOT NULL
+    GROUP BY 1
+  ) per_label;
+
+  INSERT INTO public.daily_rollups AS r
+      (user_id, day, entry_count, mood_sum, mood_count, mood_min, mood_max,
+       theme_stats, distortion_counts, updated_at)
+  VALUES
+      (p_user, p_day, n_entries, m_sum, m_count, m_min, m_max, t_stats, d_counts, now())
+  ON CONFLICT (user_id, day) DO UPDATE SET
+      entry_count       = EXCLUDED.entry_count,
+      mood_sum          = EXCLUDED.mood_sum,
+      mood_count        = EXCLUDED.mood_count,
+      mood_min          = EXCLUDED.mood_min,
+      mood_max          = EXCLUDED.mood_max,
+      theme_stats       = EXCLUDED.theme_stats,
+      distortion_counts = EXCLUDED.distortion_counts,
+      updated_at        = now();
+END;
+$$;
+
+
+-- Full repair. NULL = every user (service role / SQL editor only).
+-- Returns the number of day rows written.
+CREATE OR REPLACE FUNCTION public.rebuild_daily_rollups(p_user uuid DEFAULT NULL)
+RETURNS int
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  caller  uuid := auth.uid();
+  n_days  int  := 0;
+  rec     record;
+BEGIN
+  IF caller IS NOT NULL AND (p_user IS NULL OR p_user <> caller) THEN
+    RAISE EXCEPTION 'rebuild_daily_rollups: may only rebuild your own rollups'
+      USING ERRCODE = '42501';
+  END IF;
+
+  DELETE FROM public.daily_rollups WHERE p_user IS NULL OR user_id = p_user;
+
+  FOR rec IN
+    SELECT DISTINCT e.user_id,
+           (e.created_at AT TIME ZONE public.rollup_timezone(e.user_id))::date AS day
+    FROM public.entries e
+    WHERE p_user IS NULL OR e.user_id = p_user
+  LOOP
+    PERFORM public.refresh_daily_rollup(rec.user_id, rec.day);
+    n_days := n_days + 1;
+  END LOOP;
+
+  RETURN n_days;
+END;
+$$;
+
+
+-- Switch the caller's rollup time zone and rebuild their rollups (a no-op
+-- when the zone is already stored).
+CREATE OR REPLACE FUNCTION public.set_rollup_timezone(tz text)
+RETURNS void
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  uid uuid := auth.uid();
+BEGIN
+  IF uid IS NULL THEN
+    RAISE EXCEPTION 'set_rollup_timezone: not authenticated' USING ERRCODE = '42501';
+  END IF;
+  PERFORM now() AT TIME ZONE tz;   -- raises on an unknown zone
+  IF EXISTS (SELECT 1 FROM public.user_settings WHERE user_id = uid AND timezone = tz) THEN
+    RETURN;
+  END IF;
+
+  INSERT INTO public.user_settings (user_id, timezone) VALUES (uid, tz)
+  ON CONFLICT (user_id) DO UPDATE SET timezone = EXCLUDED.timezone;
+
+  PERFORM public.rebuild_daily_rollups(uid);
+END;
+$$;
+
+
+-- -----------------------------------------------------------------------------
+-- 4. TRIGGER — keep the touched day(s) current on every entry write
+-- -----------------------------------------------------------------------------
+
+CREATE OR REPLACE FUNCTION public.entries_refresh_rollups()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  old_day date;
+  new_day date;
+BEGIN
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    old_day := (OLD.created_at AT TIME ZONE public.rollup_timezone(OLD.user_id))::date;
+    PERFORM public.refresh_daily_rollup(OLD.user_id, old_day);
+  END IF;
+
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    new_day := (NEW.created_at AT TIME ZONE public.rollup_timezone(NEW.user_id))::date;
+    IF TG_OP = 'INSERT' OR NEW.user_id <> OLD.user_id OR new_day <> old_day THEN
+      PERFORM public.refresh_daily_rollup(NEW.user_id, new_day);
+    END IF;
+  END IF;
+
+  RETURN NULL;
+END;
+$$;
+
+-- Content-only edits don't change any aggregate, so they don't fire this
+DROP TRIGGER IF EXISTS entries_refresh_rollups ON public.entries;
+CREATE TRIGGER entries_refresh_rollups
+    AFTER INSERT OR DELETE OR UPDATE OF user_id, created_at, analyzed, mood_score, themes, distortions
+    ON public.entries
+    FOR EACH ROW
+    EXECUTE FUNCTION public.entries_refresh_rollups();
+
+
+-- -----------------------------------------------------------------------------
+-- 5. PRIVILEGES — internal helpers are not callable through PostgREST
+-- -----------------------------------------------------------------------------
+
+REVOKE EXECUTE ON FUNCTION public.refresh_daily_rollup(uuid, date) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION public.rebuild_daily_rollups(uuid)      FROM PUBLIC, anon;
+REVOKE EXECUTE ON FUNCTION public.set_rollup_timezone(text)        FROM PUBLIC, anon;
+
+
+-- -----------------------------------------------------------------------------
+-- 6. BACKFILL existing history
+-- -----------------------------------------------------------------------------
+
+SELECT public.rebuild_daily_rollups();
@@ -0,0 +1,99 @@
+-- Vesper: dashboard_stats RPC — streak, 7-day sparkline and latest analysis
+-- Run this in the Supabase SQL Editor (after daily_rollups.sql).
+--
+-- Replaces the Python-side aggregation in GET /dashboard/stats with one
+-- round-trip. Day boundaries are computed in the user's stored IANA time
+-- zone (user_settings.timezone, e.g. 'Europe/Berlin'), not by slicing UTC
+-- timestamps.
+--
+-- Streak and sparkline read public.daily_rollups (daily_rollups.sql), one
+-- primary-key probe per day, so cost scales with days rather than entries;
+-- the total entry count sums the same rows.
+-- The latest analysis is a LIMIT 1 scan on entries_created_at_idx.
+--
+-- Read-only (STABLE): changing the zone is an explicit write through
+-- set_rollup_timezone (PUT /settings/timezone), which rebuilds the rollups
+-- once. The result carries the stored zone and whether the user has ever
+-- chosen one, so the client can offer the switch.
+--
+-- SECURITY INVOKER: auth.uid() resolves to the calling user via their JWT.
+
+-- The earlier signature took the browser's zone and switched to it
+DROP FUNCTION IF EXISTS public.dashboard_stats(text);
+
+CREATE OR REPLACE FUNCTION public.dashboard_stats()
+RETURNS jsonb
+LANGUAGE plpgsql
+STABLE
+SECURITY INVOKER
+AS $$
+DECLARE
+  uid        uuid := auth.uid();
+  tz         text := public.rollup_timezone(uid);
+  today      date := (now() AT TIME ZONE tz)::date;
+  check_day  date := today;
+  streak     int  := 0;
+  n_entries  int;
+  sparkline  jsonb;
+  latest     jsonb;
+BEGIN
+  -- ── Current streak ────────────────────────────────────────────────────────
+  -- If today has no entry yet, start counting from yesterday
+  IF NOT EXISTS (
+    SELECT 1 FROM public.daily_rollups r WHERE r.user_id = uid AND r.day = check_day
+  ) THEN
+    check_day := today - 1;
+  END IF;
+
+  WHILE EXISTS (
+    SELECT 1 FROM public.daily_rollups r WHERE r.user_id = uid AND r.day = check_day
+  ) LOOP
+    streak    := streak + 1;
+    check_day := check_day - 1;
+  END LOOP;
+
+  -- ── 7-day mood sparkline (6 days ago → today, null on empty days) ─────────
+  SELECT jsonb_agg(
+           jsonb_build_object(
+             'date', to_char(g.day, 'YYYY-MM-DD'),
+             'mood', CASE WHEN r.mood_count > 0
+                          THEN round((r.mood_sum / r.mood_count)::numeric, 1)
+                     END
+           )
+           ORDER BY g.day
+         )
+    INTO sparkline
+  FROM generate_series(today - 6, today, interval '1 day') AS g(day)
+  LEFT JOIN public.daily_rollups r
+    ON r.user_id = uid AND r.day = g.day::date;
+
+  -- ── Entry count (one rollup row per day) ──────────────────────────────────
+  SELECT coalesce(sum(r.entry_count), 0)::int
+    INTO n_entries
+  FROM public.daily_rollups r
+  WHERE r.user_id = uid;
+
+  -- ── Latest analysis ───────────────────────────────────────────────────────
+  SELECT jsonb_build_object(
+           'mood_score',  e.mood_score,
+           'themes',      e.themes,
+           'distortions', e.distortions,
+           'observation', e.observation
+         )
+    INTO latest
+  FROM public.entries e
+  WHERE e.user_id = uid
+    AND e.analyzed
+  ORDER BY e.created_at DESC
+  LIMIT 1;
+
+  RETURN jsonb_build_object(
+    'current_streak',  streak,
+    'mood_sparkline',  sparkline,
+    'latest_analysis', latest,
+    'entry_count',     n_entries,
+    'timezone',        tz,
+    'timezone_set',    EXISTS (SELECT 1 FROM public.user_settings s WHERE s.user_id = uid)
+  );
+END;
+$$;
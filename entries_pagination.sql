@@ -0,0 +1,18 @@
+-- Vesper: lightweight list projection for GET /entries?view=summary
+-- Run this in the Supabase SQL Editor.
+--
+-- PostgREST exposes functions that take a table row as "computed fields",
+-- so `select=id,preview` returns a truncated preview without shipping the
+-- full content column over the wire. Keep the length in sync with
+-- PREVIEW_CHARS in backend/app/services/repository.py.
+--
+-- Keyset pages (ORDER BY created_at DESC, id DESC) are served by the
+-- existing entries_created_at_idx (user_id, created_at DESC).
+
+CREATE OR REPLACE FUNCTION public.preview(public.entries)
+RETURNS text
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT left($1.content, 280);
+$$;
@@ -0,0 +1,173 @@
+-- =============================================================================
+-- Vesper — Versioned AI results + resumable backfill support
+-- =============================================================================
+-- Run this in the Supabase SQL Editor (after analysis_debounce.sql).
+--
+-- entries.analysis_version / embedding_version record which model + prompt
+-- produced the stored results (written by the analysis pipeline). The
+-- backfill CLI (backend/scripts/backfill.py) pages through entries whose
+-- results are missing or stale for the *current* versions and writes new
+-- results in bulk with apply_entry_backfill.
+--
+-- Rows analysed before this script have NULL versions, so the first
+-- backfill run re-processes them once.
+--
+-- Changing EMBEDDING_DIMS also needs the vector(384) column (and its
+-- index) migrated before re-embedding.
+-- =============================================================================
+
+
+-- -----------------------------------------------------------------------------
+-- 1. COLUMNS
+-- -----------------------------------------------------------------------------
+
+ALTER TABLE public.entries
+    ADD COLUMN IF NOT EXISTS analysis_version  text,   -- "<chat model>:<prompt hash>"
+    ADD COLUMN IF NOT EXISTS embedding_version text;   -- "<embedding model>:<dims>"
+
+
+-- -----------------------------------------------------------------------------
+-- 2. CANDIDATE SELECTION — p_mode: 'analysis' | 'embedding' | 'all'
+-- -----------------------------------------------------------------------------
+
+-- Each half is stale on its own: a prompt change only re-runs analysis, an
+-- embedding model change only re-embeds.
+CREATE OR REPLACE FUNCTION public.entry_needs_analysis(
+  e                   public.entries,
+  p_analysis_version  text,
+  p_mode              text
+)
+RETURNS boolean
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT p_mode IN ('analysis', 'all')
+     AND (NOT e.analyzed OR e.analysis_version IS DISTINCT FROM p_analysis_version);
+$$;
+
+CREATE OR REPLACE FUNCTION public.entry_needs_embedding(
+  e                   public.entries,
+  p_embedding_version text,
+  p_mode              text
+)
+RETURNS boolean
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT p_mode IN ('embedding', 'all')
+     AND (e.embedding IS NULL OR e.embedding_version IS DISTINCT FROM p_embedding_version);
+$$;
+
+CREATE OR REPLACE FUNCTION public.entry_needs_backfill(
+  e                   public.entries,
+  p_analysis_version  text,
+  p_embedding_version text,
+  p_mode              text
+)
+RETURNS boolean
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT public.entry_needs_analysis(e, p_analysis_version, p_mode)
+      OR public.entry_needs_embedding(e, p_embedding_version, p_mode);
+$$;
+
+
+-- Next page of candidates after p_after (keyset on id), flagged with the
+-- half (or halves) each one needs
+DROP FUNCTION IF EXISTS public.backfill_entry_batch(text, text, text, uuid, int);
+
+CREATE OR REPLACE FUNCTION public.backfill_entry_batch(
+  p_analysis_version  text,
+  p_embedding_version text,
+  p_mode              text,
+  p_after             uuid DEFAULT NULL,
+  p_limit             int  DEFAULT 100
+)
+RETURNS TABLE (
+  id              uuid,
+  user_id         uuid,
+  content         text,
+  content_version int,
+  needs_analysis  boolean,
+  needs_embedding boolean
+)
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  SELECT e.id, e.user_id, e.content, e.content_version,
+         public.entry_needs_analysis(e, p_analysis_version, p_mode),
+         public.entry_needs_embedding(e, p_embedding_version, p_mode)
+  FROM public.entries e
+  WHERE (p_after IS NULL OR e.id > p_after)
+    AND public.entry_needs_backfill(e, p_analysis_version, p_embedding_version, p_mode)
+  ORDER BY e.id
+  LIMIT p_limit;
+$$;
+
+
+-- Remaining candidates after p_after — for progress / ETA
+CREATE OR REPLACE FUNCTION public.backfill_entry_count(
+  p_analysis_version  text,
+  p_embedding_version text,
+  p_mode              text,
+  p_after             uuid DEFAULT NULL
+)
+RETURNS bigint
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  SELECT count(*)
+  FROM public.entries e
+  WHERE (p_after IS NULL OR e.id > p_after)
+    AND public.entry_needs_backfill(e, p_analysis_version, p_embedding_version, p_mode);
+$$;
+
+
+-- -----------------------------------------------------------------------------
+-- 3. BULK WRITE
+-- -----------------------------------------------------------------------------
+-- p_rows: [{id, content_version, <any of: analyzed, mood_score, themes,
+--           distortions, observation, analysis_version, embedding,
+--           embedding_version>}, ...]
+-- Keys that are absent leave the column alone. Rows whose content changed
+-- since they were read (content_version mismatch) are skipped.
+
+CREATE OR REPLACE FUNCTION public.apply_entry_backfill(p_rows jsonb)
+RETURNS int
+LANGUAGE sql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  WITH updated AS (
+    UPDATE public.entries e
+    SET analyzed          = CASE WHEN x ? 'analyzed'          THEN (x->>'analyzed')::boolean ELSE e.analyzed END,
+        mood_score        = CASE WHEN x ? 'mood_score'        THEN (x->>'mood_score')::float ELSE e.mood_score END,
+        themes            = CASE WHEN x ? 'themes'
+                                 THEN ARRAY(SELECT jsonb_array_elements_text(x->'themes'))
+                                 ELSE e.themes END,
+        distortions       = CASE WHEN x ? 'distortions'       THEN x->'distortions' ELSE e.distortions END,
+        observation       = CASE WHEN x ? 'observation'       THEN x->>'observation' ELSE e.observation END,
+        analysis_version  = CASE WHEN x ? 'analysis_version'  THEN x->>'analysis_version' ELSE e.analysis_version END,
+        embedding         = CASE WHEN x ? 'embedding'         THEN (x->>'embedding')::vector ELSE e.embedding END,
+        embedding_version = CASE WHEN x ? 'embedding_version' THEN x->>'embedding_version' ELSE e.embedding_version END
+    FROM jsonb_array_elements(p_rows) AS x
+    WHERE e.id = (x->>'id')::uuid
+      AND e.content_version = (x->>'content_version')::int
+    RETURNING 1
+  )
+  SELECT count(*)::int FROM updated;
+$$;
+
+
+-- -----------------------------------------------------------------------------
+-- 4. PRIVILEGES — service role only
+-- -----------------------------------------------------------------------------
+
+REVOKE EXECUTE ON FUNCTION public.backfill_entry_batch(text, text, text, uuid, int) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION public.backfill_entry_count(text, text, text, uuid)      FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION public.apply_entry_backfill(jsonb)                       FROM PUBLIC, anon, authenticated;
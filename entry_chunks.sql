@@ -0,0 +1,309 @@
+-- =============================================================================
+-- Vesper — Chunked multi-vector embeddings
+-- =============================================================================
+-- Run this in the Supabase SQL Editor (after vector_index.sql,
+-- hybrid_search.sql and entry_backfill.sql). Safe to re-run.
+--
+-- Long entries are split into paragraph-anchored chunks
+-- (backend/app/services/ai/chunking.py), each with its own embedding in
+-- entry_chunks. content_hash is the embedding cache key of the chunk text
+-- (model + dims + normalised text), so on re-analysis the pipeline only
+-- embeds chunks whose hash is new.
+--
+-- entries.embedding is kept as the normalised mean of the chunk vectors
+-- (identical to the single chunk's vector for short entries), so drift,
+-- the in-process vector index fallback and older clients keep working.
+--
+-- Semantic ranking (match_entries, the vector half of hybrid_search) now
+-- scores each entry by its BEST chunk. Entries not yet chunked (analysed
+-- before this script) fall back to entries.embedding until
+-- `python -m scripts.backfill --mode embedding` chunks them.
+-- =============================================================================
+
+
+-- -----------------------------------------------------------------------------
+-- 1. TABLE + INDEXES
+-- -----------------------------------------------------------------------------
+
+CREATE TABLE IF NOT EXISTS public.entry_chunks (
+    entry_id      uuid        NOT NULL REFERENCES public.entries(id) ON DELETE CASCADE,
+    user_id       uuid        NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+    chunk_index   int         NOT NULL,
+    content_hash  text        NOT NULL,
+    embedding     vector(384) NOT NULL,
+    PRIMARY KEY (entry_id, chunk_index)
+);
+
+CREATE INDEX IF NOT EXISTS entry_chunks_user_id_idx
+    ON public.entry_chunks (user_id);
+
+-- Same index type and parameters as entries_embedding_idx; re-run
+-- vector_index.sql once chunks exist so the lists are trained
+CREATE INDEX IF NOT EXISTS entry_chunks_embedding_idx
+    ON public.entry_chunks
+    USING ivfflat (embedding vector_cosine_ops)
+    WITH (lists = 100);
+
+
+-- -----------------------------------------------------------------------------
+-- 2. ROW LEVEL SECURITY — read own rows; apply_entry_chunks writes
+-- -----------------------------------------------------------------------------
+
+ALTER TABLE public.entry_chunks ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "entry_chunks: select own" ON public.entry_chunks;
+CREATE POLICY "entry_chunks: select own"
+    ON public.entry_chunks
+    FOR SELECT
+    USING (auth.uid() = user_id);
+
+
+-- -----------------------------------------------------------------------------
+-- 3. WRITE — replace an entry's chunks, guarded by content_version
+-- -----------------------------------------------------------------------------
+-- p_rows: [{id, content_version, chunks: [{chunk_index, content_hash,
+--           embedding}, ...]}, ...]
+-- Rows whose content changed since they were read are skipped; a null
+-- content_version skips the guard. Returns the number of entries written.
+
+CREATE OR REPLACE FUNCTION public.apply_entry_chunks(p_rows jsonb)
+RETURNS int
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  x        jsonb;
+  v_user   uuid;
+  written  int := 0;
+BEGIN
+  FOR x IN SELECT * FROM jsonb_array_elements(p_rows) LOOP
+    SELECT e.user_id INTO v_user
+    FROM public.entries e
+    WHERE e.id = (x->>'id')::uuid
+      AND (x->>'content_version' IS NULL OR e.content_version = (x->>'content_version')::int)
+    FOR UPDATE;
+    CONTINUE WHEN NOT FOUND;
+
+    DELETE FROM public.entry_chunks WHERE entry_id = (x->>'id')::uuid;
+    INSERT INTO public.entry_chunks (entry_id, user_id, chunk_index, content_hash, embedding)
+    SELECT (x->>'id')::uuid, v_user, (c->>'chunk_index')::int, c->>'content_hash', (c->>'embedding')::vector
+    FROM jsonb_array_elements(x->'chunks') AS c;
+    written := written + 1;
+  END LOOP;
+  RETURN written;
+END;
+$$;
+
+
+-- -----------------------------------------------------------------------------
+-- 4. READ — best vector distance per entry
+-- -----------------------------------------------------------------------------
+-- The candidate_count nearest chunks (IVFFlat, filtered to the caller) are
+-- grouped by entry; unchunked entries contribute their entry-level vector.
+--
+-- The user filter applies AFTER the index scan, so the scan settings live
+-- on the function itself (SET clauses apply on the PostgREST and the
+-- asyncpg path alike; a role-level setting only reaches PostgREST).
+-- match_entries and hybrid_search below scan only through this function.
+
+CREATE OR REPLACE FUNCTION public.entry_vector_distances(
+  query_embedding vector(384),
+  candidate_count int
+)
+RETURNS TABLE (entry_id uuid, distance float8)
+LANGUAGE sql
+STABLE
+SECURITY INVOKER
+SET ivfflat.probes = 40   -- see vector_index.sql
+AS $$
+  WITH nearest_chunks AS (
+    SELECT c.entry_id, c.embedding <=> query_embedding AS distance
+    FROM public.entry_chunks c
+    WHERE c.user_id = auth.uid()
+    ORDER BY c.embedding <=> query_embedding
+    LIMIT candidate_count
+  ),
+  unchunked AS (
+    SELECT e.id AS entry_id, e.embedding <=> query_embedding AS distance
+    FROM public.entries e
+    WHERE e.user_id = auth.uid()
+      AND e.embedding IS NOT NULL
+      AND NOT EXISTS (SELECT 1 FROM public.entry_chunks c WHERE c.entry_id = e.id)
+    ORDER BY e.embedding <=> query_embedding
+    LIMIT candidate_count
+  )
+  SELECT entry_id, min(distance)::float8
+  FROM (SELECT * FROM nearest_chunks UNION ALL SELECT * FROM unchunked) d
+  GROUP BY entry_id;
+$$;
+
+-- pgvector >= 0.8: keep scanning lists until candidate_count rows survive
+-- the user filter. Relaxed order is fine here: the chunks are re-ranked by
+-- min(distance) and the callers ORDER BY distance. Gated on the version
+-- because older pgvector rejects the setting at call time; CREATE OR
+-- REPLACE drops it again, so re-run this script after upgrading pgvector.
+DO $$
+BEGIN
+  IF (SELECT string_to_array(extversion, '.')::int[] FROM pg_extension WHERE extname = 'vector')
+     >= '{0,8}'::int[] THEN
+    ALTER FUNCTION public.entry_vector_distances(vector, int)
+      SET ivfflat.iterative_scan = relaxed_order;
+  ELSE
+    RAISE NOTICE 'pgvector < 0.8: entry_vector_distances runs without iterative scans';
+  END IF;
+END
+$$;
+
+-- Every stored vector of the caller's entries (chunks, else the entry
+-- vector as chunk_index -1), keyset-paged — loads the in-process index.
+CREATE OR REPLACE FUNCTION public.entry_vectors(
+  p_after_entry uuid DEFAULT NULL,
+  p_after_chunk int  DEFAULT NULL,
+  p_limit       int  DEFAULT 1000
+)
+RETURNS TABLE (entry_id uuid, chunk_index int, embedding text)
+LANGUAGE sql
+STABLE
+SECURITY INVOKER
+AS $$
+  SELECT v.entry_id, v.chunk_index, v.embedding
+  FROM (
+    SELECT c.entry_id, c.chunk_index, c.embedding::text AS embedding
+    FROM public.entry_chunks c
+    WHERE c.user_id = auth.uid()
+    UNION ALL
+    SELECT e.id, -1, e.embedding::text
+    FROM public.entries e
+    WHERE e.user_id = auth.uid()
+      AND e.embedding IS NOT NULL
+      AND NOT EXISTS (SELECT 1 FROM public.entry_chunks c WHERE c.entry_id = e.id)
+  ) v
+  WHERE p_after_entry IS NULL OR (v.entry_id, v.chunk_index) > (p_after_entry, p_after_chunk)
+  ORDER BY v.entry_id, v.chunk_index
+  LIMIT p_limit;
+$$;
+
+
+-- -----------------------------------------------------------------------------
+-- 5. SEARCH RPCs — rank by best chunk
+-- -----------------------------------------------------------------------------
+
+CREATE OR REPLACE FUNCTION public.match_entries(
+  query_embedding vector(384),
+  match_count     int DEFAULT 8
+)
+RETURNS TABLE (
+  id          uuid,
+  content     text,
+  created_at  timestamptz,
+  updated_at  timestamptz,
+  mood_score  float8,
+  themes      text[],
+  distortions jsonb,
+  observation text,
+  analyzed    boolean,
+  similarity  float8
+)
+LANGUAGE sql
+STABLE
+SECURITY INVOKER
+AS $$
+  SELECT
+    e.id, e.content, e.created_at, e.updated_at, e.mood_score,
+    e.themes, e.distortions, e.observation, e.analyzed,
+    1 - d.distance AS similarity
+  FROM public.entry_vector_distances(query_embedding, match_count * 4) d
+  JOIN public.entries e ON e.id = d.entry_id
+  ORDER BY d.distance
+  LIMIT match_count;
+$$;
+
+CREATE OR REPLACE FUNCTION public.hybrid_search(
+  query_text      text,
+  query_embedding vector(384),
+  match_count     int DEFAULT 8,
+  rrf_k           int DEFAULT 60
+)
+RETURNS TABLE (
+  id          uuid,
+  content     text,
+  created_at  timestamptz,
+  updated_at  timestamptz,
+  mood_score  float8,
+  themes      text[],
+  distortions jsonb,
+  observation text,
+  analyzed    boolean,
+  similarity  float8,
+  score       float8
+)
+LANGUAGE sql
+STABLE
+SECURITY INVOKER
+AS $$
+  WITH lexical AS (
+    SELECT e.id,
+           row_number() OVER (ORDER BY ts_rank_cd(e.content_tsv, q, 32) DESC) AS rank
+    FROM public.entries e,
+         websearch_to_tsquery('english', query_text) AS q
+    WHERE e.user_id = auth.uid()
+      AND e.content_tsv @@ q
+    ORDER BY rank
+    LIMIT match_count * 4
+  ),
+  distances AS (
+    SELECT * FROM public.entry_vector_distances(query_embedding, match_count * 16)
+  ),
+  semantic AS (
+    SELECT d.entry_id AS id,
+           row_number() OVER (ORDER BY d.distance) AS rank
+    FROM distances d
+    ORDER BY d.distance
+    LIMIT match_count * 4
+  ),
+  fused AS (
+    SELECT coalesce(l.id, s.id) AS id,
+           coalesce(1.0 / (rrf_k + l.rank), 0) + coalesce(1.0 / (rrf_k + s.rank), 0) AS score
+    FROM lexical l
+    FULL OUTER JOIN semantic s ON s.id = l.id
+  )
+  SELECT
+    e.id, e.content, e.created_at, e.updated_at, e.mood_score,
+    e.themes, e.distortions, e.observation, e.analyzed,
+    -- best-chunk similarity when the entry was a vector candidate
+    1 - coalesce(d.distance, e.embedding <=> query_embedding) AS similarity,
+    f.score::float8 AS score
+  FROM fused f
+  JOIN public.entries e ON e.id = f.id
+  LEFT JOIN distances d ON d.entry_id = f.id
+  ORDER BY f.score DESC
+  LIMIT match_count;
+$$;
+
+
+-- -----------------------------------------------------------------------------
+-- 6. BACKFILL — unchunked entries need (re-)embedding too
+-- -----------------------------------------------------------------------------
+
+CREATE OR REPLACE FUNCTION public.entry_needs_embedding(
+  e                   public.entries,
+  p_embedding_version text,
+  p_mode              text
+)
+RETURNS boolean
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT p_mode IN ('embedding', 'all')
+     AND (e.embedding IS NULL
+          OR e.embedding_version IS DISTINCT FROM p_embedding_version
+          OR NOT EXISTS (SELECT 1 FROM public.entry_chunks c WHERE c.entry_id = e.id));
+$$;
+
+
+-- -----------------------------------------------------------------------------
+-- 7. PRIVILEGES — service role only for writes
+-- -----------------------------------------------------------------------------
+
+REVOKE EXECUTE ON FUNCTION public.apply_entry_chunks(jsonb) FROM PUBLIC, anon, authenticated;
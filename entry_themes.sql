@@ -0,0 +1,144 @@
+-- =============================================================================
+-- Vesper — Normalised, indexed entry themes for the Drift Timeline
+-- =============================================================================
+-- Run this in the Supabase SQL Editor (after supabase_init.sql).
+--
+-- entries.themes (text[]) is mirrored into entry_themes, one row per
+-- (entry, theme), by a trigger. A composite GIN index lets
+-- `theme ILIKE '%term%'` for one user be answered from the index, so theme
+-- filtering and the distinct-theme listing cost O(matching rows) instead
+-- of downloading every entry.
+-- =============================================================================
+
+
+-- -----------------------------------------------------------------------------
+-- 1. EXTENSIONS
+-- -----------------------------------------------------------------------------
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE EXTENSION IF NOT EXISTS btree_gin;   -- uuid equality inside a GIN index
+
+
+-- -----------------------------------------------------------------------------
+-- 2. TABLE + INDEXES
+-- -----------------------------------------------------------------------------
+
+CREATE TABLE IF NOT EXISTS public.entry_themes (
+    entry_id    uuid        NOT NULL REFERENCES public.entries(id) ON DELETE CASCADE,
+    user_id     uuid        NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+    theme       text        NOT NULL,
+    created_at  timestamptz NOT NULL,        -- copy of entries.created_at for ordering
+    PRIMARY KEY (entry_id, theme)
+);
+
+-- Exact per-user listing / grouping
+CREATE INDEX IF NOT EXISTS entry_themes_user_theme_idx
+    ON public.entry_themes (user_id, theme);
+
+-- Case-insensitive substring filter scoped to one user
+CREATE INDEX IF NOT EXISTS entry_themes_user_theme_trgm_idx
+    ON public.entry_themes
+    USING gin (user_id, theme gin_trgm_ops);
+
+
+-- -----------------------------------------------------------------------------
+-- 3. ROW LEVEL SECURITY — read own rows; the trigger writes
+-- -----------------------------------------------------------------------------
+
+ALTER TABLE public.entry_themes ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "entry_themes: select own"
+    ON public.entry_themes
+    FOR SELECT
+    USING (auth.uid() = user_id);
+
+
+-- -----------------------------------------------------------------------------
+-- 4. TRIGGER — mirror entries.themes on insert / themes change
+-- -----------------------------------------------------------------------------
+
+CREATE OR REPLACE FUNCTION public.entries_sync_themes()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  IF TG_OP = 'UPDATE' THEN
+    DELETE FROM public.entry_themes WHERE entry_id = NEW.id;
+  END IF;
+
+  INSERT INTO public.entry_themes (entry_id, user_id, theme, created_at)
+  SELECT DISTINCT NEW.id, NEW.user_id, trim(t), NEW.created_at
+  FROM unnest(coalesce(NEW.themes, '{}')) AS t
+  WHERE trim(t) <> '';
+
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS entries_sync_themes ON public.entries;
+CREATE TRIGGER entries_sync_themes
+    AFTER INSERT OR UPDATE OF themes, user_id, created_at
+    ON public.entries
+    FOR EACH ROW
+    EXECUTE FUNCTION public.entries_sync_themes();
+
+
+-- -----------------------------------------------------------------------------
+-- 5. RPCs
+-- -----------------------------------------------------------------------------
+
+-- Distinct themes across the caller's analyzed entries, with entry counts
+CREATE OR REPLACE FUNCTION public.drift_themes()
+RETURNS TABLE (theme text, entry_count bigint)
+LANGUAGE sql
+STABLE
+SECURITY INVOKER
+AS $$
+  SELECT t.theme, count(*) AS entry_count
+  FROM public.entry_themes t
+  JOIN public.entries e ON e.id = t.entry_id
+  WHERE t.user_id = auth.uid()
+    AND e.analyzed
+  GROUP BY t.theme
+  ORDER BY t.theme;
+$$;
+
+-- Analyzed entries whose themes contain `theme_filter` (case-insensitive
+-- substring), oldest first — same row shape as GET /drift/timeline
+CREATE OR REPLACE FUNCTION public.drift_timeline(theme_filter text)
+RETURNS TABLE (
+  id          uuid,
+  created_at  timestamptz,
+  mood_score  float8,
+  themes      text[],
+  observation text
+)
+LANGUAGE sql
+STABLE
+SECURITY INVOKER
+AS $$
+  SELECT e.id, e.created_at, e.mood_score, e.themes, e.observation
+  FROM public.entries e
+  WHERE e.id IN (
+          SELECT t.entry_id
+          FROM public.entry_themes t
+          WHERE t.user_id = auth.uid()
+            AND t.theme ILIKE '%' || replace(replace(replace(theme_filter, '\', '\\'), '%', '\%'), '_', '\_') || '%'
+        )
+    AND e.analyzed
+    AND e.mood_score IS NOT NULL
+  ORDER BY e.created_at;
+$$;
+
+
+-- -----------------------------------------------------------------------------
+-- 6. BACKFILL existing entries
+-- -----------------------------------------------------------------------------
+
+INSERT INTO public.entry_themes (entry_id, user_id, theme, created_at)
+SELECT DISTINCT e.id, e.user_id, trim(t), e.created_at
+FROM public.entries e, unnest(coalesce(e.themes, '{}')) AS t
+WHERE trim(t) <> ''
+ON CONFLICT DO NOTHING;
@@ -15,7 +15,7 @@ function emotionColor(emotion) {
     return 'var(--color-primary)'
 }
 
-export default function ReportCard({ report }) {
+export default function ReportCard({ report, draft = false }) {
     const [downloading, setDownloading] = useState(false)
     const [dlError, setDlError] = useState(null)
 
@@ -78,8 +78,8 @@ export default function ReportCard({ report }) {
                 </div>
             )}
 
-            {/* Download */}
-            <div style={{ paddingTop: '0.625rem', borderTop: '1px solid var(--color-border)' }}>
+            {/* Download (not until the report is saved) */}
+            {!draft && <div style={{ paddingTop: '0.625rem', borderTop: '1px solid var(--color-border)' }}>
                 {dlError && <p style={{ fontSize: '0.75rem', color: 'var(--color-destructive)', margin: '0 0 6px' }}>{dlError}</p>}
                 <button onClick={handleDownload} disabled={downloading}
                     style={{
@@ -91,7 +91,7 @@ export default function ReportCard({ report }) {
                     <Download size={14} />
                     {downloading ? 'Generating PDF…' : 'Download PDF'}
                 </button>
-            </div>
+            </div>}
         </article>
     )
 }
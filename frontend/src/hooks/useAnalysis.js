@@ -1,44 +1,24 @@
-import { useState, useEffect, useRef, useCallback } from 'react'
-import { getAnalysis } from '../lib/api'
+import { useState, useEffect } from 'react'
+import { getAnalysis, streamAnalysis } from '../lib/api'
 
 /**
- * useAnalysis — polls GET /entries/{id}/analysis every 3s until analyzed=true.
+ * useAnalysis — waits for GET /entries/{id}/analysis/stream (SSE) to push
+ * the analysis result instead of polling.
+ *
+ * If the stream times out or drops, a single GET /entries/{id}/analysis
+ * fetches whatever is stored.
  *
  * Returns:
  *   analysis   — the full result object (null while loading)
  *   analyzing  — true while waiting for the backend to finish
- *   error      — string if the poll itself hard-fails
+ *   error      — string if the stream and the fallback both hard-fail
  */
 export function useAnalysis(entryId) {
     const [analysis, setAnalysis] = useState(null)
     const [analyzing, setAnalyzing] = useState(false)
     const [error, setError] = useState(null)
-    const intervalRef = useRef(null)
-
-    const stopPolling = useCallback(() => {
-        if (intervalRef.current) {
-            clearInterval(intervalRef.current)
-            intervalRef.current = null
-        }
-    }, [])
-
-    const poll = useCallback(async (id) => {
-        try {
-            const data = await getAnalysis(id)
-            if (data.analyzed) {
-                setAnalysis(data)
-                setAnalyzing(false)
-                stopPolling()
-            }
-        } catch (err) {
-            // Don't crash — just keep polling on transient errors
-            console.warn('[useAnalysis] poll error:', err.message)
-        }
-    }, [stopPolling])
 
     useEffect(() => {
-        stopPolling()
-
         if (!entryId) {
             setAnalysis(null)
             setAnalyzing(false)
@@ -51,12 +31,40 @@ export function useAnalysis(entryId) {
         setError(null)
         setAnalyzing(true)
 
-        // Poll immediately, then every 3 seconds
-        poll(entryId)
-        intervalRef.current = setInterval(() => poll(entryId), 3000)
+        const controller = new AbortController()
+
+        async function wait() {
+            try {
+                const { event, data } = await streamAnalysis(entryId, { signal: controller.signal })
+                if (event === 'analysis') {
+                    setAnalysis(data)
+                    setAnalyzing(false)
+                    return
+                }
+                if (event === 'failed') {
+                    setAnalyzing(false)
+                    return
+                }
+            } catch (err) {
+                if (controller.signal.aborted) return
+                console.warn('[useAnalysis] stream error:', err.message)
+            }
+
+            // Timeout or dropped stream — one plain read of the stored state
+            try {
+                const data = await getAnalysis(entryId)
+                if (controller.signal.aborted) return
+                if (data.analyzed) setAnalysis(data)
+            } catch (err) {
+                if (!controller.signal.aborted) setError(err.message)
+            } finally {
+                if (!controller.signal.aborted) setAnalyzing(false)
+            }
+        }
 
-        return stopPolling
-    }, [entryId, poll, stopPolling])
+        wait()
+        return () => controller.abort()
+    }, [entryId])
 
     return { analysis, analyzing, error }
 }
@@ -66,7 +66,24 @@ export const updateEntry = (id, payload) =>
 
 /** List all entries for the current user (newest first). */
 export const listEntries = () => request('/entries')
-export const getEntries = listEntries   // alias used by V0 Dashboard
+export const getEntries = listEntries   // alias used by the V0 components
+
+/**
+ * One keyset page of entries (newest first).
+ * Pass the returned `nextCursor` back in to fetch the following page;
+ * it is null on the last page. view: 'full' | 'summary' (preview only).
+ */
+export async function listEntriesPage({ limit = 30, cursor = null, view = 'summary' } = {}) {
+    const params = new URLSearchParams({ limit: String(limit), view })
+    if (cursor) params.set('cursor', cursor)
+    const headers = await authHeaders()
+    const res = await fetch(`${BASE_URL}/entries?${params}`, { headers })
+    if (!res.ok) {
+        const body = await res.json().catch(() => ({ detail: res.statusText }))
+        throw new Error(body.detail ?? `API error ${res.status}`)
+    }
+    return { items: await res.json(), nextCursor: res.headers.get('X-Next-Cursor') }
+}
 
 /** Get a single entry by ID. */
 export const getEntry = (id) => request(`/entries/${id}`)
@@ -74,6 +91,60 @@ export const getEntry = (id) => request(`/entries/${id}`)
 /** Get AI analysis status for an entry. */
 export const getAnalysis = (id) => request(`/entries/${id}/analysis`)
 
+/**
+ * Yield `{ event, data }` for each Server-Sent Events message in a fetch
+ * Response body. Comment-only blocks (heartbeats) are skipped. We read the
+ * stream by hand (not EventSource) so the Bearer header can be sent.
+ */
+async function* readEvents(res) {
+    const reader = res.body.getReader()
+    const decoder = new TextDecoder()
+    let buffer = ''
+    try {
+        for (;;) {
+            const { value, done } = await reader.read()
+            if (done) return
+            buffer += decoder.decode(value, { stream: true })
+
+            let sep
+            while ((sep = buffer.indexOf('\n\n')) !== -1) {
+                const block = buffer.slice(0, sep)
+                buffer = buffer.slice(sep + 2)
+                let event = 'message'
+                let data = ''
+                for (const line of block.split('\n')) {
+                    if (line.startsWith('event:')) event = line.slice(6).trim()
+                    else if (line.startsWith('data:')) data += line.slice(5).trim()
+                }
+                if (data) yield { event, data: JSON.parse(data) }
+            }
+        }
+    } finally {
+        reader.cancel().catch(() => {})
+    }
+}
+
+async function openStream(path, options = {}) {
+    const headers = await authHeaders()
+    const res = await fetch(`${BASE_URL}${path}`, { ...options, headers })
+    if (!res.ok) {
+        const body = await res.json().catch(() => ({ detail: res.statusText }))
+        throw new Error(body.detail ?? `API error ${res.status}`)
+    }
+    return res
+}
+
+/**
+ * Wait for the entry's analysis over Server-Sent Events.
+ * Resolves with `{ event, data }` where event is 'analysis', 'failed' or
+ * 'timeout'. Pass an AbortSignal to cancel.
+ */
+export async function streamAnalysis(id, { signal } = {}) {
+    const res = await openStream(`/entries/${id}/analysis/stream`, { signal })
+    for await (const message of readEvents(res)) return message
+    throw new Error('Analysis stream closed without a result')
+}
+
 /** Semantic search — returns top-N similar entries. */
 export const searchEntries = (query, limit = 8) =>
     request('/entries/search', {
@@ -89,9 +160,28 @@ export const deleteEntry = (id) =>
 // Dashboard Stats API
 // ---------------------------------------------------------------------------
 
-/** Streak, 7-day sparkline, latest analysis. */
+/** The browser's IANA time zone, e.g. 'Europe/Berlin'. */
+export const browserTimezone = () =>
+    Intl.DateTimeFormat().resolvedOptions().timeZone || 'UTC'
+
+/**
+ * Streak, 7-day sparkline, latest analysis — days bucketed in the user's
+ * stored time zone (`timezone` in the response; `timezone_set` is false
+ * until one has been saved with setTimezone).
+ */
 export const getDashboardStats = () => request('/dashboard/stats')
 
+// ---------------------------------------------------------------------------
+// Settings API
+// ---------------------------------------------------------------------------
+
+/** Store the time zone days are bucketed in (rebuilds the user's rollups). */
+export const setTimezone = (timezone) =>
+    request('/settings/timezone', {
+        method: 'PUT',
+        body: JSON.stringify({ timezone }),
+    })
+
 // ---------------------------------------------------------------------------
 // Drift Timeline API
 // ---------------------------------------------------------------------------
@@ -102,17 +192,44 @@ export const getDriftThemes = () => request('/drift/themes')
 /**
  * Mood-score timeline (oldest → newest).
  * Pass a theme string to filter to entries containing that theme.
+ * Optional { bucket: 'day' | 'week' | 'month', maxPoints } aggregates /
+ * downsamples the series server-side.
  */
-export const getDriftTimeline = (theme = null) =>
-    request(`/drift/timeline${theme ? `?theme=${encodeURIComponent(theme)}` : ''}`)
+export const getDriftTimeline = (theme = null, { bucket = null, maxPoints = null } = {}) => {
+    const params = new URLSearchParams()
+    if (theme) params.set('theme', theme)
+    if (bucket) params.set('bucket', bucket)
+    if (maxPoints) params.set('max_points', String(maxPoints))
+    const qs = params.toString()
+    return request(`/drift/timeline${qs ? `?${qs}` : ''}`)
+}
 
 // ---------------------------------------------------------------------------
 // Reports API
 // ---------------------------------------------------------------------------
 
-/** Synthesise a new weekly report from the last 7 analyzed entries. */
-export const generateReport = () =>
-    request('/reports/generate', { method: 'POST' })
+/**
+ * Synthesise a weekly report from the last 7 analyzed entries. Returns the
+ * existing report if those entries haven't changed, unless `force` is set.
+ */
+export const generateReport = ({ force = false } = {}) =>
+    request(`/reports/generate${force ? '?force=true' : ''}`, { method: 'POST' })
+
+/**
+ * Generate a report, streaming it as the model writes it.
+ * `onEvent({ event, data })` receives 'start', 'delta' ({field, text}) and
+ * 'field' ({field, value}) messages; resolves with the saved report (or
+ * the existing one for unchanged entries, unless `force` is set).
+ */
+export async function streamReport({ onEvent, signal, force = false } = {}) {
+    const res = await openStream(`/reports/generate/stream${force ? '?force=true' : ''}`, { method: 'POST', signal })
+    for await (const message of readEvents(res)) {
+        if (message.event === 'report') return message.data
+        if (message.event === 'error') throw new Error(message.data.detail)
+        onEvent?.(message)
+    }
+    throw new Error('Report stream closed before the report was saved')
+}
 
 /** List all past reports (newest first). */
 export const listReports = () => request('/reports')
@@ -3,8 +3,9 @@ import { useNavigate, useSearchParams } from 'react-router-dom'
 import { supabase } from '../lib/supabase'
 import { useAuth } from '../hooks/useAuth'
 import {
-    getEntries, getEntry, createEntry, updateEntry,
+    listEntriesPage, getEntry, createEntry, updateEntry,
     deleteEntry, searchEntries, getAnalysis, getDashboardStats, generateReport,
+    browserTimezone, setTimezone,
 } from '../lib/api'
 import { AreaChart, Area, ResponsiveContainer, Tooltip as ReTooltip } from 'recharts'
 
@@ -27,6 +28,9 @@ const MOODS = [
     { value: 'sad', emoji: '😔', label: 'Sad' },
 ]
 
+// Sidebar list page size (GET /entries keyset pages)
+const ENTRY_PAGE_SIZE = 30
+
 // Content stored as raw text (no title).
 // Mood tag prepended if set: "[mood: happy]\n<body>"
 function packContent(mood, body) {
@@ -101,12 +105,36 @@ function MoodArc({ score }) {
 // ─────────────────────────────────────────────────────────────────────────────
 // Dashboard stats (right panel — home state)
 // ─────────────────────────────────────────────────────────────────────────────
-function DashboardStatsPanel({ entryCount }) {
+function DashboardStatsPanel({ refreshKey }) {
     const [stats, setStats] = useState(null)
+    const [switchingTz, setSwitchingTz] = useState(false)
+    const localTz = browserTimezone()
 
     useEffect(() => {
-        getDashboardStats().then(setStats).catch(console.error)
-    }, [])
+        getDashboardStats()
+            .then(data => {
+                // First visit: adopt the browser's zone once. Later mismatches
+                // (travel, a second device) are only switched when asked.
+                if (!data.timezone_set && data.timezone !== localTz) {
+                    return setTimezone(localTz).then(getDashboardStats)
+                }
+                return data
+            })
+            .then(setStats)
+            .catch(console.error)
+    }, [localTz, refreshKey])
+
+    async function switchToLocalTimezone() {
+        setSwitchingTz(true)
+        try {
+            await setTimezone(localTz)
+            setStats(await getDashboardStats())
+        } catch (err) {
+            console.error(err)
+        } finally {
+            setSwitchingTz(false)
+        }
+    }
 
     return (
         <aside style={{
@@ -125,11 +153,22 @@ function DashboardStatsPanel({ entryCount }) {
 
             {stats && (
                 <>
+                    {/* Stored time zone differs from this device's */}
+                    {stats.timezone_set && stats.timezone !== localTz && (
+                        <div style={{ margin: '0 0.75rem 0.5rem', padding: '0.5rem 0.625rem', borderRadius: '0.625rem', border: '1px solid var(--color-border)', background: 'var(--color-background)', fontSize: '0.6875rem', color: 'var(--color-muted-fg)', lineHeight: 1.5 }}>
+                            Days are counted in {stats.timezone}.{' '}
+                            <button onClick={switchToLocalTimezone} disabled={switchingTz}
+                                style={{ background: 'none', border: 'none', padding: 0, color: 'var(--color-primary)', cursor: 'pointer', fontSize: 'inherit', fontWeight: 600 }}>
+                                {switchingTz ? 'Switching…' : `Use ${localTz}`}
+                            </button>
+                        </div>
+                    )}
+
                     {/* Stats grid */}
                     <div style={{ display: 'grid', gridTemplateColumns: '1fr 1fr', gap: '0.5rem', padding: '0.5rem 0.75rem' }}>
                         {[
                             { label: 'Streak', value: stats.current_streak, unit: 'days', color: stats.current_streak > 0 ? '#e97b5a' : 'var(--color-muted-fg)', icon: '🔥' },
-                            { label: 'Entries', value: entryCount, unit: 'total', color: 'var(--color-primary)', icon: '📔' },
+                            { label: 'Entries', value: stats.entry_count, unit: 'total', color: 'var(--color-primary)', icon: '📔' },
                         ].map(s => (
                             <div key={s.label} style={{
                                 background: 'var(--color-background)', borderRadius: '0.75rem',
@@ -303,17 +342,18 @@ function EntryInsightPanel({ entryId }) {
 // ─────────────────────────────────────────────────────────────────────────────
 // Persistent stats bar — always visible above the editor
 // ─────────────────────────────────────────────────────────────────────────────
-function PersistentStatsBar({ entryCount }) {
+function PersistentStatsBar({ refreshKey }) {
     const navigate = useNavigate()
     const [stats, setStats] = useState(null)
     const [generating, setGenerating] = useState(false)
 
     useEffect(() => {
         getDashboardStats().then(setStats).catch(console.error)
-    }, [])
+    }, [refreshKey])
 
     const sparkline = stats?.mood_sparkline ?? []
     const streak = stats?.current_streak ?? 0
+    const entryCount = stats?.entry_count ?? 0
 
     async function handleGenerate() {
         setGenerating(true)
@@ -516,9 +556,11 @@ function InlineEditor({ entryId, isNew, onSaved, onDeleted }) {
 // Sidebar entry row
 // ─────────────────────────────────────────────────────────────────────────────
 function SidebarEntry({ entry, selected, onClick, score }) {
-    const { mood } = unpackContent(entry.content)
+    // List pages carry a `preview` (summary view); search results the full content
+    const raw = entry.content ?? entry.preview
+    const { mood } = unpackContent(raw)
     const moodObj = MOODS.find(m => m.value === mood)
-    const text = snippet(entry.content)
+    const text = snippet(raw)
 
     return (
         <button onClick={onClick}
@@ -590,19 +632,36 @@ export default function Dashboard() {
     const isNew = searchParams.get('new') === '1'
 
     const [entries, setEntries] = useState([])
+    const [nextCursor, setNextCursor] = useState(null)
     const [loadingList, setLoadingList] = useState(true)
+    const [loadingMore, setLoadingMore] = useState(false)
+    const [statsKey, setStatsKey] = useState(0)
     const [query, setQuery] = useState('')
     const [searchResults, setSearchResults] = useState(null)   // null = not searching
     const [searching, setSearching] = useState(false)
     const [sidebarOpen, setSidebarOpen] = useState(false)
     const debounceRef = useRef(null)
 
+    // First page of the list; older pages are appended by loadMore
     const load = useCallback(() => {
         setLoadingList(true)
-        getEntries().then(setEntries).catch(console.error).finally(() => setLoadingList(false))
+        listEntriesPage({ limit: ENTRY_PAGE_SIZE })
+            .then(({ items, nextCursor }) => { setEntries(items); setNextCursor(nextCursor) })
+            .catch(console.error)
+            .finally(() => setLoadingList(false))
     }, [])
     useEffect(() => { load() }, [load])
 
+    async function loadMore() {
+        if (!nextCursor || loadingMore) return
+        setLoadingMore(true)
+        try {
+            const page = await listEntriesPage({ limit: ENTRY_PAGE_SIZE, cursor: nextCursor })
+            setEntries(prev => [...prev, ...page.items])
+            setNextCursor(page.nextCursor)
+        } catch (e) { console.error(e) } finally { setLoadingMore(false) }
+    }
+
     // Debounced semantic search
     useEffect(() => {
         clearTimeout(debounceRef.current)
@@ -629,9 +688,10 @@ export default function Dashboard() {
 
     function handleSaved(saved) {
         load()
+        setStatsKey(k => k + 1)   // refetch streak / count
         if (isNew) setSearchParams({ entry: saved.id })
     }
-    function handleDeleted() { setSearchParams({}); load() }
+    function handleDeleted() { setSearchParams({}); load(); setStatsKey(k => k + 1) }
 
     return (
         <div style={{ position: 'relative', display: 'flex', height: '100svh', overflow: 'hidden', background: 'oklch(0.975 0.005 75)' }}>
@@ -745,6 +805,15 @@ export default function Dashboard() {
                             score={score}
                         />
                     ))}
+                    {searchResults === null && nextCursor && (
+                        <div style={{ padding: '0.5rem 0.75rem 0.75rem' }}>
+                            <button onClick={loadMore} disabled={loadingMore}
+                                style={{ width: '100%', padding: '0.375rem 0', borderRadius: '0.5rem', border: '1px solid var(--color-border)', background: 'transparent', cursor: 'pointer', fontSize: '0.75rem', color: 'var(--color-muted-fg)', display: 'flex', alignItems: 'center', justifyContent: 'center', gap: '0.375rem' }}>
+                                {loadingMore && <Loader2 size={11} style={{ animation: 'spin 1s linear infinite' }} />}
+                                {loadingMore ? 'Loading…' : 'Older entries'}
+                            </button>
+                        </div>
+                    )}
                 </div>
 
                 {/* Bottom nav — Drift & Reports */}
@@ -785,7 +854,7 @@ export default function Dashboard() {
             {/* ── Center ── */}
             <div style={{ position: 'relative', zIndex: 1, flex: 1, display: 'flex', flexDirection: 'column', overflow: 'hidden', minWidth: 0, background: 'rgba(250,248,244,0.60)', backdropFilter: 'blur(12px)', WebkitBackdropFilter: 'blur(12px)' }}>
                 {/* Persistent stats bar — always on screen */}
-                <PersistentStatsBar entryCount={entries.length} />
+                <PersistentStatsBar refreshKey={statsKey} />
                 {/* Content area */}
                 <div style={{ flex: 1, display: 'flex', overflow: 'hidden' }}>
                     {!selectedId && !isNew && <WelcomeCenter onNewEntry={newEntry} />}
@@ -795,7 +864,7 @@ export default function Dashboard() {
             </div>
 
             {/* ── Right panel ── */}
-            {!selectedId && !isNew && <DashboardStatsPanel entryCount={entries.length} />}
+            {!selectedId && !isNew && <DashboardStatsPanel refreshKey={statsKey} />}
             {(selectedId || isNew) && <EntryInsightPanel entryId={selectedId} />}
         </div>
     )
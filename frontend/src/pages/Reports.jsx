@@ -1,6 +1,6 @@
 import { useEffect, useState } from 'react'
 import { useNavigate } from 'react-router-dom'
-import { generateReport, listReports } from '../lib/api'
+import { listReports, streamReport } from '../lib/api'
 import ReportCard from '../components/ReportCard'
 import { BookOpen, ArrowLeft, FilePlus, Loader2 } from 'lucide-react'
 
@@ -11,6 +11,7 @@ export default function Reports() {
     const [error, setError] = useState(null)
     const [generating, setGenerating] = useState(false)
     const [genError, setGenError] = useState(null)
+    const [draft, setDraft] = useState(null)   // report fields streamed so far
 
     async function fetchReports() {
         setLoading(true); setError(null)
@@ -20,14 +21,26 @@ export default function Reports() {
     }
     useEffect(() => { fetchReports() }, [])
 
+    function applyReportEvent({ event, data }) {
+        if (event === 'start') {
+            setDraft({ created_at: new Date().toISOString(), week_start: data.week_start })
+        } else if (event === 'delta') {
+            setDraft(d => ({ ...d, [data.field]: (d?.[data.field] ?? '') + data.text }))
+        } else if (event === 'field') {
+            setDraft(d => ({ ...d, [data.field]: data.value }))
+        }
+    }
+
     async function handleGenerate() {
         setGenerating(true); setGenError(null)
         try {
-            const r = await generateReport()
-            setReports(prev => [r, ...prev])
+            const r = await streamReport({ onEvent: applyReportEvent })
+            // An unchanged entry set returns the report we already list
+            setReports(prev => [r, ...prev.filter(p => p.id !== r.id)])
         } catch (e) {
             setGenError(e.message)
         } finally {
+            setDraft(null)
             setGenerating(false)
         }
     }
@@ -110,7 +123,14 @@ export default function Reports() {
                     <p style={{ fontSize: '0.875rem', color: 'var(--color-destructive)', textAlign: 'center', padding: '4rem 0' }}>{error}</p>
                 )}
 
-                {!loading && !error && reports.length === 0 && (
+                {/* Report being written */}
+                {draft && (
+                    <div style={{ marginBottom: '0.75rem' }}>
+                        <ReportCard report={draft} draft />
+                    </div>
+                )}
+
+                {!loading && !error && reports.length === 0 && !draft && (
                     <div className="card" style={{ display: 'flex', flexDirection: 'column', alignItems: 'center', justifyContent: 'center', padding: '4rem 1rem', gap: '0.875rem', textAlign: 'center', border: '2px dashed var(--color-border)' }}>
                         <div style={{ width: '3.5rem', height: '3.5rem', borderRadius: '9999px', background: 'oklch(0.50 0.10 170 / 0.10)', display: 'flex', alignItems: 'center', justifyContent: 'center' }}>
                             <FilePlus size={22} color='var(--color-primary)' />
@@ -0,0 +1,136 @@
+-- =============================================================================
+-- Vesper — Full-text index + hybrid (lexical ⊕ vector) search
+-- =============================================================================
+-- Run this in the Supabase SQL Editor (after match_entries_rpc.sql and
+-- entry_themes.sql, which installs btree_gin).
+--
+--   lexical_search  — full-text only; no embedding needed, so keyword
+--                     lookups (names, places) are one round-trip
+--   hybrid_search   — fuses the full-text ranking and the pgvector
+--                     ranking with Reciprocal Rank Fusion:
+--                       score = Σ 1 / (rrf_k + rank_in_list)
+--
+-- Postgres has no native BM25; ts_rank_cd (cover density, length
+-- normalised) is the lexical ranker. Both RPCs return the match_entries
+-- row shape plus `score`; `similarity` is the cosine similarity when an
+-- embedding is available, else null.
+-- =============================================================================
+
+
+-- -----------------------------------------------------------------------------
+-- 1. FULL-TEXT COLUMN + INDEX
+-- -----------------------------------------------------------------------------
+
+ALTER TABLE public.entries
+    ADD COLUMN IF NOT EXISTS content_tsv tsvector
+    GENERATED ALWAYS AS (to_tsvector('english', coalesce(content, ''))) STORED;
+
+-- user_id inside the GIN index (btree_gin) so one user's matches come
+-- straight from the index
+CREATE INDEX IF NOT EXISTS entries_user_content_tsv_idx
+    ON public.entries
+    USING gin (user_id, content_tsv);
+
+
+-- -----------------------------------------------------------------------------
+-- 2. LEXICAL SEARCH
+-- -----------------------------------------------------------------------------
+
+CREATE OR REPLACE FUNCTION public.lexical_search(
+  query_text  text,
+  match_count int DEFAULT 8
+)
+RETURNS TABLE (
+  id          uuid,
+  content     text,
+  created_at  timestamptz,
+  updated_at  timestamptz,
+  mood_score  float8,
+  themes      text[],
+  distortions jsonb,
+  observation text,
+  analyzed    boolean,
+  similarity  float8,
+  score       float8
+)
+LANGUAGE sql
+STABLE
+SECURITY INVOKER
+AS $$
+  SELECT
+    e.id, e.content, e.created_at, e.updated_at, e.mood_score,
+    e.themes, e.distortions, e.observation, e.analyzed,
+    NULL::float8 AS similarity,
+    ts_rank_cd(e.content_tsv, q, 32)::float8 AS score   -- 32: rank / (rank + 1)
+  FROM public.entries e,
+       websearch_to_tsquery('english', query_text) AS q
+  WHERE e.user_id = auth.uid()
+    AND e.content_tsv @@ q
+  ORDER BY score DESC, e.created_at DESC
+  LIMIT match_count;
+$$;
+
+
+-- -----------------------------------------------------------------------------
+-- 3. HYBRID SEARCH (RRF)
+-- -----------------------------------------------------------------------------
+
+CREATE OR REPLACE FUNCTION public.hybrid_search(
+  query_text      text,
+  query_embedding vector(384),
+  match_count     int DEFAULT 8,
+  rrf_k           int DEFAULT 60
+)
+RETURNS TABLE (
+  id          uuid,
+  content     text,
+  created_at  timestamptz,
+  updated_at  timestamptz,
+  mood_score  float8,
+  themes      text[],
+  distortions jsonb,
+  observation text,
+  analyzed    boolean,
+  similarity  float8,
+  score       float8
+)
+LANGUAGE sql
+STABLE
+SECURITY INVOKER
+SET ivfflat.probes = 40   -- see vector_index.sql
+AS $$
+  WITH lexical AS (
+    SELECT e.id,
+           row_number() OVER (ORDER BY ts_rank_cd(e.content_tsv, q, 32) DESC) AS rank
+    FROM public.entries e,
+         websearch_to_tsquery('english', query_text) AS q
+    WHERE e.user_id = auth.uid()
+      AND e.content_tsv @@ q
+    ORDER BY rank
+    LIMIT match_count * 4
+  ),
+  semantic AS (
+    SELECT e.id,
+           row_number() OVER (ORDER BY e.embedding <=> query_embedding) AS rank
+    FROM public.entries e
+    WHERE e.user_id = auth.uid()
+      AND e.embedding IS NOT NULL
+    ORDER BY e.embedding <=> query_embedding
+    LIMIT match_count * 4
+  ),
+  fused AS (
+    SELECT coalesce(l.id, s.id) AS id,
+           coalesce(1.0 / (rrf_k + l.rank), 0) + coalesce(1.0 / (rrf_k + s.rank), 0) AS score
+    FROM lexical l
+    FULL OUTER JOIN semantic s ON s.id = l.id
+  )
+  SELECT
+    e.id, e.content, e.created_at, e.updated_at, e.mood_score,
+    e.themes, e.distortions, e.observation, e.analyzed,
+    1 - (e.embedding <=> query_embedding) AS similarity,
+    f.score::float8 AS score
+  FROM fused f
+  JOIN public.entries e ON e.id = f.id
+  ORDER BY f.score DESC
+  LIMIT match_count;
+$$;
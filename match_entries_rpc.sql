@@ -3,7 +3,9 @@
 --
 -- Uses SECURITY INVOKER so auth.uid() resolves to the calling user via JWT,
 -- scoping results to that user's entries without needing an explicit user_id param.
--- The IVFFlat index on embedding (from supabase_init.sql) makes this fast.
+-- The IVFFlat index on embedding (supabase_init.sql, trained by vector_index.sql)
+-- makes this fast; the user filter applies after the index scan, hence 40 probes
+-- (measured in vector_index.sql).
 
 CREATE OR REPLACE FUNCTION match_entries(
   query_embedding vector(384),
@@ -24,6 +26,7 @@ RETURNS TABLE (
 LANGUAGE sql
 STABLE
 SECURITY INVOKER          -- uses caller's JWT → auth.uid() scopes to their rows
+SET ivfflat.probes = 40
 AS $$
   SELECT
     e.id,
@@ -0,0 +1,18 @@
+-- =============================================================================
+-- Vesper — Memoised weekly reports
+-- =============================================================================
+-- Run this in the Supabase SQL Editor (after supabase_init.sql).
+--
+-- reports.input_fingerprint = sha256 of the report model + prompt version
+-- and the (id, updated_at) of every entry the report was synthesised from
+-- (computed in backend/app/services/ai/report.py). POST /reports/generate
+-- returns the newest report with the same fingerprint instead of paying for
+-- a second synthesis, unless called with ?force=true.
+-- =============================================================================
+
+ALTER TABLE public.reports
+    ADD COLUMN IF NOT EXISTS input_fingerprint text;
+
+CREATE INDEX IF NOT EXISTS reports_user_fingerprint_idx
+    ON public.reports (user_id, input_fingerprint, created_at DESC)
+    WHERE input_fingerprint IS NOT NULL;
@@ -57,6 +57,7 @@ CREATE INDEX IF NOT EXISTS reports_user_id_idx    ON public.reports (user_id);
 
 -- pgvector ANN index for semantic search (cosine distance)
 -- Uses IVFFlat; tune lists= based on row count (sqrt(rows) is a good rule of thumb)
+-- Built empty here; vector_index.sql rebuilds it once there is data to train on
 CREATE INDEX IF NOT EXISTS entries_embedding_idx
     ON public.entries
     USING ivfflat (embedding vector_cosine_ops)